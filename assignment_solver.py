@@ -0,0 +1,264 @@
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from skill_matrix import top_candidates
+
+logger = logging.getLogger("recommendation_logger")
+
+# ============================================
+# CAPACITY-AWARE PROJECT STAFFING SOLVER
+# ============================================
+# The greedy path picks the top-N of each requirement row independently, so
+# one strong employee can be proposed for several rows whose combined hours
+# they cannot cover. Here the whole project is solved as a min-cost flow:
+#
+#   source -> requirement r   capacity quantity_needed, cost 0
+#   requirement r -> employee capacity 1 (one seat per row), cost -score
+#   employee -> sink          capacity = how many seats their hours cover
+#
+# Successive shortest paths with a vectorized Bellman-Ford over the
+# requirement x assigned-candidate matrix keep this well under a second for
+# 10k employees and 100 seats. Only the top `total seats` candidates of each row
+# can be needed, so everything else is pruned up front. That only holds if every
+# kept candidate can take at least one seat, so employees whose hours cover no
+# seat are dropped first, and pruning is redone whenever a repair round takes
+# someone's last seat away.
+#
+# The flow is exact for the seat capacities it is given, but those are an
+# estimate: with mixed Full-Time/Part-Time rows the hours a seat costs depend
+# on which other seats the employee holds. Overbooked employees lose a seat and
+# the project is re-solved, which can settle below the best possible total.
+
+SOLVER_CONFIG = {
+    # Re-solves allowed when mixed Full-Time/Part-Time rows overbook someone's hours
+    "max_repair_rounds": 5,
+}
+
+HoursFn = Callable[[str, int], Tuple[int, float, str]]
+
+
+@dataclass
+class StaffingPlan:
+    selections: List[np.ndarray]   # per requirement, employee row indices best first
+    hours: List[List[Tuple[int, float, str]]]  # matching calculate_assignment_details results
+    total_score: int
+
+
+def _seat_capacity(total_hours, preferences: Sequence[str], hours_for: HoursFn, limit: int) -> int:
+    """Most seats an employee's hours can cover using the cheapest preference in the project"""
+    best = 0
+    for preference in preferences:
+        remaining, seats = total_hours, 0
+        while seats < limit:
+            assigned = hours_for(preference, remaining)[0]
+            if assigned <= 0:
+                break
+            remaining -= assigned
+            seats += 1
+        best = max(best, seats)
+    return best
+
+
+def _prune_candidates(scores: np.ndarray, quantities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep each row's top `total seats` positive candidates (score, then employee order).
+    Returns the union of kept employees and a (n_req, n_kept) mask of kept pairs.
+    """
+    keep_per_row = int(quantities.sum())
+    kept = [top_candidates(scores[:, row], keep_per_row) for row in range(scores.shape[1])]
+    columns = np.unique(np.concatenate(kept)) if kept else np.empty(0, dtype=np.intp)
+    allowed = np.zeros((scores.shape[1], columns.size), dtype=bool)
+    for row, rows_kept in enumerate(kept):
+        allowed[row, np.searchsorted(columns, rows_kept)] = True
+    return columns, allowed
+
+
+def _min_cost_flow(cost: np.ndarray, allowed: np.ndarray, quantities: np.ndarray, capacity: np.ndarray) -> np.ndarray:
+    """
+    Maximum-weight seat assignment by successive shortest paths.
+    cost is (requirements, candidates) and negative where an assignment is allowed.
+    Returns a 0/1 flow matrix of the same shape.
+
+    Candidates nobody is assigned to yet have no outgoing residual edges, so
+    they can only end a path. Bellman-Ford therefore runs over the assigned
+    candidates only, and each row keeps a cursor into its cheapest free ones.
+    """
+    n_req, n_cand = cost.shape
+    flow = np.zeros((n_req, n_cand), dtype=bool)
+    remaining_seats = quantities.astype(np.int64).copy()
+    remaining_capacity = capacity.astype(np.int64).copy()
+    # Residual edge costs, updated in place as edges flip
+    open_cost = np.where(allowed, cost, np.inf)       # requirement -> candidate, unused
+    used_cost = np.full((n_req, n_cand), np.inf)       # candidate -> requirement, used
+    assigned = np.zeros(n_cand, dtype=bool)
+    req_index = np.arange(n_req)
+
+    free_order = []
+    for row in range(n_req):
+        cands = np.flatnonzero(allowed[row] & (remaining_capacity > 0))
+        free_order.append(cands[np.argsort(cost[row, cands], kind="stable")])
+    cursor = np.zeros(n_req, dtype=np.intp)
+
+    def cheapest_free(row: int) -> int:
+        order = free_order[row]
+        while cursor[row] < order.size and assigned[order[cursor[row]]]:
+            cursor[row] += 1
+        return int(order[cursor[row]]) if cursor[row] < order.size else -1
+
+    while remaining_seats.any():
+        used = np.flatnonzero(assigned)
+
+        # Bellman-Ford alternating requirement -> assigned candidate (unused
+        # edges) and assigned candidate -> requirement (used edges, cost reversed).
+        # Predecessors only change on strict improvement, so equal-cost
+        # alternatives can never close a cycle in the path tree.
+        dist_req = np.where(remaining_seats > 0, 0.0, np.inf)
+        pred_req = np.full(n_req, -1, dtype=np.intp)
+        dist_used = np.full(used.size, np.inf)
+        pred_used = np.full(used.size, -1, dtype=np.intp)
+        if used.size:
+            open_used, back_used = open_cost[:, used], used_cost[:, used]
+            for _ in range(n_req + 1):
+                fwd = dist_req[:, None] + open_used
+                best_fwd = np.argmin(fwd, axis=0)
+                relaxed = fwd[best_fwd, np.arange(used.size)]
+                better = relaxed < dist_used
+                dist_used = np.where(better, relaxed, dist_used)
+                pred_used = np.where(better, best_fwd, pred_used)
+
+                bwd = dist_used[None, :] + back_used
+                best_back = np.argmin(bwd, axis=1)
+                relaxed = bwd[req_index, best_back]
+                improved = relaxed < dist_req
+                if not improved.any():
+                    break
+                dist_req = np.where(improved, relaxed, dist_req)
+                pred_req = np.where(improved, used[best_back], pred_req)
+
+        # Path ends either at an assigned candidate with spare hours
+        # or at the cheapest free candidate of some row
+        end_used = np.where(remaining_capacity[used] > 0, dist_used, np.inf)
+        free = np.array([cheapest_free(row) for row in range(n_req)], dtype=np.intp)
+        free_cost = np.where(free >= 0, cost[req_index, free], np.inf)
+        end_free = dist_req + free_cost
+
+        best_used = int(np.argmin(end_used)) if used.size else -1
+        best_row = int(np.argmin(end_free))
+        if used.size and end_used[best_used] < end_free[best_row]:
+            if not end_used[best_used] < 0:
+                break
+            end = int(used[best_used])
+            req = int(pred_used[best_used])
+        else:
+            if not end_free[best_row] < 0:
+                break  # no augmenting path improves the total score any more
+            end = int(free[best_row])
+            req = best_row
+
+        # Walk the path back to the source, flipping edges along the way
+        remaining_capacity[end] -= 1
+        assigned[end] = True
+        cand = end
+        for _ in range(n_req + 1):
+            flow[req, cand] = True
+            open_cost[req, cand] = np.inf
+            used_cost[req, cand] = -cost[req, cand]
+            previous = pred_req[req]
+            if previous < 0:
+                remaining_seats[req] -= 1
+                break
+            flow[req, previous] = False
+            open_cost[req, previous] = cost[req, previous]
+            used_cost[req, previous] = np.inf
+            cand = previous
+            req = int(pred_used[np.searchsorted(used, cand)])
+
+    return flow
+
+
+def solve_staffing(
+    scores: np.ndarray,
+    quantities: Sequence[int],
+    preferences: Sequence[str],
+    total_hours: Sequence[int],
+    hours_for: HoursFn,
+) -> StaffingPlan:
+    """
+    Assign employees to requirement seats for a high total score while no
+    employee is booked beyond their total_available_hours.
+    scores is (n_employees, n_requirements) with 0 where an employee does not qualify.
+    """
+    n_emp, n_req = scores.shape
+    quantities = np.maximum(np.asarray(quantities, dtype=np.int64), 0)
+    empty = StaffingPlan([np.empty(0, dtype=np.intp) for _ in range(n_req)], [[] for _ in range(n_req)], 0)
+    if n_emp == 0 or n_req == 0 or not quantities.any():
+        return empty
+
+    distinct_prefs = list(dict.fromkeys(preferences))
+    seat_limit = int(quantities.sum())
+    seats_of = {}  # employee row -> seats their hours cover, lowered by repairs
+    usable = np.ones(n_emp, dtype=bool)
+
+    def prune():
+        while True:
+            columns, allowed = _prune_candidates(np.where(usable[:, None], scores, 0), quantities)
+            for col in columns:
+                if col not in seats_of:
+                    seats_of[col] = _seat_capacity(total_hours[col], distinct_prefs, hours_for, seat_limit)
+            capacity = np.array([seats_of[col] for col in columns], dtype=np.int64)
+            if not (capacity <= 0).any():
+                return columns, allowed, capacity
+            usable[columns[capacity <= 0]] = False
+
+    for round_no in range(SOLVER_CONFIG["max_repair_rounds"] + 1):
+        columns, allowed, capacity = prune()
+        if columns.size == 0:
+            return empty
+        sub_scores = scores[columns].T.astype(np.int64)  # (n_req, n_cand)
+        # Scale scores so that among equal totals, earlier employees win (as in greedy)
+        scale = seat_limit * columns.size + 1
+        cost = (-(sub_scores * scale) + np.arange(columns.size)[None, :]).astype(np.float64)
+
+        flow = _min_cost_flow(cost, allowed, quantities, capacity)
+
+        # Hand out hours per employee, strongest seat first, and find overbookings
+        hours = {}
+        overbooked = []
+        for cand in np.flatnonzero(flow.any(axis=0)):
+            rows = np.flatnonzero(flow[:, cand])
+            rows = rows[np.argsort(-sub_scores[rows, cand], kind="stable")]
+            remaining = total_hours[columns[cand]]
+            for row in rows:
+                details = hours_for(preferences[row], remaining)
+                if details[0] <= 0:
+                    overbooked.append((row, cand))
+                    continue
+                hours[(row, cand)] = details
+                remaining -= details[0]
+
+        if not overbooked:
+            break
+        if round_no == SOLVER_CONFIG["max_repair_rounds"]:
+            # Give up on the remaining overbooked seats rather than loop forever
+            for row, cand in overbooked:
+                flow[row, cand] = False
+            break
+        # Mixed Full-Time/Part-Time seats fit fewer times than the estimate; shrink and re-solve
+        logger.debug("Staffing solver: repairing %d overbooked seats", len(overbooked))
+        for row, cand in overbooked:
+            seats_of[columns[cand]] -= 1
+
+    selections, seat_hours = [], []
+    total_score = 0
+    for row in range(n_req):
+        cands = np.flatnonzero(flow[row])
+        # Best score first, then employee order, matching the greedy payload
+        cands = cands[np.lexsort((columns[cands], -sub_scores[row, cands]))]
+        selections.append(columns[cands])
+        seat_hours.append([hours[(row, cand)] for cand in cands])
+        total_score += int(sub_scores[row, cands].sum())
+
+    return StaffingPlan(selections=selections, hours=seat_hours, total_score=total_score)
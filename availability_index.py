@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from employee_loader import iter_table_pages
+
+logger = logging.getLogger("recommendation_logger")
+
+# ============================================
+# AVAILABILITY CONFIGURATION
+# ============================================
+AVAILABILITY_CONFIG = {
+    # Assignment changes normally arrive through the webhook; reload everything
+    # this often in case one was missed
+    "full_resync_seconds": float(os.getenv("AVAILABILITY_RESYNC_SECONDS", 600)),
+    "assigned_status": "assigned",
+    # Most users one reload_users call may re-read
+    "max_reload_users": int(os.getenv("AVAILABILITY_MAX_RELOAD_USERS", 50)),
+}
+
+ASSIGNMENT_COLUMNS = ("id", "user_id", "project_id", "assigned_hours", "status")
+
+# ============================================
+# COMMITTED-HOURS INDEX
+# ============================================
+class AvailabilityIndex:
+    """
+    Hours each user is already committed to through project_assignments.
+    Loaded once, then kept current one assignment row at a time, so nobody
+    re-aggregates the whole table per request. Keyed by users.id, which is
+    project_assignments.user_id and user_details.user_id.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        self._config = {**AVAILABILITY_CONFIG, **(config or {})}
+        self._lock = asyncio.Lock()
+        self._assignments: Dict = {}  # assignment id -> (user_id, hours)
+        self._committed: Dict = {}    # user_id -> hours
+        self._counts: Dict = {}       # user_id -> active assignments
+        self._last_full_sync = 0.0
+        self._synced = False
+
+    # ---------- Sync ----------
+    async def refresh(self, client, force: bool = False) -> Set:
+        """Reload from Supabase when due. Returns the user ids whose committed hours changed."""
+        async with self._lock:
+            now = time.monotonic()
+            if not force and self._synced and now - self._last_full_sync < self._config["full_resync_seconds"]:
+                return set()
+
+            status = self._config["assigned_status"]
+            assignments = {}
+            async for page in iter_table_pages(client, "project_assignments", ASSIGNMENT_COLUMNS,
+                                               lambda query: query.eq("status", status)):
+                for row in page:
+                    assignments[row["id"]] = (row["user_id"], self._hours(row))
+
+            previous = dict(self._committed)
+            self._assignments = {}
+            self._committed = {}
+            self._counts = {}
+            for assignment_id, (user_id, hours) in assignments.items():
+                self._add(assignment_id, user_id, hours)
+
+            self._last_full_sync = now
+            self._synced = True
+            logger.info("Availability index: loaded %d assignments for %d users",
+                        len(self._assignments), len(self._committed))
+            return {
+                user_id for user_id in set(previous) | set(self._committed)
+                if previous.get(user_id) != self._committed.get(user_id)
+            }
+
+    async def reload_users(self, client, user_ids: Iterable) -> Set:
+        """
+        Re-read the assignments of a few users, e.g. after the frontend wrote
+        project_assignments itself. Returns the user ids whose committed hours changed.
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return set()
+        async with self._lock:
+            status = self._config["assigned_status"]
+            rows = []
+            async for page in iter_table_pages(client, "project_assignments", ASSIGNMENT_COLUMNS,
+                                               lambda query: query.eq("status", status).in_("user_id", list(user_ids))):
+                rows += page
+
+            before = {user_id: self._committed.get(user_id) for user_id in user_ids}
+            for assignment_id, (user_id, _hours) in list(self._assignments.items()):
+                if user_id in user_ids:
+                    self._remove(assignment_id)
+            for row in rows:
+                self._add(row["id"], row["user_id"], self._hours(row))
+            return {user_id for user_id in user_ids if self._committed.get(user_id) != before[user_id]}
+
+    def apply_change(self, record: Optional[Dict], old_record: Optional[Dict] = None) -> Set:
+        """
+        Apply one project_assignments insert, update or delete (record None).
+        Returns the user ids whose committed hours changed.
+        """
+        affected = set()
+        for row in (old_record, record):
+            if row and row.get("id") in self._assignments:
+                affected.add(self._remove(row["id"]))
+        if record and record.get("status") == self._config["assigned_status"] and record.get("user_id") is not None:
+            self._add(record["id"], record["user_id"], self._hours(record))
+            affected.add(record["user_id"])
+        return affected
+
+    @staticmethod
+    def _hours(row: Dict) -> int:
+        try:
+            return int(row.get("assigned_hours") or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def _add(self, assignment_id, user_id, hours: int):
+        self._assignments[assignment_id] = (user_id, hours)
+        self._committed[user_id] = self._committed.get(user_id, 0) + hours
+        self._counts[user_id] = self._counts.get(user_id, 0) + 1
+
+    def _remove(self, assignment_id):
+        user_id, hours = self._assignments.pop(assignment_id)
+        self._committed[user_id] -= hours
+        self._counts[user_id] -= 1
+        if self._counts[user_id] == 0:
+            del self._committed[user_id]
+            del self._counts[user_id]
+        return user_id
+
+    # ---------- Read access ----------
+    def committed_hours(self, user_id) -> int:
+        return self._committed.get(user_id, 0)
+
+    def remaining_hours(self, user_id, total_available_hours) -> int:
+        """Hours left after existing assignments, never below zero"""
+        return max(int(total_available_hours or 0) - self.committed_hours(user_id), 0)
+
+    def user(self, user_id) -> Dict:
+        return {
+            "user_id": user_id,
+            "assigned_hours": self._committed.get(user_id, 0),
+            "assignments": self._counts.get(user_id, 0),
+        }
+
+    def users(self) -> Dict:
+        return {user_id: self.user(user_id) for user_id in self._committed}
+
+    def stats(self) -> Dict:
+        return {
+            "synced": self._synced,
+            "assignments": len(self._assignments),
+            "users": len(self._committed),
+        }
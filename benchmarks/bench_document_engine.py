@@ -0,0 +1,119 @@
+"""
+Benchmark the shared PyMuPDF document engine against the previous PyPDF2
+temp-file path on a corpus of text CVs.
+
+    python benchmarks/bench_document_engine.py --resumes 200
+    python benchmarks/bench_document_engine.py --corpus path/to/pdfs
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_engine import extract_pdf  # noqa: E402
+from skill_taxonomy import get_taxonomy  # noqa: E402
+
+SECTIONS = ["Summary", "Experience", "Projects", "Education", "Certifications"]
+FILLER = (
+    "delivered customer facing features with a cross functional team owned releases "
+    "improved reliability mentored engineers wrote documentation reviewed code "
+    "coordinated stakeholders across time zones reduced latency automated deployments"
+).split()
+
+
+def make_corpus(n_resumes, seed):
+    """Synthetic text CVs of 1-3 pages mentioning taxonomy skills"""
+    import fitz  # PyMuPDF
+    rng = random.Random(seed)
+    skills = list(get_taxonomy().names.values())
+    corpus = []
+    for i in range(n_resumes):
+        document = fitz.open()
+        for _ in range(rng.randint(1, 3)):
+            page = document.new_page()
+            lines = [f"Full Name: Candidate {i}", f"Email: candidate{i}@example.com"]
+            for section in SECTIONS:
+                lines.append(section)
+                for _ in range(rng.randint(3, 6)):
+                    words = [rng.choice(FILLER) for _ in range(rng.randint(8, 14))]
+                    words.insert(rng.randrange(len(words)), rng.choice(skills))
+                    lines.append(" ".join(words))
+            page.insert_textbox(fitz.Rect(40, 40, 560, 800), "\n".join(lines), fontsize=9)
+        corpus.append(document.tobytes())
+        document.close()
+    return corpus
+
+
+def pypdf2_text(pdf_bytes, max_pages):
+    """The old extract_skills path: copy to a temp file, parse with PyPDF2"""
+    from PyPDF2 import PdfReader
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(pdf_bytes)
+        path = tmp.name
+    try:
+        text = ""
+        with open(path, "rb") as f:
+            for i, page in enumerate(PdfReader(f).pages):
+                if i >= max_pages:
+                    break
+                text += (page.extract_text() or "") + "\n"
+        return text
+    finally:
+        os.unlink(path)
+
+
+def engine_text(pdf_bytes, max_pages):
+    return extract_pdf(pdf_bytes, max_pages=max_pages).text
+
+
+def best_time(fn, corpus, max_pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for pdf_bytes in corpus:
+            fn(pdf_bytes, max_pages)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200, help="synthetic CVs when no corpus is given")
+    parser.add_argument("--corpus", help="directory of PDF files to use instead")
+    parser.add_argument("--max-pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = []
+        for path in sorted(glob.glob(os.path.join(args.corpus, "*.pdf"))):
+            with open(path, "rb") as f:
+                corpus.append(f.read())
+    else:
+        corpus = make_corpus(args.resumes, args.seed)
+    megabytes = sum(len(pdf) for pdf in corpus) / 1e6
+
+    old_time = best_time(pypdf2_text, corpus, args.max_pages, args.repeat)
+    new_time = best_time(engine_text, corpus, args.max_pages, args.repeat)
+
+    taxonomy = get_taxonomy()
+    agree = sum(
+        set(taxonomy.find(pypdf2_text(pdf, args.max_pages))) == set(taxonomy.find(engine_text(pdf, args.max_pages)))
+        for pdf in corpus
+    )
+
+    print(f"{len(corpus)} PDFs ({megabytes:.2f} MB), best of {args.repeat}")
+    print(f"  PyPDF2 + temp file : {len(corpus) / old_time:8.1f} docs/s  {old_time / len(corpus) * 1000:7.2f} ms/doc")
+    print(f"  PyMuPDF in memory  : {len(corpus) / new_time:8.1f} docs/s  {new_time / len(corpus) * 1000:7.2f} ms/doc"
+          f"  ({old_time / new_time:.1f}x)")
+    print(f"  same skills found on {agree}/{len(corpus)} documents")
+
+
+if __name__ == "__main__":
+    main()
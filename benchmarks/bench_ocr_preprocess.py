@@ -0,0 +1,179 @@
+"""
+Benchmark OCR preprocessing (adaptive DPI, binarize, deskew, crop) against the
+raw path (300 DPI grayscale pages, images as uploaded): OCR seconds per page
+and skill recall on a corpus of scanned CVs.
+
+The corpus is generated locally and deterministically on first use: synthetic
+CVs are rasterized at typical scan resolutions (150-300 DPI) with a few
+degrees of skew, low contrast and noise, and saved as image-only PDFs and
+phone-photo JPEGs next to a truth.json of the skills each one contains.
+
+    python benchmarks/bench_ocr_preprocess.py
+    python benchmarks/bench_ocr_preprocess.py --resumes 40 --rebuild
+    python benchmarks/bench_ocr_preprocess.py --no-ocr        # preprocessing only
+    python benchmarks/bench_ocr_preprocess.py --corpus path/to/scans   # needs truth.json
+
+truth.json maps file names to {"skills": [...]} and, for generated files,
+the "pages" each was scanned at ({"dpi", "skew"}).
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_document_engine import make_corpus  # noqa: E402
+from ocr_engine import get_ocr_engine  # noqa: E402
+from ocr_preprocess import prepare_image, prepare_pdf_page  # noqa: E402
+from skill_taxonomy import get_taxonomy  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_corpus")
+SCAN_DPIS = [150, 200, 300]
+RAW = {"enabled": False}
+
+
+def scan(gray, rng, skew):
+    """Make a clean render look scanned: skew, grey paper, faded ink, noise"""
+    import numpy as np
+    from PIL import Image
+    image = gray.rotate(skew, resample=Image.BILINEAR, expand=True, fillcolor=255)
+    pixels = np.asarray(image, dtype=np.float64)
+    pixels = 40 + pixels * (225 - 40) / 255.0
+    noise = np.random.default_rng(rng.randrange(2 ** 32)).normal(0, 12, pixels.shape)
+    return Image.fromarray(np.clip(pixels + noise, 0, 255).astype(np.uint8))
+
+
+def build_corpus(directory, n_resumes, seed):
+    import fitz  # PyMuPDF
+    from PIL import Image
+    rng = random.Random(seed)
+    taxonomy = get_taxonomy()
+    os.makedirs(directory, exist_ok=True)
+    truth = {}
+    for i, pdf_bytes in enumerate(make_corpus(n_resumes, seed)):
+        source = fitz.open(stream=pdf_bytes, filetype="pdf")
+        skills = sorted(set(taxonomy.find("\n".join(page.get_text() for page in source))))
+        pages = []
+        if i % 4 == 3:
+            # Phone photo of the first page: high resolution, colour, tilted
+            name = f"photo_{i:03d}.jpg"
+            skew = round(rng.uniform(-4, 4), 1)
+            skills = sorted(set(taxonomy.find(source[0].get_text())))
+            pix = source[0].get_pixmap(dpi=rng.choice([400, 500]), colorspace=fitz.csGRAY)
+            gray = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            scan(gray, rng, skew).convert("RGB").save(os.path.join(directory, name), quality=85)
+            pages.append({"dpi": None, "skew": -skew})
+        else:
+            name = f"scan_{i:03d}.pdf"
+            scanned = fitz.open()
+            for page in source:
+                dpi = rng.choice(SCAN_DPIS)
+                skew = round(rng.uniform(-3, 3), 1)
+                pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+                gray = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+                buffer = io.BytesIO()
+                scan(gray, rng, skew).save(buffer, format="JPEG", quality=75)
+                new_page = scanned.new_page(width=page.rect.width, height=page.rect.height)
+                new_page.insert_image(new_page.rect, stream=buffer.getvalue())
+                # rotate(skew) tilts counter-clockwise; straightening needs -skew
+                pages.append({"dpi": dpi, "skew": -skew})
+            scanned.save(os.path.join(directory, name), garbage=3, deflate=True)
+            scanned.close()
+        source.close()
+        truth[name] = {"skills": skills, "pages": pages}
+    with open(os.path.join(directory, "truth.json"), "w") as f:
+        json.dump(truth, f, indent=1)
+    return truth
+
+
+def prepared_pages(path, config):
+    """(image or None, info, preprocessing seconds) for every page of a corpus file"""
+    if path.endswith(".pdf"):
+        import fitz  # PyMuPDF
+        with fitz.open(path) as document:
+            page_count = document.page_count
+        for number in range(1, page_count + 1):
+            start = time.perf_counter()
+            image, info = prepare_pdf_page(path, number, config)
+            yield image, info, time.perf_counter() - start
+    else:
+        from PIL import Image
+        start = time.perf_counter()
+        with Image.open(path) as upload:
+            image, info = prepare_image(upload, config)
+        yield image, info, time.perf_counter() - start
+
+
+def run(directory, truth, config, ocr):
+    taxonomy = get_taxonomy()
+    totals = {"pages": 0, "prep": 0.0, "ocr": 0.0, "pixels": 0, "expected": 0, "found": 0, "skew_error": []}
+    for name, expected in sorted(truth.items()):
+        text = ""
+        for number, (image, info, seconds) in enumerate(prepared_pages(os.path.join(directory, name), config)):
+            totals["pages"] += 1
+            totals["prep"] += seconds
+            if image is None:
+                continue
+            totals["pixels"] += image.width * image.height
+            pages = expected.get("pages") or []
+            if "skew" in info and number < len(pages):
+                totals["skew_error"].append(abs(info["skew"] - pages[number]["skew"]))
+            if ocr is not None:
+                start = time.perf_counter()
+                text += ocr.image_to_string(image) + "\n"
+                totals["ocr"] += time.perf_counter() - start
+        if ocr is not None:
+            skills = set(expected["skills"])
+            totals["expected"] += len(skills)
+            totals["found"] += len(skills & set(taxonomy.find(text)))
+    return totals
+
+
+def report(label, totals, ocr):
+    pages = max(totals["pages"], 1)
+    line = (f"  {label:<10}: prep {totals['prep'] / pages * 1000:7.1f} ms/page"
+            f"  {totals['pixels'] / pages / 1e6:5.2f} MPx/page")
+    if ocr is not None:
+        recall = totals["found"] / totals["expected"] if totals["expected"] else 0.0
+        line += f"  OCR {totals['ocr'] / pages:6.2f} s/page  skill recall {recall:6.1%}"
+    if totals["skew_error"]:
+        line += f"  skew error {sum(totals['skew_error']) / len(totals['skew_error']):.2f} deg"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="directory with scans and truth.json")
+    parser.add_argument("--resumes", type=int, default=20, help="CVs to generate when building the corpus")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate the corpus")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-ocr", action="store_true", help="only time preprocessing (no tesseract needed)")
+    args = parser.parse_args()
+
+    truth_path = os.path.join(args.corpus, "truth.json")
+    if args.rebuild or not os.path.exists(truth_path):
+        if args.corpus != DEFAULT_CORPUS and not args.rebuild:
+            sys.exit(f"{truth_path} not found")
+        print(f"Building corpus of {args.resumes} scanned CVs in {args.corpus}")
+        truth = build_corpus(args.corpus, args.resumes, args.seed)
+    else:
+        with open(truth_path) as f:
+            truth = json.load(f)
+
+    ocr = None if args.no_ocr else get_ocr_engine(1)
+    raw = run(args.corpus, truth, RAW, ocr)
+    adaptive = run(args.corpus, truth, None, ocr)
+
+    print(f"{len(truth)} files, {raw['pages']} pages" + ("" if ocr is None else f", OCR backend {ocr.name}"))
+    report("raw 300dpi", raw, ocr)
+    report("adaptive", adaptive, ocr)
+    if ocr is not None and adaptive["ocr"]:
+        print(f"  OCR time {raw['ocr'] / adaptive['ocr']:.2f}x faster with preprocessing")
+
+
+if __name__ == "__main__":
+    main()
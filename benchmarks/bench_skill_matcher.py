@@ -0,0 +1,120 @@
+"""
+Benchmark the compiled taxonomy matcher against the previous three-pass skill extraction.
+
+    python benchmarks/bench_skill_matcher.py --skills 1000 5000 --resumes 100
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skill_taxonomy import TAXONOMY_CONFIG, compile_taxonomy  # noqa: E402
+
+FILLER = (
+    "worked on delivery of customer facing features with a cross functional team "
+    "owned releases improved reliability mentored juniors wrote documentation "
+    "reviewed code and coordinated with stakeholders across several time zones"
+).split()
+
+
+def make_taxonomy(n_skills, seed):
+    """The shipped taxonomy padded with synthetic skills, some multi-word, some with aliases"""
+    with open(TAXONOMY_CONFIG["path"], encoding="utf-8") as f:
+        data = json.load(f)
+    rng = random.Random(seed)
+    for i in range(max(n_skills - len(data["skills"]), 0)):
+        name = f"Tool{i}" if rng.random() < 0.6 else f"Platform {i} Suite"
+        aliases = [f"t{i}x"] if rng.random() < 0.3 else []
+        data["skills"].append({"id": name.lower(), "name": name, "category": "other", "aliases": aliases})
+    return data
+
+
+def make_resumes(data, n_resumes, words, seed):
+    rng = random.Random(seed)
+    terms = [s["name"] for s in data["skills"]] + [a for s in data["skills"] for a in s["aliases"]]
+    resumes = []
+    for _ in range(n_resumes):
+        tokens = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(rng.randint(5, 25)):
+            tokens.insert(rng.randrange(len(tokens)), rng.choice(terms) + rng.choice(["", ",", ".", ";"]))
+        resumes.append(" ".join(tokens))
+    return resumes
+
+
+def legacy_extractor(data):
+    """The pre-taxonomy extract_skills_robust passes, fed the same vocabulary"""
+    all_skills = {s["name"] for s in data["skills"]}
+    synonyms = {a: s["name"] for s in data["skills"] for a in s["aliases"]}
+    skill_patterns = {
+        term: re.compile(r"\b" + re.escape(term) + r"\b", re.IGNORECASE)
+        for term in list(all_skills) + list(synonyms)
+    }
+
+    def extract(text):
+        found = set()
+        text_lower = text.lower()
+        for skill in all_skills:
+            if skill.lower() in text_lower:
+                pattern = re.compile(r"\b" + re.escape(skill.lower()) + r"\b", re.IGNORECASE)
+                if pattern.search(text):
+                    found.add(skill)
+        for term, pattern in skill_patterns.items():
+            if pattern.search(text) and synonyms.get(term, term) not in found:
+                found.add(synonyms.get(term, term))
+        for skill in (s for s in all_skills if " " in s):
+            if skill.lower() in text_lower and skill not in found:
+                found.add(skill)
+        return found
+
+    return extract
+
+
+def throughput(fn, resumes, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in resumes:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--words", type=int, default=600, help="filler words per resume")
+    parser.add_argument("--repeat", type=int, default=1, help="the three-pass baseline takes minutes at 5k skills")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    for n_skills in args.skills:
+        data = make_taxonomy(n_skills, args.seed)
+        resumes = make_resumes(data, args.resumes, args.words, args.seed)
+        megabytes = sum(len(r) for r in resumes) / 1e6
+
+        start = time.perf_counter()
+        taxonomy = compile_taxonomy(data)
+        compile_ms = (time.perf_counter() - start) * 1000
+        legacy = legacy_extractor(data)
+
+        new_time = throughput(lambda text: {taxonomy.name(i) for i in taxonomy.find(text)}, resumes, args.repeat)
+        old_time = throughput(legacy, resumes, args.repeat)
+        agree = sum(
+            {taxonomy.name(i) for i in taxonomy.find(text)} == legacy(text) for text in resumes
+        )
+
+        print(f"{len(data['skills'])} skills, {len(taxonomy.lookup)} terms, "
+              f"{args.resumes} resumes ({megabytes:.2f} MB), matcher compiled in {compile_ms:.0f} ms")
+        print(f"  three-pass: {args.resumes / old_time:9.1f} resumes/s  {megabytes / old_time:7.2f} MB/s")
+        print(f"  compiled  : {args.resumes / new_time:9.1f} resumes/s  {megabytes / new_time:7.2f} MB/s"
+              f"  ({old_time / new_time:.1f}x)  same skills on {agree}/{args.resumes} resumes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Measure API cold start: time to import main, time until /health answers and
+time until /ready reports every engine loaded.
+
+    python benchmarks/measure_startup.py --runs 3
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_seconds():
+    """Fresh interpreter importing main, interpreter start-up subtracted"""
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None, None
+
+
+def serve_seconds(timeout):
+    """Start uvicorn; seconds until /health answers and until /ready returns 200"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    health = ready = None
+    engines = {}
+    try:
+        while time.perf_counter() - start < timeout and ready is None:
+            if health is None and get(f"{base}/health")[0] == 200:
+                health = time.perf_counter() - start
+            if health is not None:
+                status, body = get(f"{base}/ready")
+                if status == 200:
+                    ready = time.perf_counter() - start
+                    engines = body.get("engines", {})
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return health, ready, engines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120, help="seconds to wait for /ready per run")
+    args = parser.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    print(f"import main     : {statistics.median(imports) * 1000:8.0f} ms (median of {args.runs})")
+
+    healths, readies = [], []
+    for _ in range(args.runs):
+        health, ready, engines = serve_seconds(args.timeout)
+        if health is not None:
+            healths.append(health)
+        if ready is not None:
+            readies.append(ready)
+    if healths:
+        print(f"/health answers : {statistics.median(healths) * 1000:8.0f} ms after launch")
+    else:
+        print("/health never answered")
+    if readies:
+        print(f"/ready is 200   : {statistics.median(readies) * 1000:8.0f} ms after launch")
+        for name, status in engines.items():
+            detail = f"{status.get('seconds', 0) * 1000:.0f} ms" if "seconds" in status else ""
+            print(f"  {name:20s} {status['state']:8s} {detail}  {status.get('error', '')}")
+    else:
+        print(f"/ready not 200 within {args.timeout:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger("document_engine")
+
+# ============================================
+# DOCUMENT ENGINE CONFIGURATION
+# ============================================
+DOCUMENT_CONFIG = {
+    # Pages past this are never parsed; page_count still reports the real total
+    "max_pages": int(os.getenv("MAX_PDF_PAGES", 50)),
+}
+
+# ============================================
+# SHARED PDF EXTRACTION (PyMuPDF)
+# ============================================
+# One PDF stack for every resume code path. Documents are opened straight
+# from the uploaded bytes (or the upload's spool file) without another temp
+# copy, only the first max_pages pages are loaded, and every artifact a caller
+# asks for (text, positioned spans, tables, image metadata) comes out of one
+# open and one walk over the pages. Table detection is the expensive part and
+# only runs when requested; images are described from the page's image list
+# without decoding them. PyMuPDF is imported on first use so importing this
+# module stays cheap.
+
+PdfSource = Union[bytes, bytearray, memoryview, str]
+
+
+@dataclass
+class DocumentPage:
+    number: int                                   # 1-based
+    text: str
+    seconds: float                                # time spent on this page
+    spans: List[Dict] = field(default_factory=list)
+    tables: List = field(default_factory=list)    # pandas DataFrames
+    images: List[Dict] = field(default_factory=list)
+
+
+@dataclass
+class DocumentContent:
+    page_count: int                               # pages in the file
+    pages: List[DocumentPage]                     # the first max_pages of them
+    metadata: Dict
+
+    @property
+    def text(self) -> str:
+        return "\n".join(page.text for page in self.pages)
+
+
+def open_pdf(source: PdfSource):
+    """Open a PDF from bytes in memory or from a file path"""
+    import fitz  # PyMuPDF
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def pdf_metadata(document) -> Dict:
+    doc_metadata = document.metadata or {}
+    if not doc_metadata:
+        return {}
+    return {
+        "title": doc_metadata.get("title", ""),
+        "author": doc_metadata.get("author", ""),
+        "subject": doc_metadata.get("subject", ""),
+        "keywords": doc_metadata.get("keywords", ""),
+        "creator": doc_metadata.get("creator", ""),
+        "producer": doc_metadata.get("producer", ""),
+        "creation_date": doc_metadata.get("creationDate", ""),
+        "modification_date": doc_metadata.get("modDate", "")
+    }
+
+
+def _page_spans(number: int, text_dict: Dict) -> List[Dict]:
+    return [
+        {
+            "page": number,
+            "text": span["text"],
+            "bbox": span["bbox"],
+            "font": span["font"],
+            "size": span["size"],
+            "flags": span["flags"]
+        }
+        for block in text_dict["blocks"] if "lines" in block
+        for line in block["lines"]
+        for span in line["spans"]
+    ]
+
+
+# Image stream filter -> the file extension extract_image() would report
+IMAGE_FORMATS = {
+    "DCTDecode": "jpeg",
+    "JPXDecode": "jpx",
+    "JBIG2Decode": "jb2",
+    "CCITTFaxDecode": "tiff",
+}
+
+
+def _page_images(page, number: int) -> List[Dict]:
+    """Image metadata from the page's image list; no image stream is read or decoded"""
+    return [
+        {
+            "page": number,
+            "index": img_index,
+            "xref": xref,
+            "width": width,
+            "height": height,
+            "format": IMAGE_FORMATS.get(image_filter, "png"),
+        }
+        for img_index, (xref, _smask, width, height, _bpc, _colorspace, _alt, _name, image_filter, *_)
+        in enumerate(page.get_images())
+    ]
+
+
+def _page_tables(page, number: int) -> List:
+    # A page whose layout defeats table detection shouldn't fail the whole document
+    try:
+        return [table.to_pandas() for table in page.find_tables().tables]
+    except Exception as e:
+        logger.warning("Table detection failed on page %d: %s", number, e)
+        return []
+
+
+def extract_pdf(source: PdfSource, max_pages: Optional[int] = None,
+                spans: bool = False, tables: bool = False, images: bool = False) -> DocumentContent:
+    """
+    Text of the first max_pages pages, plus positioned text spans, tables and
+    image metadata when asked for. Raises on documents PyMuPDF cannot open.
+    """
+    import fitz  # PyMuPDF
+    max_pages = DOCUMENT_CONFIG["max_pages"] if max_pages is None else max_pages
+    document = open_pdf(source)
+    try:
+        pages = []
+        for index in range(min(document.page_count, max_pages)):
+            start = time.perf_counter()
+            page = document.load_page(index)
+            number = index + 1
+            if spans:
+                # One layout pass serves both the plain text and the spans;
+                # lines are joined the way get_text() joins them. Image blocks
+                # are left out so embedded images are not decoded here.
+                text_dict = page.get_text("dict", flags=fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES)
+                text = "".join(
+                    "".join(span["text"] for span in line["spans"]) + "\n"
+                    for block in text_dict["blocks"] if "lines" in block
+                    for line in block["lines"]
+                )
+                page_spans = _page_spans(number, text_dict)
+            else:
+                text = page.get_text()
+                page_spans = []
+            page_tables = _page_tables(page, number) if tables else []
+            page_images = _page_images(page, number) if images else []
+            pages.append(DocumentPage(
+                number=number,
+                text=text,
+                seconds=time.perf_counter() - start,
+                spans=page_spans,
+                tables=page_tables,
+                images=page_images,
+            ))
+        return DocumentContent(page_count=document.page_count, pages=pages, metadata=pdf_metadata(document))
+    finally:
+        document.close()
@@ -0,0 +1,88 @@
+import logging
+import os
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger("recommendation_logger")
+
+# ============================================
+# LOADER CONFIGURATION
+# ============================================
+# Only the columns the recommender actually reads
+RECOMMENDER_COLUMNS = (
+    "id",
+    "user_id",
+    "employee_id",
+    "skills",
+    "job_title",
+    "status",
+    "experience_level",
+    "total_available_hours",
+)
+
+# Keep below PostgREST's max-rows (1000 by default) so no page is silently truncated
+PAGE_SIZE = int(os.getenv("EMPLOYEE_PAGE_SIZE", 500))
+
+# ============================================
+# KEYSET-PAGINATED STREAMING LOADER
+# ============================================
+async def iter_table_pages(
+    client,
+    table: str,
+    columns: Sequence[str],
+    filters: Optional[Callable] = None,
+    page_size: int = PAGE_SIZE,
+) -> AsyncIterator[List[Dict]]:
+    """
+    Yield rows of `table` page by page from an async Supabase client, ordered by id.
+    Each page continues after the last id of the previous one (keyset pagination),
+    so memory stays bounded by page_size and no row is lost to the max-rows cap.
+    `filters` receives and returns the query builder of every page.
+    """
+    select = ",".join(columns)
+    last_id = None
+    pages = rows = 0
+
+    while True:
+        query = client.table(table).select(select)
+        if filters is not None:
+            query = filters(query)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+
+        page = (await query.order("id").limit(page_size).execute()).data or []
+        if not page:
+            break
+
+        pages += 1
+        rows += len(page)
+        yield page
+
+        if len(page) < page_size:
+            break
+        last_id = page[-1]["id"]
+
+    logger.info("Loaded %d %s rows in %d pages", rows, table, pages)
+
+
+async def iter_employee_pages(
+    client,
+    columns: Sequence[str] = RECOMMENDER_COLUMNS,
+    only_available: bool = True,
+    updated_after: Optional[str] = None,
+    ids: Optional[Iterable] = None,
+    page_size: int = PAGE_SIZE,
+    watermark_column: str = "updated_at",
+) -> AsyncIterator[List[Dict]]:
+    """Yield user_details rows page by page, optionally filtered by status, watermark or id"""
+    def filters(query):
+        if only_available:
+            # Case-insensitive exact match, same as the client-side status check
+            query = query.ilike("status", "available")
+        if updated_after is not None:
+            query = query.gt(watermark_column, updated_after)
+        if ids is not None:
+            query = query.in_("id", list(ids))
+        return query
+
+    async for page in iter_table_pages(client, "user_details", columns, filters, page_size):
+        yield page
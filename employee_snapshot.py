@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+from employee_loader import RECOMMENDER_COLUMNS, iter_employee_pages
+from skill_matrix import SkillMatrix, build_skill_matrix
+
+logger = logging.getLogger("recommendation_logger")
+
+# ============================================
+# SNAPSHOT CONFIGURATION
+# ============================================
+SNAPSHOT_CONFIG = {
+    # Minimum time between two sync round trips to Supabase
+    "refresh_interval_seconds": float(os.getenv("EMPLOYEE_SNAPSHOT_REFRESH_SECONDS", 30)),
+    # Incremental sync cannot see deleted rows, so reload everything now and then
+    "full_resync_seconds": float(os.getenv("EMPLOYEE_SNAPSHOT_RESYNC_SECONDS", 3600)),
+    "watermark_column": "updated_at",
+}
+
+# Postgres undefined_column, and PostgREST's "column not in schema cache"
+MISSING_COLUMN_CODES = ("42703", "PGRST204")
+
+
+def _is_missing_column(error: Exception, column: str) -> bool:
+    return (isinstance(error, APIError) and error.code in MISSING_COLUMN_CODES
+            and column in (error.message or ""))
+
+# ============================================
+# PROCESS-RESIDENT EMPLOYEE SNAPSHOT
+# ============================================
+class EmployeeSnapshot:
+    """
+    Pre-parsed, pre-normalized copy of user_details kept in process memory.
+    Refreshes incrementally from rows whose updated_at is newer than the last sync.
+    Used from the event loop only: state is swapped in without awaiting in between,
+    so readers never see a half-applied sync.
+    """
+
+    def __init__(self, prepare: Callable[[Dict], Dict], config: Optional[Dict] = None):
+        self._prepare = prepare
+        self._config = {**SNAPSHOT_CONFIG, **(config or {})}
+        self._refresh_lock = asyncio.Lock()
+        self._records: Dict = {}
+        self._stale_ids: set = set()
+        self._watermark: Optional[str] = None
+        self._track_watermark = True
+        self._last_refresh = 0.0
+        self._last_full_sync = 0.0
+        self._synced = False
+        self._view: Optional[Tuple[List[Dict], SkillMatrix]] = None
+
+    # ---------- Sync ----------
+    async def refresh(self, client, force: bool = False) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        """
+        Bring the snapshot up to date. Returns (old, new) record pairs that changed;
+        an empty list means nothing was fetched or nothing changed.
+        """
+        async with self._refresh_lock:
+            now = time.monotonic()
+            if (not force and self._synced and not self._stale_ids
+                    and now - self._last_refresh < self._config["refresh_interval_seconds"]):
+                return []
+
+            needs_full = (
+                not self._synced
+                or self._watermark is None
+                or now - self._last_full_sync >= self._config["full_resync_seconds"]
+            )
+            if needs_full:
+                changes = await self._full_sync(client)
+                self._last_full_sync = now
+            else:
+                changes = await self._incremental_sync(client)
+
+            self._last_refresh = now
+            self._synced = True
+            if changes:
+                self._view = None
+            return changes
+
+    async def _load(self, client, **filters) -> AsyncIterator[List[Dict]]:
+        """Stream pages, dropping the watermark column if the table does not have it"""
+        column = self._config["watermark_column"]
+        columns = RECOMMENDER_COLUMNS + ((column,) if self._track_watermark else ())
+        yielded = False
+        try:
+            async for page in iter_employee_pages(client, columns=columns, watermark_column=column, **filters):
+                yielded = True
+                yield page
+        except Exception as e:
+            # Anything else (network, timeouts) propagates so the next refresh retries
+            if yielded or not self._track_watermark or not _is_missing_column(e, column):
+                raise
+            logger.warning("Employee snapshot: %s unavailable (%s); incremental sync disabled", column, e)
+            self._track_watermark = False
+            async for page in iter_employee_pages(client, columns=RECOMMENDER_COLUMNS, watermark_column=column, **filters):
+                yield page
+
+    async def _fetch(self, client, **filters) -> List[Dict]:
+        return [row async for page in self._load(client, **filters) for row in page]
+
+    async def _full_sync(self, client) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        # Only available employees can ever be recommended, so filter server-side
+        rows = await self._fetch(client, only_available=True)
+
+        previous = self._records
+        records: Dict = {}
+        changes = self._apply(rows, previous, records)
+        for row_id, old in previous.items():
+            if row_id not in records:
+                changes.append((old, None))
+
+        self._records = records
+        self._stale_ids.clear()
+        self._watermark = self._max_watermark(rows, None)
+        logger.info("Employee snapshot: full sync loaded %d rows", len(records))
+        return changes
+
+    async def _incremental_sync(self, client) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        # No status filter here: rows that became unavailable must be seen too
+        rows = await self._fetch(client, only_available=False, updated_after=self._watermark)
+
+        stale = list(self._stale_ids)
+        if stale:
+            rows += await self._fetch(client, only_available=False, ids=stale)
+
+        changes = []
+        # Invalidated rows that no longer exist are dropped
+        fetched_ids = {row.get("id") for row in rows}
+        for row_id in stale:
+            self._stale_ids.discard(row_id)
+            if row_id not in fetched_ids and row_id in self._records:
+                changes.append((self._records.pop(row_id), None))
+
+        if rows:
+            logger.info("Employee snapshot: incremental sync picked up %d rows", len(rows))
+        changes += self._apply(rows, self._records, self._records)
+        self._watermark = self._max_watermark(rows, self._watermark)
+        return changes
+
+    def _apply(self, rows: Iterable[Dict], previous: Dict, target: Dict) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        changes = []
+        for row in rows:
+            record = self._prepare(row)
+            old = previous.get(record["id"])
+            target[record["id"]] = record
+            if old is None or old != record:
+                changes.append((old, record))
+        return changes
+
+    def _max_watermark(self, rows: Iterable[Dict], current: Optional[str]) -> Optional[str]:
+        column = self._config["watermark_column"]
+        values = [row[column] for row in rows if row.get(column)]
+        if not values:
+            # A full sync without the column means incremental sync is unavailable
+            return current
+        latest = max(values)
+        return latest if current is None or latest > current else current
+
+    # ---------- Invalidation ----------
+    def invalidate(self, user_ids: Optional[Iterable] = None):
+        """Force the next refresh to re-fetch the given rows, or everything when no ids are given"""
+        if user_ids is None:
+            self._synced = False
+            self._watermark = None
+            self._view = None
+            logger.info("Employee snapshot invalidated")
+        else:
+            self._stale_ids.update(user_ids)
+            logger.info("Employee snapshot: %d rows marked stale", len(self._stale_ids))
+
+    # ---------- Read access ----------
+    def eligible(self) -> Tuple[List[Dict], SkillMatrix]:
+        """Eligible employees and their skill matrix, rebuilt only after a change"""
+        if self._view is None:
+            employees = [r for r in self._records.values() if r["eligible"]]
+            skill_matrix = build_skill_matrix(
+                [emp["skills_normalized"] for emp in employees],
+                [emp["experience_level"] for emp in employees]
+            )
+            self._view = (employees, skill_matrix)
+        return self._view
+
+    def records(self) -> List[Dict]:
+        """Every prepared record, eligible or not"""
+        return list(self._records.values())
+
+    def stats(self) -> Dict:
+        return {
+            "synced": self._synced,
+            "employees": len(self._records),
+            "eligible": sum(1 for r in self._records.values() if r["eligible"]),
+            "watermark": self._watermark,
+            "seconds_since_refresh": round(time.monotonic() - self._last_refresh, 2) if self._synced else None,
+        }
@@ -1,36 +1,52 @@
 import os
 import re
-import tempfile
+import json
 import logging
 import asyncio
 import concurrent.futures
+import multiprocessing
 import time
+from contextvars import ContextVar
+from concurrent.futures.process import BrokenProcessPool
 from functools import lru_cache
-from fastapi import APIRouter, UploadFile, File
-from pdf2image import convert_from_path
-import pytesseract
-from docx import Document
-from typing import List
-from io import BytesIO
-from PIL import Image
-import spacy
-import PyPDF2
-from PyPDF2 import PdfReader
-import gc
+from importlib.metadata import version as package_version
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from skill_taxonomy import get_taxonomy
+from extraction_cache import get_extraction_cache
+from document_engine import DOCUMENT_CONFIG, extract_pdf
+from ocr_engine import get_ocr_engine, ocr_backend_name
+from ocr_preprocess import PREPROCESS_CONFIG, prepare_image, prepare_pdf_page, preprocess_signature
+from upload_ingest import SpooledUpload, UploadTooLarge, check_file_count, spool_upload
 
 # ---------- CREATE ROUTER ----------
 router = APIRouter()
 
 # ---------- CONFIG ----------
-pytesseract.pytesseract.tesseract_cmd = os.getenv("TESSERACT_CMD", "/usr/bin/tesseract")
 POPPLER_PATH = os.getenv("POPPLER_PATH", "/usr/bin")
 
 # ---------- OPTIMIZATION CONFIG ----------
 PROCESSING_CONFIG = {
     "max_workers": min(4, os.cpu_count() or 1),
-    "max_pdf_pages": 50,
+    "max_pdf_pages": DOCUMENT_CONFIG["max_pages"],
     "chunk_size": 10,
     "timeout": 300,
+    # Uploads waiting on top of the busy workers; more callers wait for a free slot
+    "max_queued": int(os.getenv("EXTRACTION_MAX_QUEUED", 8)),
+    # spawn: workers do not inherit the event loop or open HTTP clients
+    "start_method": os.getenv("EXTRACTION_START_METHOD", "spawn"),
+    # Pages rasterized + OCR'd concurrently inside one extraction worker; each
+    # page holds one rendered image, so this also bounds memory per document.
+    # Default: the cores left per worker, at least 2 so rendering overlaps OCR
+    "ocr_threads": int(os.getenv("OCR_THREADS", max(2, (os.cpu_count() or 1) // min(4, os.cpu_count() or 1)))),
+    # A page whose text layer has fewer characters than this is treated as a scan
+    "min_page_text_chars": int(os.getenv("MIN_PAGE_TEXT_CHARS", 40)),
+    # NER runs over line-aligned chunks of this size and stops once every
+    # missing field is found; contact details sit at the top of a CV
+    "nlp_chunk_chars": int(os.getenv("NLP_CHUNK_CHARS", 4000)),
+    "nlp_batch_size": int(os.getenv("NLP_BATCH_SIZE", 4)),
+    "nlp_max_chars": 100000,
 }
 
 # ---------- LOGGING CONFIG ----------
@@ -42,34 +58,9 @@ logger = logging.getLogger("ocr_nlp_logger")
 
 router = APIRouter()
 
-# ---------- SKILLS / FRAMEWORKS ----------
-SKILL_KEYWORDS = [
-    "Python", "Java", "JavaScript", "React", "SQL", "NoSQL",
-    "API Design", "Project Management", "Agile", "Scrum", "System Architecture",
-    "Leadership", "Teamwork", "Communication", "Machine Learning"
-]
-
-SKILL_SYNONYMS = {
-    "JS": "JavaScript",
-    "PM": "Project Management",
-    "ML": "Machine Learning",
-    "DB": "SQL",
-}
-
-COMMON_FRAMEWORKS = [
-    "Django", "Flask", "FastAPI", "Vue", "Angular",
-    "Node.js", "Express", "Spring Boot"
-]
-
-TECH_TERMS = {
-    "Python", "Java", "JavaScript", "React", "SQL", "NoSQL",
-    "Django", "Flask", "FastAPI", "Vue", "Angular", "Node.js", "Express",
-    "Spring Boot", "PyTorch", "TensorFlow", "Keras", "Docker", "Kubernetes",
-    "Terraform", "AWS", "GCP", "Azure", "MongoDB", "PostgreSQL", "MySQL"
-}
-
-# Combine all skill-related terms for better matching
-ALL_SKILLS_SET = set(SKILL_KEYWORDS) | set(COMMON_FRAMEWORKS) | TECH_TERMS | set(SKILL_SYNONYMS.values())
+# ---------- SKILLS ----------
+# Canonical skills, aliases and categories live in skill_taxonomy.json,
+# shared with the recommender and reloaded when the file changes
 
 # ---------- PRE-COMPILED REGEX PATTERNS ----------
 HEADING_PATTERNS = [re.compile(rf"\b{re.escape(h)}\b", re.IGNORECASE) for h in [
@@ -85,24 +76,177 @@ FULL_NAME_PATTERN = re.compile(r"Full Name[:\s]*(.+)", re.IGNORECASE)
 EMPLOYEE_ID_PATTERN = re.compile(r"(Employee ID|ID)[:\s]*(.+)", re.IGNORECASE)
 LOCATION_PATTERN = re.compile(r"Location[:\s]*(.+)", re.IGNORECASE)
 
-# Improved skill patterns with case-insensitive matching
-SKILL_PATTERNS = {}
-ALL_SKILL_TERMS = SKILL_KEYWORDS + COMMON_FRAMEWORKS + list(SKILL_SYNONYMS.keys())
-for term in ALL_SKILL_TERMS:
-    SKILL_PATTERNS[term] = re.compile(r'\b' + re.escape(term) + r'\b', re.IGNORECASE)
-
 # ---------- CACHED NLP MODEL ----------
+NLP_MODEL = "en_core_web_sm"
+# Only the entity recognizer is used. In the small English pipeline ner has its
+# own embedding layer, so the shared tok2vec and everything feeding the tagger
+# and parser can be left out.
+NLP_EXCLUDE = [c for c in os.getenv("NLP_EXCLUDE", "tok2vec,tagger,parser,attribute_ruler,lemmatizer,senter").split(",") if c]
+
+# Personal info fields filled from named entities when the regexes miss them
+NLP_FIELDS = {"Full Name": "PERSON", "Location": "GPE", "Organization": "ORG"}
+
 @lru_cache(maxsize=1)
 def get_nlp_model():
     """Cache the NLP model to avoid reloading"""
+    import spacy
     logger.info("Loading spaCy model...")
-    return spacy.load("en_core_web_sm")
+    return spacy.load(NLP_MODEL, exclude=NLP_EXCLUDE)
+
+# ---------- LAZY ENGINE IMPORTS ----------
+# The OCR, PDF, DOCX and NLP libraries take seconds to import and are only used
+# inside extraction workers, so they are imported where they are used and the
+# API process never loads them.
+def get_ocr():
+    """This worker's OCR engine, sized for ocr_threads pages at once"""
+    return get_ocr_engine(PROCESSING_CONFIG["ocr_threads"])
+
+def import_extraction_engines():
+    """Import every extraction library up front (worker warm-up)"""
+    import docx  # noqa: F401
+    import fitz  # noqa: F401
+    import pdf2image  # noqa: F401
+    import PIL.Image  # noqa: F401
+    get_ocr()
+
+def _text_chunks(text, size):
+    """Split text into chunks of about `size` characters, on line boundaries"""
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            newline = text.rfind("\n", start, end)
+            if newline > start:
+                end = newline + 1
+        yield text[start:end]
+        start = end
+
+def find_first_entities(text, labels):
+    """
+    First entity of each label, scanning the text chunk by chunk through nlp.pipe
+    and stopping as soon as every label has been seen.
+    """
+    labels = set(labels)
+    found = {}
+    if not labels:
+        return found
+    chunks = _text_chunks(text[:PROCESSING_CONFIG["nlp_max_chars"]], PROCESSING_CONFIG["nlp_chunk_chars"])
+    for doc in get_nlp_model().pipe(chunks, batch_size=PROCESSING_CONFIG["nlp_batch_size"]):
+        for ent in doc.ents:
+            if ent.label_ in labels and ent.label_ not in found:
+                found[ent.label_] = ent.text
+        if len(found) == len(labels):
+            break
+    return found
+
+# ---------- RESULT CACHE ----------
+@lru_cache(maxsize=None)
+def _package_version(name):
+    """Installed version without importing the package"""
+    try:
+        return package_version(name)
+    except Exception:
+        return "unknown"
+
+# Bump when a change to the extraction code alters results for the same file
+EXTRACTOR_VERSION = "4"
+
+def extraction_cache_scope(filename):
+    """Everything besides the file bytes an extraction result depends on"""
+    return (
+        "extract_skills",
+        # The same bytes go through a different extractor (or none) per suffix
+        os.path.splitext(filename)[1].lower(),
+        EXTRACTOR_VERSION,
+        get_taxonomy().version,
+        f"{NLP_MODEL}@{_package_version('spacy')}",
+        PROCESSING_CONFIG["max_pdf_pages"],
+        PROCESSING_CONFIG["min_page_text_chars"],
+        ocr_backend_name(),
+        preprocess_signature(),
+    )
+
+# ------------------------------------------------------
+#   SHARED PROCESS POOL FOR CPU-BOUND EXTRACTION
+# ------------------------------------------------------
+# OCR, PDF parsing and spaCy hold the GIL (or block in C) for seconds, so they
+# run in worker processes; the event loop only reads uploads and awaits results.
+_process_pool = None
+_pool_slots = None
+
+def _init_extraction_worker():
+    """Load the libraries and spaCy model once per worker instead of once per document"""
+    # Page-level parallelism replaces tesseract's own OpenMP threads
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    try:
+        import_extraction_engines()
+        get_nlp_model()
+    except Exception as e:
+        # An initializer failure would break the whole pool; let documents report it instead
+        logger.error(f"Could not preload extraction engines in worker: {e}")
+
+def _worker_status():
+    return {
+        "pid": os.getpid(),
+        "nlp_model": get_nlp_model.cache_info().currsize > 0,
+        "ocr_backend": get_ocr().name,
+    }
 
-nlp = get_nlp_model()
+def get_process_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=PROCESSING_CONFIG["max_workers"],
+            mp_context=multiprocessing.get_context(PROCESSING_CONFIG["start_method"]),
+            initializer=_init_extraction_worker,
+        )
+        logger.info(f"Started extraction pool with {PROCESSING_CONFIG['max_workers']} workers")
+    return _process_pool
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+async def warm_process_pool():
+    """
+    Start every extraction worker now instead of on the first upload. Each one
+    runs the initializer (imports + spaCy model) before answering.
+    """
+    pool = get_process_pool()
+    futures = [asyncio.wrap_future(pool.submit(_worker_status)) for _ in range(PROCESSING_CONFIG["max_workers"])]
+    statuses = await asyncio.gather(*futures)
+    workers = {status["pid"]: status for status in statuses}
+    if not all(status["nlp_model"] for status in workers.values()):
+        raise RuntimeError(f"spaCy model '{NLP_MODEL}' failed to load in extraction workers")
+    return {"workers": len(workers), "ocr_backends": sorted({status["ocr_backend"] for status in workers.values()})}
+
+async def run_in_process_pool(func, *args):
+    """Run func(*args) in the shared pool, with at most workers + max_queued submissions outstanding"""
+    global _pool_slots, _process_pool
+    if _pool_slots is None:
+        _pool_slots = asyncio.Semaphore(PROCESSING_CONFIG["max_workers"] + PROCESSING_CONFIG["max_queued"])
+    async with _pool_slots:
+        pool = get_process_pool()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool for later requests.
+            # Other submissions to the broken pool fail here too, and must not shut
+            # down a pool someone already replaced it with.
+            if _process_pool is pool:
+                logger.error("Extraction worker crashed; restarting the pool")
+                _process_pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
 
 # ------------------------------------------------------
 #   TIMING DECORATOR FOR DEBUGGING
 # ------------------------------------------------------
+# Stage durations of the document being extracted, when someone is collecting them
+_stage_timings: ContextVar = ContextVar("stage_timings", default=None)
+
 def timing_decorator(func_name=""):
     def decorator(func):
         def wrapper(*args, **kwargs):
@@ -115,85 +259,140 @@ def timing_decorator(func_name=""):
             duration = end_time - start_time
             logger.info(f"⏱️  COMPLETED {func_name or func.__name__} in {duration:.2f} seconds")
             
+            timings = _stage_timings.get()
+            if timings is not None:
+                name = func_name or func.__name__
+                timings[name] = round(timings.get(name, 0) + duration, 3)
+            
             return result
         return wrapper
     return decorator
 
+# ------------------------------------------------------
+#   STREAMING PAGE OCR
+# ------------------------------------------------------
+def ocr_pdf_page(pdf_path, page_number):
+    """
+    Render a single page at the DPI its text size needs, deskew, binarize and
+    crop it, then OCR it; only this page's image is ever in memory.
+    Returns (text, preprocessing info).
+    """
+    try:
+        image, info = prepare_pdf_page(pdf_path, page_number)
+        images = [image] if image is not None else []
+    except Exception as e:
+        # PyMuPDF could not render the page; poppler may still
+        logger.info(f"Rendering page {page_number} with poppler: {e}")
+        from pdf2image import convert_from_path
+        rendered = convert_from_path(
+            pdf_path,
+            poppler_path=POPPLER_PATH,
+            first_page=page_number,
+            last_page=page_number,
+            dpi=PREPROCESS_CONFIG["default_dpi"],
+            grayscale=True
+        )
+        prepared = [prepare_image(img) for img in rendered]
+        images = [img for img, _ in prepared if img is not None]
+        info = prepared[0][1] if prepared else {}
+    ocr = get_ocr()
+    page_text = "".join(ocr.image_to_string(img) for img in images)
+    logger.debug(f"OCR page {page_number} extracted {len(page_text)} characters ({info})")
+    return page_text, info
+
+def _timed_ocr_page(pdf_path, page_number):
+    start = time.perf_counter()
+    page_text, info = ocr_pdf_page(pdf_path, page_number)
+    return page_text, time.perf_counter() - start, info
+
+@timing_decorator("Page OCR")
+def ocr_pdf_pages(pdf_path, page_numbers):
+    """
+    OCR pages concurrently. OCR releases the GIL (tesserocr) or runs as a
+    subprocess (pytesseract), so threads overlap it with the next page's
+    rendering. Each thread renders its own page right before OCR, so at most
+    ocr_threads rasterized pages exist at any time, whatever the page count.
+    Returns {page_number: (text, seconds, preprocessing info)}.
+    """
+    page_numbers = list(page_numbers)
+    if not page_numbers:
+        return {}
+    threads = max(1, min(PROCESSING_CONFIG["ocr_threads"], len(page_numbers)))
+    logger.info(f"OCR of {len(page_numbers)} pages with {threads} threads")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        results = executor.map(lambda page_number: _timed_ocr_page(pdf_path, page_number), page_numbers)
+        return dict(zip(page_numbers, results))
+
 # ------------------------------------------------------
 #   FIXED DUAL APPROACH: PDF TEXT EXTRACTION WITH PROPER FILE HANDLING
 # ------------------------------------------------------
 @timing_decorator("PDF Text Extraction")
-def extract_text_from_pdf_fixed(pdf_path):
-    """Extract text from PDF using both direct extraction and OCR fallback with proper file handling"""
-    logger.info(f"Starting dual PDF extraction for: {pdf_path}")
-    
-    text = ""
-    
-    # First attempt: Direct text extraction (for text-based PDFs)
-    direct_text = ""
+def extract_pdf_pages(pdf_path):
+    """
+    Extract text page by page: pages with a usable text layer are read directly,
+    image-only pages (scans, photographed certificates) are OCR'd. Returns the
+    text and one report per page: {"page", "strategy", "characters", "seconds"},
+    plus "preprocess" (DPI, skew, line height) for pages that went through OCR.
+    strategy is "text", "ocr", "empty" (nothing legible) or "failed" (OCR raised).
+    """
+    logger.info(f"Starting per-page PDF extraction for: {pdf_path}")
+    max_pages = PROCESSING_CONFIG["max_pdf_pages"]
+    min_chars = PROCESSING_CONFIG["min_page_text_chars"]
+
+    # First pass: native text layer, which also classifies each page
+    page_texts = {}
+    pages = []
     try:
-        logger.info("Attempting direct text extraction from PDF...")
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PdfReader(file)
-            
-            for i, page in enumerate(pdf_reader.pages):
-                if i >= PROCESSING_CONFIG["max_pdf_pages"]:
-                    break
-                page_text = page.extract_text()
-                if page_text.strip():
-                    direct_text += page_text + "\n"
-            
-            logger.info(f"Direct extraction got {len(direct_text)} characters")
-            
+        for page in extract_pdf(pdf_path, max_pages=max_pages).pages:
+            has_text = len(page.text.strip()) >= min_chars
+            page_texts[page.number] = page.text
+            pages.append({
+                "page": page.number,
+                "strategy": "text" if has_text else "ocr",
+                "characters": len(page.text.strip()) if has_text else 0,
+                "seconds": round(page.seconds, 3),
+            })
     except Exception as e:
         logger.info(f"Direct extraction failed: {e}")
-        direct_text = ""
 
-    # Check if direct extraction got meaningful text
-    if len(direct_text.strip()) > 100:  # If we got substantial text
-        text = direct_text
-        logger.info("Using direct text extraction (text-based PDF)")
-    else:
-        logger.info("Direct extraction insufficient - trying OCR for scanned PDF...")
-        
-        # Second attempt: OCR extraction (for scanned PDFs)
+    if not pages:
+        # PyMuPDF could not parse the file at all; poppler may still render it
         try:
-            images = convert_from_path(
-                pdf_path, 
-                poppler_path=POPPLER_PATH,
-                first_page=1, 
-                last_page=PROCESSING_CONFIG["max_pdf_pages"],
-                dpi=300,
-                grayscale=True
-            )
-            logger.info(f"PDF converted into {len(images)} image pages for OCR")
-
-            # Process pages with OCR
-            ocr_text = ""
-            for i, img in enumerate(images):
-                logger.debug(f"OCR processing page {i + 1}")
-                
-                # Use optimized OCR configuration
-                page_text = pytesseract.image_to_string(
-                    img, 
-                    config='--psm 6 -c preserve_interword_spaces=1',
-                    lang='eng'
-                )
-                
-                ocr_text += page_text + "\n"
-                logger.debug(f"OCR page {i+1} extracted {len(page_text)} characters")
-                
-                # Explicitly clean up image to free memory
-                del img
-                if i % 5 == 0:  # Force garbage collection periodically
-                    gc.collect()
-            
-            text = ocr_text
-            logger.info(f"OCR extraction completed with {len(text)} characters")
-            
+            from pdf2image import pdfinfo_from_path
+            num_pages = int(pdfinfo_from_path(pdf_path, poppler_path=POPPLER_PATH)["Pages"])
+        except Exception as e:
+            logger.error(f"Could not read page count: {e}")
+            num_pages = 0
+        pages = [
+            {"page": n, "strategy": "ocr", "characters": 0, "seconds": 0.0}
+            for n in range(1, min(num_pages, max_pages) + 1)
+        ]
+
+    # Second pass: OCR only the image-only pages
+    ocr_pages = [report for report in pages if report["strategy"] == "ocr"]
+    logger.info(f"{len(pages) - len(ocr_pages)} pages with a text layer, {len(ocr_pages)} need OCR")
+    if ocr_pages:
+        try:
+            ocr_results = ocr_pdf_pages(pdf_path, [report["page"] for report in ocr_pages])
         except Exception as ocr_error:
-            logger.error(f"OCR extraction also failed: {ocr_error}")
-            text = ""
+            logger.error(f"OCR extraction failed: {ocr_error}")
+            ocr_results = {}
+        for report in ocr_pages:
+            ocr_failed = report["page"] not in ocr_results
+            page_text, seconds, preprocess = ocr_results.get(report["page"], ("", 0.0, {}))
+            report["seconds"] = round(report["seconds"] + seconds, 3)
+            report["preprocess"] = preprocess
+            if page_text.strip():
+                page_texts[report["page"]] = page_text
+            elif page_texts.get(report["page"], "").strip():
+                # Nothing legible in the image; keep the sparse text layer
+                page_text = page_texts[report["page"]]
+                report["strategy"] = "text"
+            else:
+                report["strategy"] = "failed" if ocr_failed else "empty"
+            report["characters"] = len(page_text.strip())
+
+    text = "".join(page_texts[report["page"]] + "\n" for report in pages if page_texts.get(report["page"], "").strip())
 
     # Final check and debug info
     if text.strip():
@@ -203,14 +402,19 @@ def extract_text_from_pdf_fixed(pdf_path):
         logger.debug(f"Extracted text sample: {sample}...")
         
         # Check if skills are likely to be found
-        skill_keywords_found = [skill for skill in ALL_SKILLS_SET if skill.lower() in text.lower()]
+        text_lower = text.lower()
+        skill_keywords_found = [name for name in get_taxonomy().names.values() if name.lower() in text_lower]
         logger.info(f"Potential skills detected in text: {len(skill_keywords_found)}")
         if skill_keywords_found:
             logger.debug(f"Sample detected skills: {skill_keywords_found[:5]}")
     else:
         logger.warning("No text extracted from PDF using either method!")
         
-    return text.strip()
+    return text.strip(), pages
+
+def extract_text_from_pdf_fixed(pdf_path):
+    """Extract text from PDF, reading the text layer where present and OCR'ing scanned pages"""
+    return extract_pdf_pages(pdf_path)[0]
 
 # ------------------------------------------------------
 #   OPTIMIZED DOCX TEXT EXTRACTION
@@ -220,6 +424,7 @@ def extract_text_from_docx_optimized(docx_file):
     logger.info("Starting optimized DOCX text extraction")
     text_parts = []
 
+    from docx import Document
     try:
         doc = Document(docx_file)
 
@@ -299,24 +504,15 @@ def extract_personal_info_improved(text):
             if match:
                 info["Location"] = match.group(1).strip()
 
-    logger.debug("Applying NLP fallback for personal info")
-    # Use original text for better NLP results
-    doc = nlp(text[:100000])
-
-    # Extract entities in single pass
-    entities = {}
-    for ent in doc.ents:
-        if ent.label_ not in entities:
-            entities[ent.label_] = ent.text
-    
-    if "Full Name" not in info and "PERSON" in entities:
-        info["Full Name"] = entities["PERSON"]
-
-    if "Location" not in info and "GPE" in entities:
-        info["Location"] = entities["GPE"]
-
-    if "Organization" not in info and "ORG" in entities:
-        info["Organization"] = entities["ORG"]
+    # NLP only for the fields the regexes left empty
+    missing = {field: label for field, label in NLP_FIELDS.items() if field not in info}
+    if missing:
+        logger.debug(f"Applying NLP fallback for: {list(missing)}")
+        # Use original text for better NLP results
+        entities = find_first_entities(text, missing.values())
+        for field, label in missing.items():
+            if label in entities:
+                info[field] = entities[label]
 
     logger.info(f"Extracted personal info: {info}")
     return info
@@ -338,39 +534,23 @@ def extract_skills_robust(text):
                            if term.lower() in text.lower()]
     logger.debug(f"Common terms found in text: {common_terms_in_text}")
 
-    # Method 1: Direct case-insensitive search (fastest)
-    text_lower = text.lower()
-    for skill in ALL_SKILLS_SET:
-        if skill.lower() in text_lower:
-            # More precise check with word boundaries
-            pattern = re.compile(r'\b' + re.escape(skill.lower()) + r'\b', re.IGNORECASE)
-            if pattern.search(text):
-                found_skills.add(skill)
-                logger.debug(f"Skill found (direct): {skill}")
-
-    # Method 2: Regex pattern matching
-    for term, pattern in SKILL_PATTERNS.items():
-        if pattern.search(text) and SKILL_SYNONYMS.get(term, term) not in found_skills:
-            actual_term = SKILL_SYNONYMS.get(term, term)
-            found_skills.add(actual_term)
-            logger.debug(f"Skill found (regex): {actual_term}")
-
-    # Method 3: Check for multi-word skills
-    multiword_skills = [skill for skill in ALL_SKILLS_SET if ' ' in skill]
-    for skill in multiword_skills:
-        if skill.lower() in text_lower and skill not in found_skills:
-            found_skills.add(skill)
-            logger.debug(f"Skill found (multi-word): {skill}")
-
-    # Method 4: NLP-based extraction as final fallback
+    # Method 1: one scan with the taxonomy's compiled matcher (every id, name and alias)
+    taxonomy = get_taxonomy()
+    for skill_id in taxonomy.find(text):
+        found_skills.add(taxonomy.name(skill_id))
+        logger.debug(f"Skill found (taxonomy): {taxonomy.name(skill_id)}")
+
+    # Method 2: token-level lookup as final fallback; only the tokenizer is
+    # needed, so the document is not parsed a second time
     if len(found_skills) < 3:  # If we found very few skills, try NLP
-        logger.debug("Trying NLP-based skill extraction as fallback")
+        logger.debug("Trying token-based skill extraction as fallback")
         nlp_text = text if len(text) < 30000 else text[:30000]
-        doc = nlp(nlp_text)
+        doc = get_nlp_model().tokenizer(nlp_text)
         
         for token in doc:
-            if token.text in ALL_SKILLS_SET and token.text not in found_skills:
-                found_skills.add(token.text)
+            skill_id = taxonomy.lookup.get(token.text.lower())
+            if skill_id is not None and taxonomy.name(skill_id) not in found_skills:
+                found_skills.add(taxonomy.name(skill_id))
                 logger.debug(f"Skill found (NLP): {token.text}")
 
     result = sorted(found_skills)
@@ -378,128 +558,182 @@ def extract_skills_robust(text):
     return result
 
 # ------------------------------------------------------
-#   FIXED FILE PROCESSING WORKER WITH PROPER FILE CLEANUP AND TIMING
+#   FILE PROCESSING (RUNS IN A POOL WORKER)
 # ------------------------------------------------------
-async def process_single_file_fixed(file: UploadFile):
-    """Process a single file asynchronously with proper file handling"""
-    temp_file_path = None
+def extract_document(filename: str, path: str) -> dict:
+    """
+    Extract text, personal info and skills from one uploaded file, read from its
+    spool file. CPU-bound; runs in a pool worker.
+    """
+    pages = None
     file_start_time = time.time()
-    
+    # Collect what timing_decorator measures for this document
+    timings = {}
+    timings_token = _stage_timings.set(timings)
+
     try:
-        logger.info(f"📁 STARTING FILE PROCESSING: {file.filename}")
-        content = await file.read()
-        suffix = os.path.splitext(file.filename)[1].lower()
+        suffix = os.path.splitext(filename)[1].lower()
         text = ""
 
         if suffix == ".pdf":
-            logger.info(f"Handling PDF file: {file.filename}")
-            
-            # Create temporary file with explicit cleanup
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-                tmp_pdf.write(content)
-                tmp_pdf.flush()
-                temp_file_path = tmp_pdf.name
-            
-            # Extract text from the temporary file
-            text = extract_text_from_pdf_fixed(temp_file_path)
-            
-            # Explicitly close and delete the temporary file
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-                temp_file_path = None
+            logger.info(f"Handling PDF file: {filename}")
+            text, pages = extract_pdf_pages(path)
 
         elif suffix == ".docx":
-            logger.info(f"Handling DOCX file: {file.filename}")
-            docx_file = BytesIO(content)
-            text = extract_text_from_docx_optimized(docx_file)
+            logger.info(f"Handling DOCX file: {filename}")
+            text = extract_text_from_docx_optimized(path)
 
         elif suffix in [".png", ".jpg", ".jpeg"]:
-            logger.info(f"Handling image file: {file.filename}")
-
-            # IMPORTANT: Convert to RGB always
-            img = Image.open(BytesIO(content)).convert("RGB")
-
-            # OCR in thread to avoid blocking
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                text = await asyncio.get_event_loop().run_in_executor(
-                    executor, 
-                    lambda: pytesseract.image_to_string(
-                        img,
-                        lang="eng",
-                        config="--psm 6 -c preserve_interword_spaces=1"
-                    )
-                )
+            logger.info(f"Handling image file: {filename}")
+
+            # Scaled to the text size, deskewed, binarized and cropped
+            from PIL import Image
+            with Image.open(path) as upload:
+                img, preprocess = prepare_image(upload)
+            text = get_ocr().image_to_string(img) if img is not None else ""
+            logger.debug(f"Image preprocessing: {preprocess}")
 
             logger.debug(f"Image OCR text length: {len(text)}")
 
         else:
             logger.warning(f"Unsupported file type: {suffix}")
             return {
-                "filename": file.filename,
+                "filename": filename,
                 "personal_info": {},
-                "skills": []
+                "skills": [],
+                "warning": f"Unsupported file type: {suffix or 'none'}"
             }
 
         if not text.strip():
-            logger.warning(f"No text extracted from file: {file.filename}")
-            return {
-                "filename": file.filename,
+            logger.warning(f"No text extracted from file: {filename}")
+            result = {
+                "filename": filename,
                 "personal_info": {},
-                "skills": []
+                "skills": [],
+                "warning": "No text extracted"
             }
+            if pages is not None:
+                result["pages"] = pages
+            return result
 
         # Debug: Log extracted text characteristics
-        logger.info(f"Extracted {len(text)} characters from {file.filename}")
+        logger.info(f"Extracted {len(text)} characters from {filename}")
         
         # Process personal info and skills
         personal_info = extract_personal_info_improved(text)
         skills = extract_skills_robust(text)
         
-        file_end_time = time.time()
-        file_duration = file_end_time - file_start_time
-        logger.info(f"✅ COMPLETED FILE: {file.filename} in {file_duration:.2f} seconds")
+        file_duration = time.time() - file_start_time
+        logger.info(f"✅ COMPLETED FILE: {filename} in {file_duration:.2f} seconds")
 
-        return {
-            "filename": file.filename,
+        result = {
+            "filename": filename,
             "personal_info": personal_info,
             "skills": skills,
-            "processing_time_seconds": round(file_duration, 2)
+            "processing_time_seconds": round(file_duration, 2),
+            "timings": timings
         }
+        if pages is not None:
+            # Per-page strategy (text layer / ocr / empty / failed) and timing
+            result["pages"] = pages
+        return result
 
     except Exception as e:
-        file_end_time = time.time()
-        file_duration = file_end_time - file_start_time
-        logger.error(f"❌ ERROR processing file {file.filename} after {file_duration:.2f} seconds: {e}", exc_info=True)
-        # Ensure temp file is cleaned up even if there's an error
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-            except Exception as cleanup_error:
-                logger.warning(f"Could not cleanup temp file {temp_file_path}: {cleanup_error}")
-        return {
+        file_duration = time.time() - file_start_time
+        logger.error(f"❌ ERROR processing file {filename} after {file_duration:.2f} seconds: {e}", exc_info=True)
+        result = {
+            "filename": filename,
+            "personal_info": {},
+            "skills": [],
+            "processing_time_seconds": round(file_duration, 2),
+            "error": str(e)
+        }
+        if pages is not None:
+            result["pages"] = pages
+        return result
+    finally:
+        _stage_timings.reset(timings_token)
+
+async def spool_or_error(file: UploadFile, file_start_time: float):
+    """Spool an upload to disk; returns (upload, None) or (None, error result)"""
+    try:
+        return await spool_upload(file), None
+    except (UploadTooLarge, OSError) as e:
+        logger.error(f"❌ ERROR reading file {file.filename}: {e}")
+        return None, {
             "filename": file.filename,
             "personal_info": {},
             "skills": [],
+            "processing_time_seconds": round(time.time() - file_start_time, 2),
+            "error": str(e)
+        }
+
+async def process_single_file_fixed(file: UploadFile):
+    """Spool one upload on the event loop and extract it in the shared process pool"""
+    file_start_time = time.time()
+    upload, error = await spool_or_error(file, file_start_time)
+    if error:
+        return error
+    try:
+        return await process_spooled_upload(upload, file_start_time)
+    finally:
+        upload.cleanup()
+
+def is_cacheable(result):
+    """
+    Only complete extractions are cached: not errors, unsupported or empty files,
+    or PDFs with pages OCR failed on, which may well succeed next time
+    """
+    if "error" in result or "warning" in result:
+        return False
+    return not any(page.get("strategy") == "failed" for page in result.get("pages") or [])
+
+async def process_spooled_upload(upload: SpooledUpload, file_start_time: Optional[float] = None):
+    """Extract a spooled upload, serving repeats from the cache; the caller removes the spool file"""
+    filename = upload.filename
+    file_start_time = file_start_time or time.time()
+    logger.info(f"📁 STARTING FILE PROCESSING: {filename}")
+    try:
+        cache = get_extraction_cache()
+        cache_key = cache.key_for_digest(upload.sha256, *extraction_cache_scope(filename))
+        # Cache lookups may read from disk
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            logger.info(f"⚡ CACHE HIT: {filename}")
+            return {
+                "filename": filename,
+                **cached,
+                "processing_time_seconds": round(time.time() - file_start_time, 2),
+                "cached": True,
+            }
+        result = await run_in_process_pool(extract_document, filename, upload.path)
+    except Exception as e:
+        file_duration = time.time() - file_start_time
+        logger.error(f"❌ ERROR processing file {filename} after {file_duration:.2f} seconds: {e}")
+        return {
+            "filename": filename,
+            "personal_info": {},
+            "skills": [],
             "processing_time_seconds": round(file_duration, 2),
             "error": str(e)
         }
+    if is_cacheable(result):
+        # Timings describe this run, not a later cache hit
+        await asyncio.to_thread(cache.put, cache_key, {
+            k: v for k, v in result.items() if k not in ("filename", "processing_time_seconds", "timings")
+        })
+    # Include time spent waiting for a free worker
+    if "processing_time_seconds" in result:
+        result["processing_time_seconds"] = round(time.time() - file_start_time, 2)
+    return result
 
 # ------------------------------------------------------
-#   FIXED API ROUTE WITH COMPREHENSIVE TIMING
+#   RESULT AGGREGATION AND STREAMING
 # ------------------------------------------------------
-@router.post("/extract_skills/")
-async def extract_skills_endpoint_fixed(files: List[UploadFile] = File(...)):
-    total_start_time = time.time()
-    logger.info(f"🚀 API /extract_skills called with {len(files)} files")
-    
-    # Process files concurrently
-    tasks = [process_single_file_fixed(file) for file in files]
-    results = await asyncio.gather(*tasks)
-    
-    # Calculate timing statistics
-    total_end_time = time.time()
-    total_duration = total_end_time - total_start_time
-    
+STREAM_FORMATS = ("ndjson", "sse")
+
+def summarize_extraction(results, total_duration):
+    """Aggregate skills and timing stats over per-file results, logging a summary"""
     # Extract all unique skills and timing info
     all_skills = sorted(set(
         skill for r in results for skill in r["skills"]
@@ -531,9 +765,7 @@ async def extract_skills_endpoint_fixed(files: List[UploadFile] = File(...)):
         logger.info(f"   📄 {filename}: {status} - {skills_count} skills - {processing_time:.2f}s")
     logger.info("=" * 60)
 
-    # Add timing information to response
-    response = {
-        "results": results, 
+    return {
         "skills": all_skills,
         "processing_stats": {
             "total_files": len(results),
@@ -547,6 +779,98 @@ async def extract_skills_endpoint_fixed(files: List[UploadFile] = File(...)):
             }
         }
     }
+
+def format_stream_event(stream, event, payload):
+    if stream == "sse":
+        return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+    return json.dumps({"event": event, **payload}, default=str) + "\n"
+
+async def _indexed(index, coro):
+    return index, await coro
+
+async def spool_all(files):
+    """Spool every upload in order; returns [(upload or None, error result or None, start time)]"""
+    spooled = []
+    try:
+        for file in files:
+            file_start_time = time.time()
+            upload, error = await spool_or_error(file, file_start_time)
+            spooled.append((upload, error, file_start_time))
+    except BaseException:
+        cleanup_spooled(spooled)
+        raise
+    return spooled
+
+def cleanup_spooled(spooled):
+    for upload, _error, _start in spooled:
+        if upload is not None:
+            upload.cleanup()
+
+async def stream_extraction(spooled, stream, total_start_time):
+    """
+    Yield each file's result as soon as it finishes (event "file", with its
+    position in the upload as "index"), then the aggregate as event "summary".
+    Owns the spool files and removes them when done.
+    """
+    tasks = []
+    try:
+        for index, (upload, error, file_start_time) in enumerate(spooled):
+            if error:
+                tasks.append(asyncio.create_task(_indexed(index, asyncio.sleep(0, error))))
+                continue
+            tasks.append(asyncio.create_task(
+                _indexed(index, process_spooled_upload(upload, file_start_time))
+            ))
+
+        results = [None] * len(tasks)
+        for next_done in asyncio.as_completed(tasks):
+            index, result = await next_done
+            results[index] = result
+            yield format_stream_event(stream, "file", {"index": index, **result})
+
+        total_duration = time.time() - total_start_time
+        yield format_stream_event(stream, "summary", summarize_extraction(results, total_duration))
+        logger.info(f"🎯 STREAM COMPLETED after {total_duration:.2f} seconds")
+    finally:
+        # Client went away: stop waiting on extractions nobody will read
+        for task in tasks:
+            task.cancel()
+        cleanup_spooled(spooled)
+
+# ------------------------------------------------------
+#   FIXED API ROUTE WITH COMPREHENSIVE TIMING
+# ------------------------------------------------------
+@router.post("/extract_skills/")
+async def extract_skills_endpoint_fixed(files: List[UploadFile] = File(...), stream: Optional[str] = None):
+    """
+    Extract personal info and skills from every upload. With stream=ndjson or
+    stream=sse, results are streamed per file as they complete, followed by the summary.
+    """
+    if stream is not None and stream not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"stream must be one of {', '.join(STREAM_FORMATS)}")
+    check_file_count(files)
+
+    total_start_time = time.time()
+    logger.info(f"🚀 API /extract_skills called with {len(files)} files" + (f" (streaming {stream})" if stream else ""))
+    
+    if stream:
+        # Spooled here rather than in the generator, which only runs after this
+        # endpoint returns; FastAPI closes the form's files once the response
+        # has finished, but nothing below should depend on that.
+        spooled = await spool_all(files)
+        media_type = "text/event-stream" if stream == "sse" else "application/x-ndjson"
+        return StreamingResponse(stream_extraction(spooled, stream, total_start_time), media_type=media_type,
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    
+    # Process files concurrently
+    tasks = [process_single_file_fixed(file) for file in files]
+    results = await asyncio.gather(*tasks)
+    
+    # Calculate timing statistics
+    total_duration = time.time() - total_start_time
+
+    # Add timing information to response
+    response = {"results": results, **summarize_extraction(results, total_duration)}
     
     logger.info(f"🎯 RETURNING RESPONSE after {total_duration:.2f} seconds")
-    return response
\ No newline at end of file
+    return response
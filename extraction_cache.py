@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from recommendation_store import DATA_DIR
+
+logger = logging.getLogger("extraction_cache")
+
+# ============================================
+# CACHE CONFIGURATION
+# ============================================
+EXTRACTION_CACHE_CONFIG = {
+    # Parsed results kept in process memory, least recently used dropped first
+    "memory_entries": int(os.getenv("EXTRACTION_CACHE_MEMORY_ENTRIES", 256)),
+    # Directory of the on-disk tier; empty string disables it
+    "directory": os.getenv("EXTRACTION_CACHE_DIR", os.path.join(DATA_DIR, "extraction_cache")),
+    # The disk tier evicts least recently used files above this size
+    "max_disk_bytes": int(float(os.getenv("EXTRACTION_CACHE_MAX_MB", 256)) * 1024 * 1024),
+}
+
+# ============================================
+# CONTENT-ADDRESSED RESULT CACHE
+# ============================================
+# Extraction results keyed by the SHA-256 of the uploaded bytes plus a scope:
+# which extractor produced them and the taxonomy / model versions they depend
+# on. Editing the taxonomy changes the key, so stale skills are never served;
+# the old entries simply age out. Values are JSON documents, so every hit is
+# a fresh copy callers may modify.
+#
+# Memory tier: an LRU of serialized entries. Disk tier: one file per key under
+# <directory>/<key[:2]>/, written atomically, evicted by total size in order
+# of last use (hits touch the file's mtime). get() and put() may do file I/O
+# (the first one scans the directory), so async callers run them in a thread.
+
+
+class ExtractionCache:
+
+    def __init__(self, config: Optional[Dict] = None):
+        self._config = {**EXTRACTION_CACHE_CONFIG, **(config or {})}
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._disk: Optional["OrderedDict[str, int]"] = None  # key -> file size, oldest first
+        self._disk_bytes = 0
+        self._hits = {"memory": 0, "disk": 0}
+        self._misses = 0
+
+    @classmethod
+    def key(cls, content: bytes, *scope: str) -> str:
+        """Cache key of an upload for one extractor / version scope"""
+        return cls.key_for_digest(hashlib.sha256(content).hexdigest(), *scope)
+
+    @staticmethod
+    def key_for_digest(sha256: str, *scope: str) -> str:
+        """Same key from a SHA-256 hex digest computed while the upload streamed in"""
+        digest = hashlib.sha256(sha256.encode())
+        for part in scope:
+            digest.update(b"\0" + str(part).encode())
+        return digest.hexdigest()
+
+    # ---------- Public API ----------
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            raw = self._memory.get(key)
+            if raw is not None:
+                self._memory.move_to_end(key)
+                self._hits["memory"] += 1
+                return json.loads(raw)
+
+            raw = self._read_disk(key)
+            if raw is None:
+                self._misses += 1
+                return None
+            self._hits["disk"] += 1
+            self._remember(key, raw)
+            return json.loads(raw)
+
+    def put(self, key: str, value: Dict):
+        raw = json.dumps(value, separators=(",", ":"), default=str)
+        with self._lock:
+            self._remember(key, raw)
+            self._write_disk(key, raw)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._config["directory"]:
+                for key in list(self._disk_index()):
+                    self._evict(key)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._misses + sum(self._hits.values())
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk) if self._disk is not None else None,
+                "disk_bytes": self._disk_bytes,
+                "hits": dict(self._hits),
+                "misses": self._misses,
+                "hit_rate": round(sum(self._hits.values()) / lookups, 3) if lookups else 0.0,
+            }
+
+    # ---------- Memory tier ----------
+    def _remember(self, key: str, raw: str):
+        self._memory[key] = raw
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._config["memory_entries"]:
+            self._memory.popitem(last=False)
+
+    # ---------- Disk tier ----------
+    def _path(self, key: str) -> str:
+        return os.path.join(self._config["directory"], key[:2], f"{key}.json")
+
+    def _disk_index(self) -> "OrderedDict[str, int]":
+        """Existing cache files, least recently used first; scanned once per process"""
+        if self._disk is None:
+            files = []
+            directory = self._config["directory"]
+            if os.path.isdir(directory):
+                for shard in os.scandir(directory):
+                    if not shard.is_dir():
+                        continue
+                    for entry in os.scandir(shard.path):
+                        if entry.name.endswith(".json"):
+                            stat = entry.stat()
+                            files.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+            files.sort()
+            self._disk = OrderedDict((key, size) for _, key, size in files)
+            self._disk_bytes = sum(self._disk.values())
+        return self._disk
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if not self._config["directory"]:
+            return None
+        index = self._disk_index()
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                raw = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another worker process
+            if key in index:
+                self._disk_bytes -= index.pop(key)
+            return None
+        except OSError as e:
+            logger.warning("Extraction cache: could not read %s: %s", path, e)
+            return None
+        if key not in index:
+            # Written by another worker process
+            index[key] = len(raw.encode())
+            self._disk_bytes += index[key]
+        index.move_to_end(key)
+        return raw
+
+    def _write_disk(self, key: str, raw: str):
+        if not self._config["directory"]:
+            return
+        index = self._disk_index()
+        path = self._path(key)
+        data = raw.encode()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Temp name first so a concurrent reader never sees a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Extraction cache: could not write %s: %s", path, e)
+            return
+        self._disk_bytes += len(data) - index.pop(key, 0)
+        index[key] = len(data)
+        while self._disk_bytes > self._config["max_disk_bytes"] and len(index) > 1:
+            self._evict(next(iter(index)))
+
+    def _evict(self, key: str):
+        self._disk_bytes -= self._disk.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Extraction cache: could not evict %s: %s", key, e)
+
+
+_cache: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Process-wide cache shared by the resume extraction endpoints"""
+    global _cache
+    if _cache is None:
+        _cache = ExtractionCache()
+    return _cache
@@ -0,0 +1,388 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import JSONResponse
+
+from extract_skills import PROCESSING_CONFIG, process_spooled_upload, spool_or_error, summarize_extraction
+from recommendation_store import DATA_DIR
+from upload_ingest import INGEST_CONFIG, SpooledUpload, check_file_count, spool_chunks
+
+logger = logging.getLogger("extraction_jobs")
+
+router = APIRouter()
+
+# ============================================
+# JOB QUEUE CONFIGURATION
+# ============================================
+JOBS_CONFIG = {
+    # SQLite file holding queued uploads and results; empty string keeps jobs in memory only
+    "path": os.getenv("EXTRACTION_JOBS_PATH", os.path.join(DATA_DIR, "extraction_jobs.sqlite3")),
+    # Files extracted at once; each goes through the shared process pool
+    "workers": int(os.getenv("EXTRACTION_JOB_WORKERS", PROCESSING_CONFIG["max_workers"])),
+    # Files waiting or in progress across all jobs; beyond this new jobs get 503
+    "max_pending_files": int(os.getenv("EXTRACTION_JOBS_MAX_PENDING_FILES", 200)),
+    # Finished jobs are deleted after this long
+    "retention_seconds": float(os.getenv("EXTRACTION_JOBS_RETENTION_SECONDS", 24 * 3600)),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    total_files INTEGER NOT NULL,
+    completed_files INTEGER NOT NULL DEFAULT 0,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL,
+    file_index INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    content BLOB,
+    status TEXT NOT NULL,
+    result TEXT,
+    PRIMARY KEY (job_id, file_index)
+);
+CREATE INDEX IF NOT EXISTS job_files_pending ON job_files (status);
+"""
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+# ============================================
+# PERSISTENT EXTRACTION JOB QUEUE
+# ============================================
+# A job is a batch of uploads. Each file is a queue item: its bytes are copied
+# from the upload spool into a SQLite blob on submit and dropped once its result
+# is stored, so the in-memory queue only holds (job_id, file_index) pairs. On
+# start-up, files that were queued or mid-extraction when the process stopped
+# are queued again. Blobs are copied chunk by chunk in both directions.
+# Queue bookkeeping runs on the event loop, but SQLite writes and blob copies
+# run in threads via asyncio.to_thread, one at a time under a lock; the
+# extraction itself runs in the shared process pool via process_spooled_upload.
+
+
+class ExtractionJobQueue:
+
+    def __init__(self, process: Callable[[SpooledUpload], Awaitable[Dict]], config: Optional[Dict] = None):
+        self._process = process
+        self._config = {**JOBS_CONFIG, **(config or {})}
+        self._db: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending = 0
+        # The connection is shared by the threads database work runs in
+        self._lock = threading.RLock()
+
+    # ---------- Lifecycle ----------
+    async def start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        resumed = await asyncio.to_thread(self._resume)
+        for item in resumed:
+            self._queue.put_nowait(item)
+        self._pending += len(resumed)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self._config["workers"])]
+        logger.info("Extraction jobs: %d workers started, %d files resumed", len(self._workers), len(resumed))
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _open(self):
+        if self._db is not None:
+            return
+        path = self._config["path"] or ":memory:"
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.executescript(SCHEMA)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Extraction jobs: cannot use %s (%s); jobs will not survive a restart", path, e)
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+            self._db.executescript(SCHEMA)
+
+    def _resume(self) -> List[tuple]:
+        """Open the database and return the files still to extract, oldest job first"""
+        with self._lock:
+            self._open()
+            with self._db:
+                # Interrupted by a restart: extract again from the stored bytes
+                self._db.execute("UPDATE job_files SET status = 'queued' WHERE status = 'running'")
+            queued = self._db.execute(
+                "SELECT f.job_id, f.file_index FROM job_files f JOIN jobs j USING (job_id) "
+                "WHERE f.status = 'queued' ORDER BY j.created_at, f.file_index").fetchall()
+            self._purge()
+            return queued
+
+    def _purge(self):
+        cutoff = time.time() - self._config["retention_seconds"]
+        with self._db:
+            expired = [row[0] for row in self._db.execute(
+                "SELECT job_id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,))]
+            for job_id in expired:
+                self._db.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
+                self._db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    # ---------- Submit / inspect ----------
+    def check_capacity(self, file_count: int):
+        """Raise JobQueueFull when file_count more files would exceed the backlog limit"""
+        if self._pending + file_count > self._config["max_pending_files"]:
+            raise JobQueueFull(f"{self._pending} files already waiting")
+
+    async def submit(self, uploads: List[SpooledUpload], failed: Optional[Dict[int, Dict]] = None) -> Dict:
+        """
+        Persist a job and queue its files. `failed` maps upload positions that could
+        not be ingested to their error results; those count as already completed.
+        """
+        await self.start()
+        self.check_capacity(len(uploads))
+        failed = failed or {}
+        total = len(uploads) + len(failed)
+        queued = [index for index in range(total) if index not in failed]
+
+        job_id = uuid.uuid4().hex
+        # Counted before the copy so concurrent submits see the backlog
+        self._pending += len(queued)
+        try:
+            await asyncio.to_thread(self._insert_job, job_id, uploads, failed, queued, total)
+        except BaseException:
+            self._pending -= len(queued)
+            raise
+        for index in queued:
+            self._queue.put_nowait((job_id, index))
+        if not queued:
+            await asyncio.to_thread(self._finish, job_id, time.time())
+        logger.info("Extraction job %s queued with %d files (%d pending)", job_id, len(queued), self._pending)
+        return await asyncio.to_thread(self.get, job_id)
+
+    def _insert_job(self, job_id: str, uploads: List[SpooledUpload], failed: Dict[int, Dict],
+                    queued: List[int], total: int):
+        with self._lock:
+            self._open()
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO jobs (job_id, status, created_at, total_files, completed_files) "
+                    "VALUES (?, 'queued', ?, ?, ?)",
+                    (job_id, time.time(), total, len(failed)))
+                for index, result in failed.items():
+                    self._db.execute(
+                        "INSERT INTO job_files (job_id, file_index, filename, status, result) VALUES (?, ?, ?, 'done', ?)",
+                        (job_id, index, result["filename"], json.dumps(result, default=str)))
+                for index, upload in zip(queued, uploads):
+                    self._db.execute(
+                        "INSERT INTO job_files (job_id, file_index, filename, content, status) "
+                        "VALUES (?, ?, ?, zeroblob(?), 'queued')",
+                        (job_id, index, upload.filename, upload.size))
+                    if upload.size:
+                        self._copy_into_blob(job_id, index, upload)
+
+    def _blob(self, job_id: str, file_index: int, readonly: bool):
+        rowid = self._db.execute("SELECT rowid FROM job_files WHERE job_id = ? AND file_index = ?",
+                                 (job_id, file_index)).fetchone()[0]
+        return self._db.blobopen("job_files", "content", rowid, readonly=readonly)
+
+    def _copy_into_blob(self, job_id: str, file_index: int, upload: SpooledUpload):
+        with self._blob(job_id, file_index, readonly=False) as blob, open(upload.path, "rb") as f:
+            while chunk := f.read(INGEST_CONFIG["chunk_size"]):
+                blob.write(chunk)
+
+    def _spool_from_blob(self, job_id: str, file_index: int, filename: str) -> SpooledUpload:
+        with self._lock, self._blob(job_id, file_index, readonly=True) as blob:
+            return spool_chunks(filename, iter(lambda: blob.read(INGEST_CONFIG["chunk_size"]), b""))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Job status and results; blocks on the database, so async callers use a thread"""
+        with self._lock:
+            self._open()
+            return self._get(job_id)
+
+    def _get(self, job_id: str) -> Optional[Dict]:
+        row = self._db.execute(
+            "SELECT status, created_at, started_at, finished_at, total_files, completed_files, summary "
+            "FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        status, created_at, started_at, finished_at, total_files, completed_files, summary = row
+        results = [
+            {"index": file_index, **json.loads(result)}
+            for file_index, result in self._db.execute(
+                "SELECT file_index, result FROM job_files WHERE job_id = ? AND result IS NOT NULL "
+                "ORDER BY file_index", (job_id,))
+        ]
+        job = {
+            "job_id": job_id,
+            "status": status,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "progress": {
+                "total_files": total_files,
+                "completed_files": completed_files,
+                "percent": round(100 * completed_files / total_files, 1) if total_files else 100.0,
+            },
+            "results": results,
+        }
+        if summary:
+            job.update(json.loads(summary))
+        return job
+
+    def stats(self) -> Dict:
+        return {"workers": len(self._workers), "pending_files": self._pending,
+                "max_pending_files": self._config["max_pending_files"]}
+
+    # ---------- Workers ----------
+    async def _worker(self):
+        while True:
+            job_id, file_index = await self._queue.get()
+            start_time = time.time()
+            try:
+                await self._run_file(job_id, file_index)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # e.g. the disk filled up while spooling; the file still counts as completed
+                logger.error("Extraction job %s file %d failed: %s", job_id, file_index, e, exc_info=True)
+                try:
+                    await asyncio.to_thread(self._store_error, job_id, file_index, start_time, e)
+                except Exception as store_error:
+                    logger.error("Extraction job %s: could not record failure of file %d: %s",
+                                 job_id, file_index, store_error)
+            finally:
+                self._pending -= 1
+                self._queue.task_done()
+
+    async def _run_file(self, job_id: str, file_index: int):
+        row = await asyncio.to_thread(self._claim, job_id, file_index)
+        if row is None:
+            return
+        filename, has_content = row
+        upload = (await asyncio.to_thread(self._spool_from_blob, job_id, file_index, filename) if has_content
+                  else spool_chunks(filename, []))
+        try:
+            result = await self._process(upload)
+        finally:
+            upload.cleanup()
+        await asyncio.to_thread(self._store_result, job_id, file_index, result, "done")
+
+    def _claim(self, job_id: str, file_index: int) -> Optional[tuple]:
+        """Mark a queued file running; returns (filename, has content) or None if it is not queued"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT filename, content IS NOT NULL FROM job_files "
+                "WHERE job_id = ? AND file_index = ? AND status = 'queued'",
+                (job_id, file_index)).fetchone()
+            if row is None:
+                return None
+            with self._db:
+                self._db.execute("UPDATE job_files SET status = 'running' WHERE job_id = ? AND file_index = ?",
+                                 (job_id, file_index))
+                self._db.execute("UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?) "
+                                 "WHERE job_id = ?", (time.time(), job_id))
+            return row
+
+    def _store_error(self, job_id: str, file_index: int, start_time: float, error: Exception):
+        with self._lock:
+            row = self._db.execute("SELECT filename FROM job_files WHERE job_id = ? AND file_index = ?",
+                                   (job_id, file_index)).fetchone()
+            if row is None:
+                return
+            result = {
+                "filename": row[0],
+                "personal_info": {},
+                "skills": [],
+                "processing_time_seconds": round(time.time() - start_time, 2),
+                "error": str(error),
+            }
+            self._store_result(job_id, file_index, result, "failed")
+
+    def _store_result(self, job_id: str, file_index: int, result: Dict, status: str):
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "UPDATE job_files SET status = ?, result = ?, content = NULL WHERE job_id = ? AND file_index = ?",
+                    (status, json.dumps(result, default=str), job_id, file_index))
+                self._db.execute("UPDATE jobs SET completed_files = completed_files + 1 WHERE job_id = ?", (job_id,))
+            total, completed, created_at = self._db.execute(
+                "SELECT total_files, completed_files, created_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if completed >= total:
+                self._finish(job_id, created_at)
+
+    def _finish(self, job_id: str, created_at: float):
+        with self._lock:
+            results = [json.loads(result) for (result,) in self._db.execute(
+                "SELECT result FROM job_files WHERE job_id = ? ORDER BY file_index", (job_id,))]
+            finished_at = time.time()
+            summary = summarize_extraction(results, finished_at - created_at)
+            with self._db:
+                self._db.execute("UPDATE jobs SET status = 'completed', finished_at = ?, summary = ? WHERE job_id = ?",
+                                 (finished_at, json.dumps(summary, default=str), job_id))
+            logger.info("Extraction job %s completed in %.2fs", job_id, finished_at - created_at)
+            self._purge()
+
+
+job_queue = ExtractionJobQueue(process_spooled_upload)
+
+# ============================================
+# JOB ENDPOINTS
+# ============================================
+@router.post("/extract_jobs", status_code=202)
+async def create_extraction_job(files: List[UploadFile] = File(...)):
+    """Queue the uploads for extraction and return the job id right away"""
+    check_file_count(files)
+    try:
+        # Refuse before spooling anything
+        job_queue.check_capacity(len(files))
+    except JobQueueFull as e:
+        return JSONResponse(status_code=503, headers={"Retry-After": "30"},
+                            content={"detail": f"Extraction queue is full ({e}); retry later"})
+
+    uploads, failed = [], {}
+    try:
+        for index, file in enumerate(files):
+            upload, error = await spool_or_error(file, time.time())
+            if error:
+                failed[index] = error
+            else:
+                uploads.append(upload)
+        job = await job_queue.submit(uploads, failed)
+    except JobQueueFull as e:
+        return JSONResponse(status_code=503, headers={"Retry-After": "30"},
+                            content={"detail": f"Extraction queue is full ({e}); retry later"})
+    finally:
+        # The job owns a copy in SQLite now
+        for upload in uploads:
+            upload.cleanup()
+    return {"job_id": job["job_id"], "status": job["status"],
+            "total_files": job["progress"]["total_files"], "status_url": f"/api/extract_jobs/{job['job_id']}"}
+
+
+@router.get("/extract_jobs/{job_id}")
+async def get_extraction_job(job_id: str):
+    """Status, progress, per-file results so far and, once completed, the summary"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
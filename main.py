@@ -1,12 +1,40 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from upload_cv import router as upload_router
-from project_recommendation import router as recommend_router
-from extract_skills import router as skills_router  # This imports your extract_skills endpoint
+from project_recommendation import router as recommend_router, close_supabase_client, import_pdf_engine, recommendation_store
+from extract_skills import router as skills_router, shutdown_process_pool, warm_process_pool  # This imports your extract_skills endpoint
+from extraction_jobs import router as jobs_router, job_queue
+from upload_ingest import UploadSizeLimitMiddleware
+from skill_taxonomy import get_taxonomy
+from warmup import EngineWarmup
 import os
 
-app = FastAPI(title="Resource Management System API")
+# Loaded in the background once the server is listening; see /ready
+warmup = EngineWarmup()
+warmup.register("skill_taxonomy", lambda: {"version": get_taxonomy().version})
+warmup.register("pdf_engine", import_pdf_engine)
+warmup.register("extraction_workers", warm_process_pool)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Materialized recommendations persisted by the previous process
+    recommendation_store.open()
+    warmup.start()
+    # Resume extraction jobs left queued by the previous process
+    await job_queue.start()
+    yield
+    await warmup.stop()
+    await job_queue.stop()
+    # Release the pooled async HTTP connections used by the recommender
+    await close_supabase_client()
+    # Stop the resume extraction workers
+    shutdown_process_pool()
+    recommendation_store.close()
+
+app = FastAPI(title="Resource Management System API", lifespan=lifespan)
 
 # CORS configuration
 origins = [
@@ -16,6 +44,9 @@ origins = [
     "*"
 ]
 
+# Added first so CORS headers also reach its 413s
+app.add_middleware(UploadSizeLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -28,6 +59,7 @@ app.add_middleware(
 app.include_router(upload_router, prefix="/api")
 app.include_router(recommend_router, prefix="/api")
 app.include_router(skills_router, prefix="/api")  # This adds /api/extract_skills
+app.include_router(jobs_router, prefix="/api")
 
 # Root endpoint - Update to show only ACTUAL endpoints
 @app.get("/")
@@ -38,9 +70,14 @@ async def root():
             "api_docs": "/docs",
             "api_redoc": "/redoc", 
             "health": "/health",
+            "ready": "/ready",
             "upload_cv": "/api/upload_cv",
             "recommendations": "/api/recommendations/{project_id}",
-            "extract_skills": "/api/extract_skills"  # ONLY THIS from extract_skills.py
+            "recommendations_batch": "/api/recommendations/batch",
+            "recommendations_webhook": "/api/recommendations/webhook",
+            "availability": "/api/availability",
+            "extract_skills": "/api/extract_skills",  # ONLY THIS from extract_skills.py
+            "extract_jobs": "/api/extract_jobs"
         },
         "frontend": "https://finalpls-resource-management-system-frontend.onrender.com"
     }
@@ -50,6 +87,12 @@ async def root():
 async def health():
     return {"status": "healthy", "service": "Resource Management System API"}
 
+# Readiness: 503 until the warm-up has loaded (or given up on) every engine
+@app.get("/ready")
+async def ready():
+    status = warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
\ No newline at end of file
@@ -0,0 +1,166 @@
+import importlib.util
+import logging
+import os
+import queue
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+logger = logging.getLogger("ocr_engine")
+
+# ============================================
+# OCR CONFIGURATION
+# ============================================
+OCR_CONFIG = {
+    # "tesserocr" (warm in-process engines), "pytesseract" (one tesseract
+    # process per image) or "auto": tesserocr when installed
+    "backend": os.getenv("OCR_BACKEND", "auto"),
+    "lang": os.getenv("OCR_LANG", "eng"),
+    # 6: assume a single uniform block of text
+    "psm": int(os.getenv("OCR_PSM", 6)),
+    # Language data directory for tesserocr; None uses tesseract's default
+    "tessdata": os.getenv("TESSDATA_PREFIX") or None,
+    # Binary used by the pytesseract backend
+    "tesseract_cmd": os.getenv("TESSERACT_CMD", "/usr/bin/tesseract"),
+}
+
+# ============================================
+# OCR BACKENDS
+# ============================================
+# pytesseract starts a tesseract process for every image, writes the image to a
+# temp file for it and reloads the language model each time. The tesserocr
+# backend instead keeps initialised TessBaseAPI instances in a pool: each
+# thread borrows one, hands it the PIL image in memory and returns it, so the
+# model loads once per engine per worker process. tesserocr releases the GIL
+# while recognising, so the page OCR threads run in parallel. Both backends
+# share image_to_string(image) and produce the same --psm / interword-space
+# behaviour.
+
+
+class PytesseractEngine:
+    name = "pytesseract"
+
+    def __init__(self, config: Optional[Dict] = None):
+        self._config = {**OCR_CONFIG, **(config or {})}
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = self._config["tesseract_cmd"]
+        self._pytesseract = pytesseract
+
+    def image_to_string(self, image) -> str:
+        return self._pytesseract.image_to_string(
+            image,
+            lang=self._config["lang"],
+            config=f"--psm {self._config['psm']} -c preserve_interword_spaces=1",
+        )
+
+    def warm(self) -> Dict:
+        return {"backend": self.name, "version": str(self._pytesseract.get_tesseract_version())}
+
+    def close(self):
+        pass
+
+
+class TesserocrEngine:
+    name = "tesserocr"
+
+    def __init__(self, size: int, config: Optional[Dict] = None):
+        self._config = {**OCR_CONFIG, **(config or {})}
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._size = max(1, size)
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _new_api(self):
+        kwargs = {"lang": self._config["lang"], "psm": self._config["psm"]}
+        if self._config["tessdata"]:
+            kwargs["path"] = self._config["tessdata"]
+        api = self._tesserocr.PyTessBaseAPI(**kwargs)
+        api.SetVariable("preserve_interword_spaces", "1")
+        return api
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self._size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if not create:
+            return self._idle.get()
+        try:
+            return self._new_api()
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self, api):
+        with self._lock:
+            self._created -= 1
+        api.End()
+
+    def image_to_string(self, image) -> str:
+        api = self._acquire()
+        try:
+            api.SetImage(image)
+            dpi = image.info.get("dpi")
+            if dpi:
+                # Rendered pages know their resolution; tesseract sizes its heuristics by it
+                api.SetSourceResolution(int(dpi[0]))
+            text = api.GetUTF8Text()
+            api.Clear()
+        except BaseException:
+            # Don't hand an engine in an unknown state to the next page
+            self._discard(api)
+            raise
+        self._idle.put(api)
+        return text
+
+    def warm(self) -> Dict:
+        """Initialise every engine now so no page waits for a language model load"""
+        apis = [self._acquire() for _ in range(self._size)]
+        for api in apis:
+            self._idle.put(api)
+        return {"backend": self.name, "engines": self._size, "version": self._tesserocr.tesseract_version().split()[1]}
+
+    def close(self):
+        while True:
+            try:
+                api = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(api)
+
+
+def ocr_backend_name(config: Optional[Dict] = None) -> str:
+    """The backend get_ocr_engine() will use, without importing it"""
+    backend = {**OCR_CONFIG, **(config or {})}["backend"]
+    if backend == "auto":
+        return "tesserocr" if importlib.util.find_spec("tesserocr") else "pytesseract"
+    if backend not in ("tesserocr", "pytesseract"):
+        raise ValueError(f"Unknown OCR_BACKEND '{backend}'")
+    return backend
+
+
+@lru_cache(maxsize=1)
+def get_ocr_engine(size: int = 1):
+    """
+    Process-wide OCR engine; size is how many pages may be recognised at once.
+    Falls back to pytesseract when tesserocr cannot start (e.g. missing tessdata).
+    """
+    if ocr_backend_name() == "tesserocr":
+        try:
+            engine = TesserocrEngine(size)
+            engine.warm()
+            return engine
+        except Exception as e:
+            if OCR_CONFIG["backend"] == "tesserocr":
+                raise
+            logger.warning("tesserocr unavailable (%s); falling back to pytesseract", e)
+    return PytesseractEngine()
@@ -0,0 +1,255 @@
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("ocr_preprocess")
+
+# ============================================
+# PREPROCESSING CONFIGURATION
+# ============================================
+PREPROCESS_CONFIG = {
+    # 0 renders every page at default_dpi and OCRs images as uploaded
+    "enabled": os.getenv("OCR_PREPROCESS", "1") != "0",
+    "default_dpi": int(os.getenv("OCR_DPI", 300)),
+    # Text line height (ascender to descender) OCR is run at; about a
+    # 20 px x-height, where tesseract's accuracy levels off
+    "target_line_px": int(os.getenv("OCR_TARGET_LINE_PX", 36)),
+    "min_dpi": int(os.getenv("OCR_MIN_DPI", 150)),
+    "max_dpi": int(os.getenv("OCR_MAX_DPI", 400)),
+    # Image uploads are scaled within these bounds (phone photos mostly shrink)
+    "min_scale": 0.2,
+    "max_scale": 2.0,
+    # Text size and skew are measured on a cheap low-resolution copy
+    "probe_dpi": 96,
+    "probe_max_side": 1200,
+    "max_skew_degrees": 5.0,
+    # White border left around the text after cropping
+    "crop_padding": 16,
+}
+
+# ============================================
+# OCR IMAGE PREPROCESSING
+# ============================================
+# Each page gets a low-resolution probe render. Its Otsu-binarised ink gives
+# the skew (the angle whose row profile is sharpest) and the median text line
+# height, and the page is then rendered at the DPI that puts text lines at
+# target_line_px. That DPI is never above the resolution of a scan embedded in
+# the page, which upsampling cannot improve. The final render is deskewed,
+# binarised and cropped to its ink; a page with no ink is not OCR'd at all.
+# Image uploads go through the same steps with a scale factor instead of a DPI.
+#
+# PyMuPDF is not thread-safe and page OCR runs in threads, so rendering is
+# serialised; it is a small share of a page's OCR time.
+
+_render_lock = threading.Lock()
+
+
+def preprocess_signature(config: Optional[Dict] = None) -> str:
+    """Short description of the settings OCR output depends on (part of the cache key)"""
+    config = {**PREPROCESS_CONFIG, **(config or {})}
+    if not config["enabled"]:
+        return f"raw@{config['default_dpi']}"
+    return f"adaptive@{config['target_line_px']}px:{config['min_dpi']}-{config['max_dpi']}"
+
+
+# ---------- Binarisation and measurements ----------
+def otsu_threshold(gray) -> int:
+    """Grey level separating ink from paper; pixels at or below it are ink"""
+    import numpy as np
+    hist = np.asarray(gray.histogram()[:256], dtype=np.float64)
+    probabilities = hist / max(hist.sum(), 1.0)
+    omega = np.cumsum(probabilities)
+    mu = np.cumsum(probabilities * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mu[-1] * omega - mu) ** 2 / (omega * (1.0 - omega))
+    return int(np.argmax(np.nan_to_num(between)))
+
+
+def ink_mask(gray, threshold: Optional[int] = None):
+    """Mode "L" image with ink 255 and paper 0 (rotations then fill with paper)"""
+    threshold = otsu_threshold(gray) if threshold is None else threshold
+    return gray.point([255 if level <= threshold else 0 for level in range(256)])
+
+
+def estimate_skew(ink, max_degrees: float) -> float:
+    """
+    Counter-clockwise rotation (degrees) that makes text lines horizontal: the
+    angle whose row ink profile has the strongest line/gap contrast
+    """
+    import numpy as np
+    ys, xs = np.nonzero(np.asarray(ink))
+    if not len(ys):
+        return 0.0
+    # For angles this small a shear matches the rotation: project every ink
+    # pixel onto the row it would land on, without rotating the image
+    xs = xs - ink.width / 2.0
+
+    def sharpness(angle):
+        rows = np.rint(ys - xs * np.tan(np.radians(angle))).astype(np.int64)
+        profile = np.bincount(rows - rows.min()).astype(np.float64)
+        return float(np.sum(np.diff(profile) ** 2))
+
+    coarse = np.arange(-max_degrees, max_degrees + 0.5, 1.0)
+    best = max(coarse, key=sharpness)
+    fine = np.arange(best - 0.8, best + 0.9, 0.2)
+    best = max(fine, key=sharpness)
+    return round(float(best), 1)
+
+
+def estimate_line_height(ink) -> Optional[float]:
+    """Median height in pixels of the runs of ink rows (text lines); None without text"""
+    import numpy as np
+    rows = np.asarray(ink, dtype=np.uint8).sum(axis=1, dtype=np.int64) // 255
+    if not rows.any():
+        return None
+    inked = rows > max(1, rows.max() // 100)
+    # Run boundaries of consecutive inked rows
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], inked.astype(np.int8), [0]))))
+    heights = edges[1::2] - edges[::2]
+    heights = heights[heights >= 2]  # specks and rules
+    if len(heights) < 3:
+        return None
+    return float(np.median(heights))
+
+
+def crop_to_ink(ink, padding: int):
+    """Crop to the ink's bounding box plus padding; None when there is no ink"""
+    box = ink.getbbox()
+    if box is None:
+        return None
+    left, top, right, bottom = box
+    return ink.crop((max(0, left - padding), max(0, top - padding),
+                     min(ink.width, right + padding), min(ink.height, bottom + padding)))
+
+
+def _finish(gray, angle: float, config: Dict):
+    """Deskew, binarise and crop a rendered page; returns a black-on-white "L" image or None"""
+    from PIL import Image
+    if abs(angle) >= 0.3:
+        gray = gray.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=255)
+    ink = crop_to_ink(ink_mask(gray), config["crop_padding"])
+    if ink is None:
+        return None
+    # Paper white, ink black
+    return ink.point(lambda level: 255 - level)
+
+
+def _probe(gray, config: Dict) -> Tuple[bool, float, Optional[float]]:
+    """(has ink, skew, line height in probe pixels) of a low-resolution grey image"""
+    from PIL import Image
+    ink = ink_mask(gray)
+    if ink.getbbox() is None:
+        return False, 0.0, None
+    angle = estimate_skew(ink, config["max_skew_degrees"])
+    line_px = estimate_line_height(ink.rotate(angle, resample=Image.NEAREST) if angle else ink)
+    if line_px is None:
+        # A few words give no reliable angle; leave such pages as they are
+        return True, 0.0, estimate_line_height(ink)
+    return True, angle, line_px
+
+
+# ---------- PDF pages ----------
+def _render(page, dpi: int):
+    import fitz  # PyMuPDF
+    from PIL import Image
+    pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    return Image.frombuffer("L", (pixmap.width, pixmap.height), pixmap.samples, "raw", "L", pixmap.stride, 1)
+
+
+def _native_dpi(page) -> Optional[float]:
+    """Resolution of the largest image drawn on the page, e.g. the scan itself"""
+    best = None
+    for xref, _smask, width, height, *_ in page.get_images():
+        for rect in page.get_image_rects(xref):
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            area = rect.width * rect.height
+            if best is None or area > best[0]:
+                best = (area, min(width / rect.width, height / rect.height) * 72)
+    return best[1] if best else None
+
+
+def choose_dpi(probe_line_px: Optional[float], native_dpi: Optional[float], config: Dict) -> int:
+    if probe_line_px is None:
+        dpi = config["default_dpi"]
+    else:
+        dpi = config["probe_dpi"] * config["target_line_px"] / probe_line_px
+    dpi = min(max(dpi, config["min_dpi"]), config["max_dpi"])
+    if native_dpi and native_dpi >= config["min_dpi"]:
+        dpi = min(dpi, native_dpi)
+    return int(round(dpi / 10.0) * 10)
+
+
+def prepare_pdf_page(pdf_path: str, page_number: int, config: Optional[Dict] = None):
+    """
+    Render page_number (1-based) for OCR. Returns (image or None for a blank
+    page, info) where info records the DPI, skew and measured line height.
+    """
+    from document_engine import open_pdf
+    config = {**PREPROCESS_CONFIG, **(config or {})}
+    with _render_lock:
+        document = open_pdf(pdf_path)
+        try:
+            page = document.load_page(page_number - 1)
+            if not config["enabled"]:
+                image = _render(page, config["default_dpi"])
+                image.info["dpi"] = (config["default_dpi"],) * 2
+                return image, {"dpi": config["default_dpi"]}
+            has_ink, angle, probe_line_px = _probe(_render(page, config["probe_dpi"]), config)
+            if not has_ink:
+                return None, {"dpi": config["probe_dpi"], "skew": 0.0, "line_px": None}
+            dpi = choose_dpi(probe_line_px, _native_dpi(page), config)
+            gray = _render(page, dpi)
+        finally:
+            document.close()
+
+    image = _finish(gray, angle, config)
+    info = {
+        "dpi": dpi,
+        "skew": angle,
+        "line_px": round(probe_line_px * dpi / config["probe_dpi"], 1) if probe_line_px else None,
+    }
+    if image is not None:
+        image.info["dpi"] = (dpi, dpi)
+    return image, info
+
+
+# ---------- Image uploads ----------
+def prepare_image(image, config: Optional[Dict] = None):
+    """
+    Prepare an uploaded image (photo or scan) for OCR. Returns (image or None
+    when it has no ink, info) where info records the scale and skew.
+    """
+    from PIL import Image, ImageOps
+    config = {**PREPROCESS_CONFIG, **(config or {})}
+    # Phone photos are stored sideways with an EXIF rotation flag
+    image = ImageOps.exif_transpose(image)
+    if not config["enabled"]:
+        return image.convert("RGB"), {"scale": 1.0}
+
+    gray = image.convert("L")
+    probe_scale = min(1.0, config["probe_max_side"] / max(gray.size))
+    probe = gray.reduce(max(1, int(1 / probe_scale))) if probe_scale < 1.0 else gray
+    probe_scale = probe.width / gray.width
+    has_ink, angle, probe_line_px = _probe(probe, config)
+    if not has_ink:
+        return None, {"scale": round(probe_scale, 3), "skew": 0.0, "line_px": None}
+
+    scale = 1.0
+    if probe_line_px is not None:
+        scale = config["target_line_px"] / (probe_line_px / probe_scale)
+        scale = min(max(scale, config["min_scale"]), config["max_scale"])
+    if abs(scale - 1.0) >= 0.1:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, resample=Image.LANCZOS if scale > 1.0 else Image.BOX)
+    else:
+        scale = 1.0
+
+    prepared = _finish(gray, angle, config)
+    info = {
+        "scale": round(scale, 3),
+        "skew": angle,
+        "line_px": round(probe_line_px / probe_scale * scale, 1) if probe_line_px else None,
+    }
+    return prepared, info
@@ -1,14 +1,31 @@
-import fitz  # PyMuPDF
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import pandas as pd
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Request
+import numpy as np
+import asyncio
+import hmac
 import json
 import logging
-from typing import List, Dict, Set, Tuple, Optional
+from typing import List, Dict, Set, Tuple, Optional, Union, TYPE_CHECKING
 from functools import lru_cache
 import io
 import os
-import re
+import time
 from dataclasses import dataclass
+from pydantic import BaseModel
+from skill_matrix import SkillMatrix, score_matrix, score_requirements
+from assignment_solver import solve_staffing
+from semantic_skills import prepare_embedding, score_requirements_semantic
+from employee_snapshot import EmployeeSnapshot
+from skill_taxonomy import get_taxonomy, normalize_skill
+from recommendation_store import RecommendationStore
+from availability_index import AVAILABILITY_CONFIG, AvailabilityIndex
+from extraction_cache import get_extraction_cache
+from document_engine import extract_pdf
+from resume_analysis import analyze_resume_file, analyze_resume_text
+from extract_skills import PROCESSING_CONFIG, run_in_process_pool
+from upload_ingest import check_file_count, spool_upload
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # ============================================
 # LOGGING SETUP
@@ -19,13 +36,22 @@ logger = logging.getLogger("recommendation_logger")
 router = APIRouter()
 
 # ============================================
-# SUPABASE CONNECTION - LAZY INITIALIZATION
+# SUPABASE CONNECTION - LAZY ASYNC INITIALIZATION
 # ============================================
+# Pooled connections shared by every recommendation request
+HTTP_POOL_CONFIG = {
+    "max_connections": int(os.getenv("SUPABASE_MAX_CONNECTIONS", 20)),
+    "max_keepalive_connections": int(os.getenv("SUPABASE_MAX_KEEPALIVE", 10)),
+    "timeout": float(os.getenv("SUPABASE_TIMEOUT_SECONDS", 30)),
+}
+
 supabase = None
+_http_client = None
+_supabase_lock = asyncio.Lock()
 
-def get_supabase_client():
-    """Initialize Supabase client only when needed"""
-    global supabase
+async def get_supabase_client():
+    """Initialize the async Supabase client only when needed"""
+    global supabase, _http_client
     if supabase is not None:
         return supabase
     
@@ -41,40 +67,69 @@ def get_supabase_client():
         logger.error("💡 Set it with: set SUPABASE_SERVICE_KEY=your_key_here")
         return None
     
+    async with _supabase_lock:
+        if supabase is not None:
+            return supabase
+        try:
+            import httpx
+            from supabase import acreate_client, AsyncClientOptions
+            _http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=HTTP_POOL_CONFIG["max_connections"],
+                    max_keepalive_connections=HTTP_POOL_CONFIG["max_keepalive_connections"]
+                ),
+                timeout=HTTP_POOL_CONFIG["timeout"],
+                follow_redirects=True
+            )
+            supabase = await acreate_client(url, key, options=AsyncClientOptions(httpx_client=_http_client))
+            logger.info("✅ Supabase async client initialized successfully")
+            return supabase
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize Supabase client: {e}")
+            return None
+
+async def close_supabase_client():
+    """Release pooled connections on shutdown"""
+    global supabase, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    supabase = _http_client = None
+
+# ============================================
+# REQUEST CANCELLATION
+# ============================================
+async def _wait_for_disconnect(request: Request):
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+async def gather_or_cancel(request: Request, *aws):
+    """
+    Run awaitables concurrently. If one fails or the client disconnects,
+    the rest are cancelled instead of running to completion.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    gathered = asyncio.gather(*tasks)
     try:
-        from supabase import create_client
-        supabase = create_client(url, key)
-        logger.info("✅ Supabase client initialized successfully")
-        return supabase
-    except Exception as e:
-        logger.error(f"❌ Failed to initialize Supabase client: {e}")
-        return None
+        done, _ = await asyncio.wait({gathered, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if gathered in done:
+            return gathered.result()
+        logger.info("Client disconnected; cancelling pending recommendation fetches")
+        raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        watcher.cancel()
+        for task in tasks:
+            task.cancel()
+        if not gathered.done():
+            gathered.cancel()
 
 # ============================================
 # CONSTANTS & CONFIGURATION
 # ============================================
-SKILL_MAP = {
-    "python": {"python", "python3", "python programming", "python basics"},
-    "java": {"java", "java basics", "java programming"},
-    "javascript": {"javascript", "js", "js programming"},
-    "html": {"html", "html5"},
-    "css": {"css", "css3"},
-    "figma": {"figma", "ui/ux design tool"},
-    "kotlin": {"kotlin", "kotlin programming"},
-    "api_integration": {"api integration", "api design", "rest api", "rest api integration"},
-    "ui": {"ui", "ui design", "user interface"},
-    "ux": {"ux", "ux design", "user experience"}
-}
-
 EXP_WEIGHT = {"beginner": 1, "intermediate": 2, "advanced": 3}
+RECOMMENDATION_MODES = ("greedy", "optimal", "semantic")
 MANAGER_ROLES = {"pm", "project manager", "proj. mgr.", "rm", "resource manager", "resource lead"}
 
-# Pre-compute normalized skill mapping for faster lookups
-NORMALIZED_SKILL_LOOKUP = {}
-for normalized, variants in SKILL_MAP.items():
-    for variant in variants:
-        NORMALIZED_SKILL_LOOKUP[variant] = normalized
-
 # ============================================
 # DATA CLASSES
 # ============================================
@@ -87,55 +142,27 @@ class PDFData:
 # ============================================
 # PDF PROCESSING WITH PyMuPDF
 # ============================================
+# All PDF parsing goes through document_engine. The resume endpoints open each
+# upload once and collect every artifact they report in the same page walk;
+# the helpers below serve callers that need a single artifact. PyMuPDF (and
+# pandas, which table.to_pandas() imports) load on the first resume request or
+# during startup warm-up, not when the API process starts.
+def import_pdf_engine() -> Dict:
+    """Load PyMuPDF and pandas ahead of the first resume request (startup warm-up)"""
+    import fitz  # PyMuPDF
+    import pandas  # noqa: F401
+    return {"pymupdf": fitz.VersionBind}
+
 def extract_text_from_pdf(pdf_bytes: bytes) -> PDFData:
     """
-    Extract text from PDF using PyMuPDF with fallback strategies
+    Extract text from PDF in memory through the shared document engine
     """
     try:
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        num_pages = pdf_document.page_count
-        full_text = []
-        metadata = {}
-        
-        # Extract metadata
-        doc_metadata = pdf_document.metadata
-        if doc_metadata:
-            metadata = {
-                "title": doc_metadata.get("title", ""),
-                "author": doc_metadata.get("author", ""),
-                "subject": doc_metadata.get("subject", ""),
-                "keywords": doc_metadata.get("keywords", ""),
-                "creator": doc_metadata.get("creator", ""),
-                "producer": doc_metadata.get("producer", ""),
-                "creation_date": doc_metadata.get("creationDate", ""),
-                "modification_date": doc_metadata.get("modDate", "")
-            }
-        
-        # Extract text from each page
-        for page_num in range(num_pages):
-            page = pdf_document[page_num]
-            
-            # Method 1: Standard text extraction
-            text = page.get_text()
-            
-            # Method 2: If no text found, try with textpage for better extraction
-            if not text.strip():
-                textpage = page.get_textpage()
-                text = textpage.extractText()
-            
-            # Method 3: If still no text, try OCR-like extraction with blocks
-            if not text.strip():
-                blocks = page.get_text("blocks")
-                text = "\n".join([block[4] for block in blocks if block[4]])
-            
-            full_text.append(text)
-        
-        pdf_document.close()
-        
+        content = extract_pdf(pdf_bytes)
         return PDFData(
-            text="\n".join(full_text),
-            metadata=metadata,
-            num_pages=num_pages
+            text=content.text,
+            metadata=content.metadata,
+            num_pages=content.page_count
         )
         
     except Exception as e:
@@ -147,57 +174,20 @@ def extract_text_with_coordinates(pdf_bytes: bytes) -> List[Dict]:
     Extract text with coordinates for structured analysis
     """
     try:
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        structured_data = []
-        
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document[page_num]
-            
-            # Get text with detailed information
-            blocks = page.get_text("dict")["blocks"]
-            
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            structured_data.append({
-                                "page": page_num + 1,
-                                "text": span["text"],
-                                "bbox": span["bbox"],
-                                "font": span["font"],
-                                "size": span["size"],
-                                "flags": span["flags"]
-                            })
-        
-        pdf_document.close()
-        return structured_data
+        content = extract_pdf(pdf_bytes, spans=True)
+        return [span for page in content.pages for span in page.spans]
         
     except Exception as e:
         logger.error(f"Error extracting structured PDF data: {str(e)}")
         return []
 
-def extract_tables_from_pdf(pdf_bytes: bytes) -> List[pd.DataFrame]:
+def extract_tables_from_pdf(pdf_bytes: bytes) -> List["pd.DataFrame"]:
     """
     Extract tables from PDF using PyMuPDF
     """
     try:
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        tables = []
-        
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document[page_num]
-            
-            # Try to find tables by analyzing the page structure
-            tabs = page.find_tables()
-            
-            if tabs.tables:
-                for table in tabs.tables:
-                    # Convert table to pandas DataFrame
-                    df = table.to_pandas()
-                    tables.append(df)
-        
-        pdf_document.close()
-        return tables
+        content = extract_pdf(pdf_bytes, tables=True)
+        return [table for page in content.pages for table in page.tables]
         
     except Exception as e:
         logger.error(f"Error extracting tables from PDF: {str(e)}")
@@ -205,116 +195,19 @@ def extract_tables_from_pdf(pdf_bytes: bytes) -> List[pd.DataFrame]:
 
 def extract_images_from_pdf(pdf_bytes: bytes) -> List[Dict]:
     """
-    Extract images from PDF
+    Image metadata (page, size, format) from PDF; image data is not decoded
     """
     try:
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        images = []
-        
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document[page_num]
-            image_list = page.get_images()
-            
-            for img_index, img in enumerate(image_list):
-                xref = img[0]
-                base_image = pdf_document.extract_image(xref)
-                
-                images.append({
-                    "page": page_num + 1,
-                    "index": img_index,
-                    "width": base_image["width"],
-                    "height": base_image["height"],
-                    "format": base_image["ext"],
-                    "data": base_image["image"][:100] if base_image.get("image") else None  # Preview only
-                })
-        
-        pdf_document.close()
-        return images
+        content = extract_pdf(pdf_bytes, images=True)
+        return [image for page in content.pages for image in page.images]
         
     except Exception as e:
         logger.error(f"Error extracting images from PDF: {str(e)}")
         return []
 
-# ============================================
-# TEXT ANALYSIS FUNCTIONS
-# ============================================
-def analyze_resume_text(text: str) -> Dict:
-    """
-    Analyze resume text to extract skills, experience, and other details
-    """
-    # Convert to lowercase for case-insensitive matching
-    text_lower = text.lower()
-    
-    # Extract potential skills
-    found_skills = []
-    for normalized_skill, variants in SKILL_MAP.items():
-        for variant in variants:
-            if variant in text_lower:
-                found_skills.append(normalized_skill)
-                break  # Avoid duplicate adds if multiple variants match
-    
-    # Extract experience level patterns
-    experience_level = "beginner"  # default
-    exp_patterns = {
-        "advanced": r"\b(senior|lead|expert|advanced|10\+|10\+\s*years)\b",
-        "intermediate": r"\b(mid-level|intermediate|3-5|3\+|5\+|3-5\s*years)\b",
-        "beginner": r"\b(junior|entry-level|fresher|0-2|1-2|0-3\s*years)\b"
-    }
-    
-    for level, pattern in exp_patterns.items():
-        if re.search(pattern, text_lower, re.IGNORECASE):
-            experience_level = level
-            break
-    
-    # Extract years of experience
-    years_exp = 0
-    year_patterns = [
-        r"(\d+)\s*\+?\s*years?\s*(?:of)?\s*experience",
-        r"experience\s*:\s*(\d+)\s*years?",
-        r"(\d+)\s*years?\s*(?:of)?\s*exp"
-    ]
-    
-    for pattern in year_patterns:
-        match = re.search(pattern, text_lower)
-        if match:
-            try:
-                years_exp = int(match.group(1))
-                break
-            except:
-                pass
-    
-    # Extract potential job titles (simplified)
-    title_keywords = [
-        "developer", "engineer", "designer", "analyst", 
-        "manager", "architect", "consultant", "specialist"
-    ]
-    
-    possible_titles = []
-    for keyword in title_keywords:
-        if keyword in text_lower:
-            # Look for patterns like "Software Developer" or "Senior Engineer"
-            pattern = fr"\b(\w+\s+{keyword}|{keyword}\s+\w+)\b"
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            possible_titles.extend(matches)
-    
-    return {
-        "skills": list(set(found_skills)),
-        "experience_level": experience_level,
-        "years_experience": years_exp,
-        "possible_titles": list(set(possible_titles))[:5],  # Top 5 unique
-        "text_length": len(text),
-        "unique_words": len(set(text_lower.split()))
-    }
-
 # ============================================
 # UTILITY FUNCTIONS
 # ============================================
-@lru_cache(maxsize=512)
-def normalize_skill(skill: str) -> str:
-    """Cached skill normalization for faster repeated lookups"""
-    skill_lower = skill.lower().strip()
-    return NORMALIZED_SKILL_LOOKUP.get(skill_lower, skill_lower)
-
 def parse_skills(s) -> List[str]:
     """Fast skill parsing with type checking"""
     if isinstance(s, list):
@@ -365,13 +258,26 @@ def calculate_assignment_details(assignment_type: str, total_available_hours: in
     
     return assigned_hours, allocation_percent, final_assignment_type
 
+# ============================================
+# RESUME RESULT CACHE
+# ============================================
+# Results are keyed by file content, so re-uploading a CV skips parsing; the
+# taxonomy version is part of the key because the analysis depends on it.
+# Lookups and writes may touch the disk tier, so they run in a thread.
+def resume_cache_scope(endpoint: str, *options) -> Tuple:
+    return ("project_recommendation", endpoint, get_taxonomy().version, *options)
+
+def resume_cache_key(pdf_bytes: bytes, endpoint: str, *options) -> str:
+    return get_extraction_cache().key(pdf_bytes, *resume_cache_scope(endpoint, *options))
+
 # ============================================
 # PDF PROCESSING ENDPOINT
 # ============================================
 @router.post("/process-resume/")
-async def process_resume(file: UploadFile = File(...)):
+async def process_resume(file: UploadFile = File(...), tables: bool = True):
     """
-    Process resume PDF and extract information
+    Process resume PDF and extract information.
+    tables=false skips table detection; extracted_tables is then null.
     """
     try:
         logger.info(f"Processing resume: {file.filename}")
@@ -379,177 +285,442 @@ async def process_resume(file: UploadFile = File(...)):
         # Read PDF file
         pdf_bytes = await file.read()
         
-        # Extract text from PDF
-        pdf_data = extract_text_from_pdf(pdf_bytes)
+        cache_key = resume_cache_key(pdf_bytes, "process-resume", f"tables={tables}")
+        cached = await asyncio.to_thread(get_extraction_cache().get, cache_key)
+        if cached is not None:
+            return {"filename": file.filename, **cached}
         
-        # Analyze resume content
-        analysis = analyze_resume_text(pdf_data.text)
+        # One open, one page walk: text, tables (if asked for), image metadata
+        content = extract_pdf(pdf_bytes, tables=tables, images=True)
+        text = content.text
         
-        # Optional: Extract tables (if needed)
-        tables = extract_tables_from_pdf(pdf_bytes)
-        
-        # Optional: Extract images (preview only)
-        images = extract_images_from_pdf(pdf_bytes)
+        # Analyze resume content
+        analysis = analyze_resume_text(text)
         
-        return {
-            "filename": file.filename,
-            "num_pages": pdf_data.num_pages,
-            "metadata": pdf_data.metadata,
+        result = {
+            "num_pages": content.page_count,
+            "metadata": content.metadata,
             "analysis": analysis,
-            "extracted_tables": len(tables),
-            "extracted_images": len(images),
-            "text_preview": pdf_data.text[:1000] + "..." if len(pdf_data.text) > 1000 else pdf_data.text
+            "extracted_tables": sum(len(page.tables) for page in content.pages) if tables else None,
+            "extracted_images": sum(len(page.images) for page in content.pages),
+            "text_preview": text[:1000] + "..." if len(text) > 1000 else text
         }
+        await asyncio.to_thread(get_extraction_cache().put, cache_key, result)
+        return {"filename": file.filename, **result}
         
     except Exception as e:
         logger.error(f"Error processing resume: {str(e)}")
         return {"error": str(e)}
 
+# ============================================
+# RECOMMENDATION SCORING
+# ============================================
+EMPLOYEE_DEFAULTS = {
+    "skills": [],
+    "total_available_hours": 40,
+    "job_title": "",
+    "status": "",
+    "experience_level": ""
+}
+
+def prepare_employee(user: Dict) -> Dict:
+    """Parse and normalize one user_details row and flag whether it can be recommended"""
+    emp = {**EMPLOYEE_DEFAULTS, **user}
+    emp["skills_normalized"] = set(normalize_skill(s) for s in parse_skills(emp["skills"]))
+    status = emp["status"]
+    emp["eligible"] = (
+        isinstance(status, str) and status.lower() == "available"
+        and normalize_role(emp["job_title"] or "") == "employee"
+    )
+    return emp
+
+employee_snapshot = EmployeeSnapshot(prepare_employee)
+recommendation_store = RecommendationStore(normalize_skill)
+availability_index = AvailabilityIndex()
+
+def _mark_committed(user_ids):
+    """Mark materialized rows of employees whose committed hours changed"""
+    if user_ids:
+        recommendation_store.employees_touched(
+            r for r in employee_snapshot.records() if r.get("user_id") in user_ids
+        )
+
+_skill_version = None
+
+def _check_skill_version():
+    """Prepared records and stored results hold normalized skills; redo them after a taxonomy edit"""
+    global _skill_version
+    version = get_taxonomy().version
+    if version == _skill_version:
+        return
+    if _skill_version is not None:
+        employee_snapshot.invalidate()
+    recommendation_store.ensure_skill_version(version)
+    _skill_version = version
+
+async def _sync_employees(supabase_client):
+    _check_skill_version()
+    changes, committed = await asyncio.gather(
+        employee_snapshot.refresh(supabase_client),
+        availability_index.refresh(supabase_client)
+    )
+    # Mark the materialized rows the changed employees could appear in
+    if recommendation_store.needs_reconcile:
+        recommendation_store.reconcile(employee_snapshot.records())
+    elif changes:
+        recommendation_store.employees_changed(changes)
+    _mark_committed(committed)
+    return changes
+
+async def refresh_employee_snapshot(supabase_client):
+    """
+    Sync the shared snapshot. Shielded so one client disconnecting does not
+    abort a sync other requests are waiting on.
+    """
+    return await asyncio.shield(_sync_employees(supabase_client))
+
+def score_project_requirements(project_req: List[Dict], employees: List[Dict], skill_matrix: SkillMatrix,
+                               mode: str = "greedy") -> List[Dict]:
+    """
+    Score all requirement rows of a project against eligible employees in one pass.
+    "greedy" picks the top candidates of each row independently; "optimal" staffs
+    the project as a whole (best effort, see assignment_solver) without booking
+    anyone beyond their available hours;
+    "semantic" ranks by skill-embedding similarity so related skills count too.
+    """
+    required_skills = [set(normalize_skill(s) for s in req["required_skills"]) for req in project_req]
+    levels = [req["experience_level"] for req in project_req]
+    quantities = [int(req["quantity_needed"]) for req in project_req]
+    # Capacity left after existing project assignments; fully booked employees are skipped
+    remaining = [
+        availability_index.remaining_hours(emp.get('user_id'), emp.get('total_available_hours', 40))
+        for emp in employees
+    ]
+    fully_booked = np.array(remaining) <= 0
+
+    seat_hours = None
+    if mode == "optimal":
+        plan = solve_staffing(
+            score_matrix(skill_matrix, required_skills, levels, EXP_WEIGHT, fully_booked),
+            quantities,
+            [req.get('preferred_assignment_type', 'Full-Time') for req in project_req],
+            remaining,
+            calculate_assignment_details
+        )
+        selections, seat_hours = plan.selections, plan.hours
+        logger.info("Staffing solver total score: %d", plan.total_score)
+    elif mode == "semantic":
+        selections = score_requirements_semantic(skill_matrix, required_skills, levels, quantities,
+                                                 EXP_WEIGHT, fully_booked)
+    else:
+        selections = score_requirements(skill_matrix, required_skills, levels, quantities, EXP_WEIGHT, fully_booked)
+
+    recommendations = []
+    for row, (req, selected) in enumerate(zip(project_req, selections)):
+        logger.info("Evaluating requirement: %s (%s)",
+                   req['required_skills'], req['experience_level'].lower())
+
+        recommended_list = []
+        preferred_type = req.get('preferred_assignment_type', 'Full-Time')
+
+        for seat, idx in enumerate(selected):
+            emp = employees[idx]
+            total_hours = emp.get('total_available_hours', 40)
+            if seat_hours is not None:
+                # Hours already account for the employee's other seats in this project
+                assigned_hours, allocation_percent, final_type = seat_hours[row][seat]
+            else:
+                assigned_hours, allocation_percent, final_type = calculate_assignment_details(
+                    preferred_type, remaining[idx]
+                )
+
+            recommended_list.append({
+                'employee_id': emp['employee_id'],
+                'user_id': emp['id'],
+                'assignment_type': final_type,
+                'assigned_hours': assigned_hours,
+                'allocation_percent': allocation_percent,
+                'total_available_hours': total_hours,
+                'remaining_hours': remaining[idx]
+            })
+
+        logger.info("Recommended %d employees for %s",
+                   len(recommended_list), req['required_skills'])
+
+        recommendations.append({
+            'experience_level': req['experience_level'],
+            'required_skills': req['required_skills'],
+            'preferred_assignment_type': req.get('preferred_assignment_type'),
+            'recommended_employees': recommended_list
+        })
+
+    return recommendations
+
+# ============================================
+# BATCH RECOMMENDATION ENDPOINT
+# ============================================
+class BatchRecommendationRequest(BaseModel):
+    project_ids: List[int]
+    mode: str = "greedy"
+
+def validate_mode(mode: str) -> str:
+    if mode not in RECOMMENDATION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown mode '{mode}'. Expected one of: {', '.join(RECOMMENDATION_MODES)}"
+        )
+    return mode
+
+async def _fetch_requirements(supabase_client, project_ids: List[int]) -> Dict[int, List[Dict]]:
+    """Requirement rows of the given projects in one query, grouped by project"""
+    if not project_ids:
+        return {}
+    response = await supabase_client.table("project_requirements").select("*") \
+        .in_("project_id", project_ids).execute()
+    grouped = {}
+    for req in response.data or []:
+        grouped.setdefault(req["project_id"], []).append(req)
+    return grouped
+
+def recommend_project(project_id: int, project_req: List[Dict], entry: Optional[Dict], mode: str,
+                      employees: List[Dict], skill_matrix: SkillMatrix,
+                      recommendations: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Recommendations for one project, kept in step with its materialized entry.
+    entry is the stored entry or None for freshly fetched requirements;
+    recommendations may carry rows already scored for a project without one.
+    """
+    if entry is None:
+        if recommendations is None:
+            recommendations = score_project_requirements(project_req, employees, skill_matrix, mode)
+        if mode == "optimal":
+            greedy = score_project_requirements(project_req, employees, skill_matrix)
+            recommendation_store.put_project(project_id, project_req, greedy, recommendations)
+        elif mode == "greedy":
+            recommendation_store.put_project(project_id, project_req, recommendations)
+        return recommendations
+
+    if mode != "greedy":
+        recommendations = score_project_requirements(project_req, employees, skill_matrix, mode)
+        if mode == "optimal":
+            recommendation_store.put_optimal(project_id, recommendations)
+        return recommendations
+
+    # Rescore only the rows an employee change could have affected
+    dirty = recommendation_store.dirty_rows(entry)
+    rescored = score_project_requirements([project_req[i] for i in dirty], employees, skill_matrix)
+    recommendation_store.put_rows(project_id, dict(zip(dirty, rescored)))
+    logger.info("Recomputed %d of %d requirement rows for project_id=%s", len(dirty), len(project_req), project_id)
+    return entry["rows"]
+
+# Registered before /recommendations/{project_id} so "batch" is not parsed as an id
+@router.post("/recommendations/batch")
+async def get_batch_recommendations(payload: BatchRecommendationRequest, request: Request):
+    """Get employee recommendations for many projects against one employee snapshot"""
+    try:
+        mode = validate_mode(payload.mode)
+        project_ids = list(dict.fromkeys(payload.project_ids))
+        if not project_ids:
+            return {"recommendations": {}}
+
+        supabase_client = await get_supabase_client()
+        if not supabase_client:
+            raise HTTPException(
+                status_code=500, 
+                detail="Database connection not available. Check SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables."
+            )
+
+        # Only projects missing from the materialized store need their requirements;
+        # they are fetched in one query, concurrently with the snapshot sync
+        missing = [pid for pid in project_ids if recommendation_store.lookup(pid) is None]
+        logger.info("Fetching project requirements for %d of %d projects", len(missing), len(project_ids))
+        fetched, _ = await gather_or_cancel(
+            request,
+            _fetch_requirements(supabase_client, missing),
+            refresh_employee_snapshot(supabase_client)
+        )
+        # The sync may have expired entries that were present before it
+        entries = {pid: recommendation_store.lookup(pid) for pid in project_ids if pid not in missing}
+        dropped = [pid for pid, entry in entries.items() if entry is None]
+        if dropped:
+            fetched.update(await _fetch_requirements(supabase_client, dropped))
+
+        results = {project_id: [] for project_id in project_ids}
+        pending = {}  # project_id -> stored entry, still to be (partly) scored
+        for project_id, entry in entries.items():
+            if entry is None:
+                continue
+            # Semantic rankings shift with every employee change, so they are never materialized
+            cached = recommendation_store.result(project_id, mode) if mode != "semantic" else None
+            if cached is not None:
+                results[project_id] = cached
+            else:
+                pending[project_id] = entry
+        if not fetched and not pending:
+            return {"recommendations": results}
+
+        eligible_employees, skill_matrix = employee_snapshot.eligible()
+
+        logger.info("Eligible employees after filtering: %d found", len(eligible_employees))
+
+        if not eligible_employees:
+            return {"recommendations": results}
+
+        if mode == "semantic":
+            # Learned in a thread; scoring below then finds it ready
+            await prepare_embedding(skill_matrix)
+
+        scored = {}
+        if mode != "optimal" and fetched:
+            # Score every fetched requirement row in one matrix product; optimal
+            # mode staffs each project as a whole, independently of the others
+            rows = [req for reqs in fetched.values() for req in reqs]
+            flat = iter(score_project_requirements(rows, eligible_employees, skill_matrix, mode))
+            scored = {pid: [next(flat) for _ in reqs] for pid, reqs in fetched.items()}
+
+        for project_id, project_req in fetched.items():
+            results[project_id] = recommend_project(project_id, project_req, None, mode, eligible_employees,
+                                                    skill_matrix, scored.get(project_id))
+        for project_id, entry in pending.items():
+            results[project_id] = recommend_project(project_id, entry["requirements"], entry, mode,
+                                                    eligible_employees, skill_matrix)
+
+        return {"recommendations": results}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in batch recommendation system: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+# ============================================
+# EMPLOYEE SNAPSHOT MAINTENANCE
+# ============================================
+class SnapshotInvalidation(BaseModel):
+    user_ids: Optional[List[Union[int, str]]] = None
+
+@router.post("/recommendations/snapshot/invalidate")
+async def invalidate_employee_snapshot(payload: Optional[SnapshotInvalidation] = None):
+    """Drop cached employee rows so the next recommendation re-fetches them"""
+    employee_snapshot.invalidate(payload.user_ids if payload else None)
+    return {"success": True, "snapshot": employee_snapshot.stats()}
+
+# ============================================
+# MATERIALIZED RECOMMENDATION MAINTENANCE
+# ============================================
+WEBHOOK_CONFIG = {
+    # Shared secret the Supabase database webhooks send in the X-Webhook-Secret
+    # header; the webhook is refused while it is unset
+    "secret": os.getenv("RECOMMENDATION_WEBHOOK_SECRET", ""),
+}
+
+class StoreInvalidation(BaseModel):
+    project_ids: Optional[List[int]] = None
+
+class DatabaseWebhook(BaseModel):
+    """Payload of a Supabase database webhook"""
+    type: str
+    table: str
+    record: Optional[Dict] = None
+    old_record: Optional[Dict] = None
+
+@router.post("/recommendations/store/invalidate")
+async def invalidate_recommendation_store(payload: Optional[StoreInvalidation] = None):
+    """Drop materialized recommendations of the given projects, or all of them"""
+    recommendation_store.invalidate_projects(payload.project_ids if payload else None)
+    return {"success": True, "store": recommendation_store.stats()}
+
+def _check_webhook_secret(secret: Optional[str]):
+    expected = WEBHOOK_CONFIG["secret"]
+    if not expected:
+        raise HTTPException(status_code=503, detail="Webhook disabled: RECOMMENDATION_WEBHOOK_SECRET is not set")
+    if not secret or not hmac.compare_digest(secret.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+
+@router.post("/recommendations/webhook")
+async def recommendation_webhook(payload: DatabaseWebhook, x_webhook_secret: Optional[str] = Header(None)):
+    """
+    Point Supabase database webhooks for project_requirements, user_details and
+    project_assignments here, with an X-Webhook-Secret header matching
+    RECOMMENDATION_WEBHOOK_SECRET. Assignment changes update committed hours in place.
+    Requirement edits drop their project; employee edits are re-fetched on the next sync,
+    which then marks only the requirement rows sharing a skill with that employee.
+    """
+    _check_webhook_secret(x_webhook_secret)
+    rows = [r for r in (payload.record, payload.old_record) if r]
+    if payload.table == "project_assignments":
+        _mark_committed(availability_index.apply_change(payload.record, payload.old_record))
+    elif payload.table == "project_requirements":
+        project_ids = {r["project_id"] for r in rows if r.get("project_id") is not None}
+        recommendation_store.invalidate_projects(project_ids)
+    elif payload.table == "user_details":
+        employee_snapshot.invalidate({r["id"] for r in rows if r.get("id") is not None})
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported table: {payload.table}")
+    return {"success": True, "store": recommendation_store.stats()}
+
 # ============================================
 # MAIN RECOMMENDATION ENDPOINT
 # ============================================
+# Registered after the static /recommendations/* routes above: Starlette
+# matches in order, and {project_id} would otherwise swallow "webhook" etc.
 @router.post("/recommendations/{project_id}")
-def get_recommendations(project_id: int):
-    """Get employee recommendations for a project"""
+async def get_recommendations(project_id: int, request: Request, mode: str = "greedy"):
+    """Get employee recommendations for a project (mode: greedy, optimal or semantic)"""
     try:
+        validate_mode(mode)
+
         # Get Supabase client
-        supabase_client = get_supabase_client()
+        supabase_client = await get_supabase_client()
         if not supabase_client:
             raise HTTPException(
                 status_code=500, 
                 detail="Database connection not available. Check SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables."
             )
         
-        logger.info("Fetching project requirements for project_id=%s", project_id)
-        
-        # Fetch project requirements
-        project_req = supabase_client.table("project_requirements").select("*")\
-            .eq("project_id", project_id).execute().data
-        
-        if not project_req:
-            logger.info("No project requirements found for project_id=%s", project_id)
-            return {"recommendations": []}
-
-        # Convert to DataFrame and normalize skills
-        projects = pd.DataFrame(project_req)
-        projects['required_skills_normalized'] = projects['required_skills'].apply(
-            lambda skills: set(normalize_skill(s) for s in skills)
-        )
+        entry = recommendation_store.lookup(project_id)
+        if entry is not None:
+            # Requirements are materialized; only the employee sync is needed
+            await gather_or_cancel(request, refresh_employee_snapshot(supabase_client))
+            entry = recommendation_store.lookup(project_id)
+
+        if entry is None:
+            logger.info("Fetching project requirements for project_id=%s", project_id)
+
+            # Fetch project requirements while the employee snapshot syncs
+            # (the sync is a no-op between refresh intervals)
+            requirements_response, _ = await gather_or_cancel(
+                request,
+                supabase_client.table("project_requirements").select("*")
+                    .eq("project_id", project_id).execute(),
+                refresh_employee_snapshot(supabase_client)
+            )
+            project_req = requirements_response.data
 
-        # Fetch all employees
-        users = supabase_client.table("user_details").select("*").execute().data
-        if not users:
-            logger.info("No employees found in the database.")
-            return {"recommendations": []}
+            if not project_req:
+                logger.info("No project requirements found for project_id=%s", project_id)
+                return {"recommendations": []}
+        else:
+            # Semantic rankings shift with every employee change, so they are never materialized
+            cached = recommendation_store.result(project_id, mode) if mode != "semantic" else None
+            if cached is not None:
+                return {"recommendations": cached}
+            project_req = entry["requirements"]
 
-        # Prepare employees DataFrame
-        employees = pd.DataFrame(users)
-        
-        # Set default values for missing columns
-        default_columns = {
-            "skills": [],
-            "total_available_hours": 40,
-            "job_title": "",
-            "status": "",
-            "experience_level": ""
-        }
-        
-        for col, default_val in default_columns.items():
-            if col not in employees.columns:
-                employees[col] = default_val
-
-        # Parse and normalize skills efficiently
-        employees['skills_parsed'] = employees['skills'].apply(parse_skills)
-        employees['skills_normalized'] = employees['skills_parsed'].apply(
-            lambda skills: set(normalize_skill(s) for s in skills)
-        )
-        
-        # Normalize roles
-        employees['role'] = employees['job_title'].apply(normalize_role)
-        
-        # Filter eligible employees once
-        eligible_employees = employees[
-            (employees['role'] == "employee") & 
-            (employees['status'].str.lower() == "available")
-        ].copy()
+        eligible_employees, skill_matrix = employee_snapshot.eligible()
 
         logger.info("Eligible employees after filtering: %d found", len(eligible_employees))
 
-        if eligible_employees.empty:
+        if not eligible_employees:
             logger.info("No eligible employees available.")
             return {"recommendations": []}
 
-        # Pre-compute experience level groups for faster filtering
-        exp_groups = {
-            level: group for level, group in 
-            eligible_employees.groupby(eligible_employees['experience_level'].str.lower())
-        }
+        if mode == "semantic":
+            # Learned in a thread; scoring below then finds it ready
+            await prepare_embedding(skill_matrix)
 
-        def recommend_employees_optimized(project_row):
-            """Optimized recommendation function with pre-computed data"""
-            exp_level = project_row['experience_level'].lower()
-            required_skills_set = project_row['required_skills_normalized']
-            
-            logger.info("Evaluating requirement: %s (%s)", 
-                       project_row['required_skills'], exp_level)
-            
-            # Get candidates from pre-grouped data
-            candidates = exp_groups.get(exp_level)
-            
-            if candidates is None or candidates.empty:
-                logger.debug("No candidates found for experience level: %s", exp_level)
-                return []
-
-            # Vectorized skill matching
-            candidates = candidates.copy()
-            candidates['match_count'] = candidates['skills_normalized'].apply(
-                lambda emp_skills: count_matches_fast(emp_skills, required_skills_set)
-            )
-            
-            # Filter and score in one pass
-            candidates = candidates[candidates['match_count'] > 0].copy()
-            candidates['score'] = candidates['match_count'] * EXP_WEIGHT.get(exp_level, 1)
-            
-            # Sort and limit
-            candidates = candidates.nlargest(project_row['quantity_needed'], 'score')
-
-            # Build recommendations
-            recommended_list = []
-            preferred_type = project_row.get('preferred_assignment_type', 'Full-Time')
-            
-            for _, emp in candidates.iterrows():
-                total_hours = emp.get('total_available_hours', 40)
-                assigned_hours, allocation_percent, final_type = calculate_assignment_details(
-                    preferred_type, total_hours
-                )
-
-                recommended_list.append({
-                    'employee_id': emp['employee_id'],
-                    'user_id': emp['id'],
-                    'assignment_type': final_type,
-                    'assigned_hours': assigned_hours,
-                    'allocation_percent': allocation_percent,
-                    'total_available_hours': total_hours
-                })
-
-            logger.info("Recommended %d employees for %s", 
-                       len(recommended_list), project_row['required_skills'])
-            return recommended_list
-
-        # Apply recommendations
-        projects['recommended_employees'] = projects.apply(
-            recommend_employees_optimized, axis=1
-        )
-
-        # Return results
-        return {
-            "recommendations": projects[[
-                'experience_level', 
-                'required_skills', 
-                'preferred_assignment_type', 
-                'recommended_employees'
-            ]].to_dict(orient='records')
-        }
+        recommendations = recommend_project(project_id, project_req, entry, mode, eligible_employees, skill_matrix)
+        return {"recommendations": recommendations}
         
     except HTTPException:
         raise
@@ -557,13 +728,64 @@ def get_recommendations(project_id: int):
         logger.error(f"Error in recommendation system: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+# ============================================
+# AVAILABILITY ENDPOINTS
+# ============================================
+async def _ensure_availability():
+    supabase_client = await get_supabase_client()
+    if not supabase_client:
+        raise HTTPException(
+            status_code=500,
+            detail="Database connection not available. Check SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables."
+        )
+    # No-op until the periodic resync is due; the webhook and /availability/refresh
+    # keep it current in between
+    _mark_committed(await availability_index.refresh(supabase_client))
+    return supabase_client
+
+class AvailabilityRefresh(BaseModel):
+    user_ids: List[int]
+
+@router.get("/availability")
+async def get_availability():
+    """Hours every user is committed to across active project assignments"""
+    await _ensure_availability()
+    users = availability_index.users()
+    return {
+        "users": users,
+        "total_assignments": sum(u["assignments"] for u in users.values()),
+    }
+
+@router.post("/availability/refresh")
+async def refresh_availability(payload: AvailabilityRefresh):
+    """
+    Re-read the assignments of the given users. The frontend calls this after it
+    writes project_assignments itself, so deployments without the database webhook
+    don't serve stale hours (or over-recommend the employee) until the resync.
+    Rows come from Supabase, never from the caller, and only a few users at a time.
+    """
+    limit = AVAILABILITY_CONFIG["max_reload_users"]
+    if len(payload.user_ids) > limit:
+        raise HTTPException(status_code=400, detail=f"Too many users: at most {limit} per refresh")
+    supabase_client = await _ensure_availability()
+    changed = await availability_index.reload_users(supabase_client, payload.user_ids)
+    _mark_committed(changed)
+    return {"success": True, "changed_users": sorted(changed), "availability": availability_index.stats()}
+
+@router.get("/availability/{user_id}")
+async def get_user_availability(user_id: int):
+    """Committed hours of one user"""
+    await _ensure_availability()
+    return availability_index.user(user_id)
+
 # ============================================
 # ENHANCED RESUME PROCESSING ENDPOINT
 # ============================================
 @router.post("/process-resume-enhanced/")
-async def process_resume_enhanced(file: UploadFile = File(...)):
+async def process_resume_enhanced(file: UploadFile = File(...), tables: bool = True):
     """
-    Enhanced resume processing with PyMuPDF
+    Enhanced resume processing with PyMuPDF.
+    tables=false skips table detection; tables_found is then null.
     """
     try:
         logger.info(f"Processing resume (enhanced): {file.filename}")
@@ -571,19 +793,22 @@ async def process_resume_enhanced(file: UploadFile = File(...)):
         # Read PDF file
         pdf_bytes = await file.read()
         
-        # Extract text and metadata
-        pdf_data = extract_text_from_pdf(pdf_bytes)
+        cache_key = resume_cache_key(pdf_bytes, "process-resume-enhanced", f"tables={tables}")
+        cached = await asyncio.to_thread(get_extraction_cache().get, cache_key)
+        if cached is not None:
+            return {"filename": file.filename, **cached}
         
-        # Extract structured text with coordinates
-        structured_data = extract_text_with_coordinates(pdf_bytes)
+        # One open, one page walk: text, spans, tables (if asked for), image metadata
+        content = extract_pdf(pdf_bytes, spans=True, tables=tables, images=True)
+        text = content.text
+        structured_data = [span for page in content.pages for span in page.spans]
         
         # Analyze resume content
-        analysis = analyze_resume_text(pdf_data.text)
+        analysis = analyze_resume_text(text)
         
-        # Extract tables
-        tables = extract_tables_from_pdf(pdf_bytes)
+        found_tables = [table for page in content.pages for table in page.tables]
         table_data = []
-        for i, table in enumerate(tables):
+        for i, table in enumerate(found_tables):
             table_data.append({
                 "table_index": i,
                 "shape": table.shape,
@@ -591,32 +816,32 @@ async def process_resume_enhanced(file: UploadFile = File(...)):
                 "preview": table.head(3).to_dict(orient='records')
             })
         
-        # Extract images
-        images = extract_images_from_pdf(pdf_bytes)
+        images = [image for page in content.pages for image in page.images]
         
         # Generate statistics
-        word_count = len(pdf_data.text.split())
-        char_count = len(pdf_data.text)
-        paragraph_count = len([p for p in pdf_data.text.split('\n\n') if p.strip()])
+        word_count = len(text.split())
+        char_count = len(text)
+        paragraph_count = len([p for p in text.split('\n\n') if p.strip()])
         
-        return {
-            "filename": file.filename,
-            "num_pages": pdf_data.num_pages,
-            "metadata": pdf_data.metadata,
+        result = {
+            "num_pages": content.page_count,
+            "metadata": content.metadata,
             "analysis": analysis,
             "statistics": {
                 "word_count": word_count,
                 "character_count": char_count,
                 "paragraph_count": paragraph_count,
-                "tables_found": len(tables),
+                "tables_found": len(found_tables) if tables else None,
                 "images_found": len(images),
                 "structured_blocks": len(structured_data)
             },
             "tables": table_data,
             "images_preview": [{"page": img["page"], "dimensions": f"{img['width']}x{img['height']}"} 
                               for img in images[:5]],  # First 5 images only
-            "text_sample": pdf_data.text[:500]  # First 500 chars
+            "text_sample": text[:500]  # First 500 chars
         }
+        await asyncio.to_thread(get_extraction_cache().put, cache_key, result)
+        return {"filename": file.filename, **result}
         
     except Exception as e:
         logger.error(f"Error in enhanced resume processing: {str(e)}")
@@ -625,36 +850,69 @@ async def process_resume_enhanced(file: UploadFile = File(...)):
 # ============================================
 # BULK PDF PROCESSING ENDPOINT
 # ============================================
+# Files are spooled and parsed concurrently: parsing and analysis run in the
+# shared extraction process pool, so a batch takes about files / cores times
+# one CV instead of files times one CV, and the event loop stays free.
+BULK_RESUME_CONFIG = {
+    # Files of one request being spooled or parsed at once
+    "concurrency": int(os.getenv("BULK_RESUME_CONCURRENCY", PROCESSING_CONFIG["max_workers"])),
+}
+
+async def process_bulk_resume(file: UploadFile) -> Dict:
+    """Spool, parse and analyze one file of a bulk request; never raises for a bad file"""
+    file_start_time = time.perf_counter()
+    upload = None
+    try:
+        upload = await spool_upload(file)
+        cache_key = get_extraction_cache().key_for_digest(upload.sha256, *resume_cache_scope("process-multiple-resumes"))
+        result = await asyncio.to_thread(get_extraction_cache().get, cache_key)
+        if result is not None:
+            result["cached"] = True
+        else:
+            result = await run_in_process_pool(analyze_resume_file, upload.path)
+            await asyncio.to_thread(get_extraction_cache().put, cache_key, result)
+        return {
+            "filename": file.filename,
+            "status": "success",
+            **result,
+            "seconds": round(time.perf_counter() - file_start_time, 3)
+        }
+    except Exception as e:
+        logger.error(f"Error processing {file.filename}: {str(e)}")
+        error = str(e)
+        if upload is not None:
+            # Parser errors name the spool file; clients only know their own file name
+            error = error.replace(upload.path, file.filename or "upload")
+        return {
+            "filename": file.filename,
+            "status": "error",
+            "error": error,
+            "seconds": round(time.perf_counter() - file_start_time, 3)
+        }
+    finally:
+        if upload is not None:
+            upload.cleanup()
+
 @router.post("/process-multiple-resumes/")
-async def process_multiple_resumes(files: List[UploadFile] = File(...)):
+async def process_multiple_resumes(request: Request, files: List[UploadFile] = File(...)):
     """
-    Process multiple resumes in bulk
+    Process multiple resumes in bulk, at most BULK_RESUME_CONCURRENCY at a
+    time. Results keep the upload order; each reports its own seconds.
     """
-    results = []
-    
-    for file in files:
-        try:
-            pdf_bytes = await file.read()
-            pdf_data = extract_text_from_pdf(pdf_bytes)
-            analysis = analyze_resume_text(pdf_data.text)
-            
-            results.append({
-                "filename": file.filename,
-                "status": "success",
-                "num_pages": pdf_data.num_pages,
-                "analysis": analysis
-            })
-            
-        except Exception as e:
-            results.append({
-                "filename": file.filename,
-                "status": "error",
-                "error": str(e)
-            })
+    check_file_count(files)
+    start_time = time.perf_counter()
+    slots = asyncio.Semaphore(BULK_RESUME_CONFIG["concurrency"])
+
+    async def bounded(file: UploadFile):
+        async with slots:
+            return await process_bulk_resume(file)
+
+    results = await gather_or_cancel(request, *(bounded(file) for file in files))
     
     return {
         "total_files": len(files),
         "successful": len([r for r in results if r["status"] == "success"]),
         "failed": len([r for r in results if r["status"] == "error"]),
+        "duration": round(time.perf_counter() - start_time, 3),
         "results": results
-    }
\ No newline at end of file
+    }
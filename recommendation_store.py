@@ -0,0 +1,333 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("recommendation_logger")
+
+# ============================================
+# STORE CONFIGURATION
+# ============================================
+# Directory for the service's local state files
+DATA_DIR = os.getenv("APP_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+STORE_CONFIG = {
+    # SQLite file the store is persisted to; empty string keeps it in memory only
+    "path": os.getenv("RECOMMENDATION_STORE_PATH", os.path.join(DATA_DIR, "recommendation_store.sqlite3")),
+    # project_requirements edits only reach us through the webhook, so entries
+    # are re-fetched after this long in case one was missed
+    "ttl_seconds": float(os.getenv("RECOMMENDATION_STORE_TTL_SECONDS", 900)),
+}
+
+# Employee fields a recommendation payload depends on
+FINGERPRINT_FIELDS = ("employee_id", "experience_level", "total_available_hours", "eligible")
+
+# ============================================
+# MATERIALIZED RECOMMENDATIONS
+# ============================================
+# Per project the store keeps the requirement rows, the greedy result of every
+# row and the last optimal result. Rows are the unit of invalidation:
+#   - a project_requirements change drops the whole project (re-fetched on read)
+#   - an employee change marks only the rows sharing a skill with the employee's
+#     old or new skill set; those rows are rescored from the stored requirements
+# Everything runs on the event loop; writes go straight through to SQLite.
+# The file is opened by open() from the app lifespan, not at import, so the
+# connection belongs to the serving loop rather than whichever thread
+# imported the module.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id INTEGER PRIMARY KEY,
+    requirements TEXT NOT NULL,
+    rows TEXT NOT NULL,
+    optimal TEXT,
+    computed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS employees (
+    user_id TEXT PRIMARY KEY,
+    skills TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class RecommendationStore:
+    """
+    Materialized recommendations, recomputed only where a change can affect them.
+    `normalize` maps a raw required skill to the form used in skills_normalized.
+    """
+
+    def __init__(self, normalize: Callable[[str], str], config: Optional[Dict] = None):
+        self._normalize = normalize
+        self._config = {**STORE_CONFIG, **(config or {})}
+        self._projects: Dict[int, Dict] = {}
+        self._skill_index: Dict[str, Set[int]] = {}
+        # user_id -> (normalized skills, fingerprint) of the employee rows results were built from
+        self._employees: Dict[str, Tuple[Set[str], str]] = {}
+        self._needs_reconcile = False
+        self._skill_version: Optional[str] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._hits = self._partial = self._misses = 0
+
+    # ---------- Persistence ----------
+    def open(self):
+        """Load the persisted store; idempotent. Without it the store is memory-only."""
+        if self._db is not None or not self._config["path"]:
+            return
+        self._open(self._config["path"])
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _open(self, path: str):
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Only the event loop touches the connection, but that need not be
+            # the thread that opened it (e.g. a lifespan run from a test client)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.executescript(SCHEMA)
+            for project_id, requirements, rows, optimal, computed_at in self._db.execute(
+                    "SELECT project_id, requirements, rows, optimal, computed_at FROM projects"):
+                self._index_project(project_id, json.loads(requirements), json.loads(rows),
+                                    json.loads(optimal) if optimal else None, computed_at)
+            for user_id, skills, fingerprint in self._db.execute(
+                    "SELECT user_id, skills, fingerprint FROM employees"):
+                self._employees[user_id] = (set(json.loads(skills)), fingerprint)
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'skill_version'").fetchone()
+            self._skill_version = row[0] if row else None
+            # Employees may have changed while we were down; compare on the first sync
+            self._needs_reconcile = bool(self._projects)
+            logger.info("Recommendation store: loaded %d projects from %s", len(self._projects), path)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Recommendation store: cannot use %s (%s); keeping it in memory", path, e)
+            self._db = None
+
+    def _save_project(self, project_id: int):
+        if self._db is None:
+            return
+        entry = self._projects.get(project_id)
+        with self._db:
+            if entry is None:
+                self._db.execute("DELETE FROM projects WHERE project_id = ?", (project_id,))
+            else:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?)",
+                    (project_id, json.dumps(entry["requirements"]), json.dumps(entry["rows"]),
+                     json.dumps(entry["optimal"]) if entry["optimal"] is not None else None,
+                     entry["computed_at"])
+                )
+
+    def _save_employees(self, user_ids: Iterable[str]):
+        if self._db is None:
+            return
+        with self._db:
+            for user_id in user_ids:
+                known = self._employees.get(user_id)
+                if known is None:
+                    self._db.execute("DELETE FROM employees WHERE user_id = ?", (user_id,))
+                else:
+                    self._db.execute("INSERT OR REPLACE INTO employees VALUES (?, ?, ?)",
+                                     (user_id, json.dumps(sorted(known[0])), known[1]))
+
+    # ---------- Indexing ----------
+    def _index_project(self, project_id: int, requirements: List[Dict], rows: List[Optional[Dict]],
+                       optimal: Optional[List[Dict]], computed_at: float):
+        self._unindex_project(project_id)
+        row_skills = [set(self._normalize(s) for s in req.get("required_skills") or []) for req in requirements]
+        self._projects[project_id] = {
+            "requirements": requirements,
+            "row_skills": row_skills,
+            "rows": rows,
+            "optimal": optimal,
+            "computed_at": computed_at,
+        }
+        for skills in row_skills:
+            for skill in skills:
+                self._skill_index.setdefault(skill, set()).add(project_id)
+
+    def _unindex_project(self, project_id: int):
+        entry = self._projects.pop(project_id, None)
+        if entry is None:
+            return
+        for skills in entry["row_skills"]:
+            for skill in skills:
+                projects = self._skill_index.get(skill)
+                if projects is not None:
+                    projects.discard(project_id)
+                    if not projects:
+                        del self._skill_index[skill]
+
+    # ---------- Read access ----------
+    def lookup(self, project_id: int) -> Optional[Dict]:
+        """Stored entry for a project, or None when absent or past its TTL"""
+        entry = self._projects.get(project_id)
+        if entry is None:
+            return None
+        if time.time() - entry["computed_at"] >= self._config["ttl_seconds"]:
+            self._unindex_project(project_id)
+            self._save_project(project_id)
+            return None
+        return entry
+
+    def result(self, project_id: int, mode: str) -> Optional[List[Dict]]:
+        """Complete materialized result, or None if anything has to be recomputed"""
+        entry = self.lookup(project_id)
+        if entry is None:
+            return None
+        if mode == "optimal":
+            result = entry["optimal"]
+        else:
+            result = None if any(row is None for row in entry["rows"]) else entry["rows"]
+        if result is None:
+            self._partial += 1
+        else:
+            self._hits += 1
+        return result
+
+    @staticmethod
+    def dirty_rows(entry: Dict) -> List[int]:
+        return [i for i, row in enumerate(entry["rows"]) if row is None]
+
+    # ---------- Writes ----------
+    def put_project(self, project_id: int, requirements: List[Dict], rows: List[Dict],
+                    optimal: Optional[List[Dict]] = None):
+        """Store freshly fetched requirements with the greedy result of every row"""
+        self._misses += 1
+        self._index_project(project_id, requirements, list(rows), optimal, time.time())
+        self._save_project(project_id)
+
+    def put_rows(self, project_id: int, rows: Dict[int, Dict]):
+        """Fill in recomputed greedy rows"""
+        entry = self._projects.get(project_id)
+        if entry is None:
+            return
+        for i, row in rows.items():
+            entry["rows"][i] = row
+        self._save_project(project_id)
+
+    def put_optimal(self, project_id: int, optimal: List[Dict]):
+        entry = self._projects.get(project_id)
+        if entry is None:
+            return
+        entry["optimal"] = optimal
+        self._save_project(project_id)
+
+    # ---------- Invalidation ----------
+    def ensure_skill_version(self, version: str):
+        """Everything stored was normalized with one skill taxonomy; drop it all when that changes"""
+        if version == self._skill_version:
+            return
+        if self._skill_version is not None:
+            logger.info("Recommendation store: skill taxonomy %s -> %s", self._skill_version, version)
+            self.invalidate_projects()
+            self._employees.clear()
+            self._needs_reconcile = False
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM employees")
+        self._skill_version = version
+        if self._db is not None:
+            with self._db:
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('skill_version', ?)", (version,))
+
+    def invalidate_projects(self, project_ids: Optional[Iterable[int]] = None):
+        """Drop projects whose requirements changed, or everything when no ids are given"""
+        project_ids = list(self._projects) if project_ids is None else list(project_ids)
+        for project_id in project_ids:
+            self._unindex_project(project_id)
+            self._save_project(project_id)
+        logger.info("Recommendation store: invalidated %d projects", len(project_ids))
+
+    def _mark_skills(self, skills: Set[str]) -> int:
+        """Mark every row requiring one of these skills for recomputation"""
+        marked = 0
+        projects = set()
+        for skill in skills:
+            projects.update(self._skill_index.get(skill, ()))
+        for project_id in projects:
+            entry = self._projects[project_id]
+            changed = False
+            for i, row_skills in enumerate(entry["row_skills"]):
+                if entry["rows"][i] is not None and row_skills & skills:
+                    entry["rows"][i] = None
+                    marked += 1
+                    changed = True
+            if changed:
+                # Staffing the project as a whole depends on every row
+                entry["optimal"] = None
+                self._save_project(project_id)
+        return marked
+
+    def _track(self, record: Optional[Dict], user_id: str) -> Set[str]:
+        """Remember the employee's current state; returns the skills affected by the change"""
+        known = self._employees.get(user_id)
+        if record is None:
+            self._employees.pop(user_id, None)
+            return known[0] if known else set()
+        skills = set(record.get("skills_normalized") or ())
+        fingerprint = json.dumps([record.get(field) for field in FINGERPRINT_FIELDS], default=str)
+        self._employees[user_id] = (skills, fingerprint)
+        if known is not None and known == (skills, fingerprint):
+            return set()
+        return skills | (known[0] if known else set())
+
+    def employees_changed(self, changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]):
+        """Apply (old, new) employee record pairs from a snapshot refresh"""
+        affected: Set[str] = set()
+        touched = []
+        for old, new in changes:
+            user_id = str((new or old)["id"])
+            affected |= self._track(new, user_id)
+            touched.append(user_id)
+        self._save_employees(touched)
+        if affected:
+            marked = self._mark_skills(affected)
+            logger.info("Recommendation store: %d employee changes marked %d rows", len(touched), marked)
+
+    def employees_touched(self, records: Iterable[Dict]):
+        """Mark rows for employees whose record is unchanged but whose payload is not, e.g. committed hours"""
+        skills: Set[str] = set()
+        for record in records:
+            skills |= set(record.get("skills_normalized") or ())
+        if skills:
+            logger.info("Recommendation store: availability changes marked %d rows", self._mark_skills(skills))
+
+    def reconcile(self, records: Iterable[Dict]):
+        """After a restart, diff the first full employee sync against what results were built from"""
+        current = {}
+        for record in records:
+            current[str(record["id"])] = record
+        gone = [user_id for user_id in self._employees if user_id not in current]
+        affected: Set[str] = set()
+        for user_id in gone:
+            affected |= self._track(None, user_id)
+        for user_id, record in current.items():
+            affected |= self._track(record, user_id)
+        self._save_employees(gone + list(current))
+        self._needs_reconcile = False
+        if affected:
+            logger.info("Recommendation store: reconcile marked %d rows", self._mark_skills(affected))
+
+    @property
+    def needs_reconcile(self) -> bool:
+        return self._needs_reconcile
+
+    def stats(self) -> Dict:
+        return {
+            "projects": len(self._projects),
+            "dirty_rows": sum(len(self.dirty_rows(e)) for e in self._projects.values()),
+            "hits": self._hits,
+            "partial": self._partial,
+            "misses": self._misses,
+            "persistent": self._db is not None,
+        }
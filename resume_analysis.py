@@ -0,0 +1,86 @@
+import re
+from typing import Dict
+
+from document_engine import extract_pdf
+from skill_taxonomy import get_taxonomy
+
+# ============================================
+# RESUME ANALYSIS
+# ============================================
+# Pure functions of the resume text (or file), with no API or database state,
+# so the bulk endpoint can run them in extraction worker processes.
+
+def analyze_resume_text(text: str) -> Dict:
+    """
+    Analyze resume text to extract skills, experience, and other details
+    """
+    # Convert to lowercase for case-insensitive matching
+    text_lower = text.lower()
+    
+    # Extract potential skills as canonical taxonomy ids
+    found_skills = get_taxonomy().find(text)
+    
+    # Extract experience level patterns
+    experience_level = "beginner"  # default
+    exp_patterns = {
+        "advanced": r"\b(senior|lead|expert|advanced|10\+|10\+\s*years)\b",
+        "intermediate": r"\b(mid-level|intermediate|3-5|3\+|5\+|3-5\s*years)\b",
+        "beginner": r"\b(junior|entry-level|fresher|0-2|1-2|0-3\s*years)\b"
+    }
+    
+    for level, pattern in exp_patterns.items():
+        if re.search(pattern, text_lower, re.IGNORECASE):
+            experience_level = level
+            break
+    
+    # Extract years of experience
+    years_exp = 0
+    year_patterns = [
+        r"(\d+)\s*\+?\s*years?\s*(?:of)?\s*experience",
+        r"experience\s*:\s*(\d+)\s*years?",
+        r"(\d+)\s*years?\s*(?:of)?\s*exp"
+    ]
+    
+    for pattern in year_patterns:
+        match = re.search(pattern, text_lower)
+        if match:
+            try:
+                years_exp = int(match.group(1))
+                break
+            except:
+                pass
+    
+    # Extract potential job titles (simplified)
+    title_keywords = [
+        "developer", "engineer", "designer", "analyst", 
+        "manager", "architect", "consultant", "specialist"
+    ]
+    
+    possible_titles = []
+    for keyword in title_keywords:
+        if keyword in text_lower:
+            # Look for patterns like "Software Developer" or "Senior Engineer"
+            pattern = fr"\b(\w+\s+{keyword}|{keyword}\s+\w+)\b"
+            matches = re.findall(pattern, text_lower, re.IGNORECASE)
+            possible_titles.extend(matches)
+    
+    return {
+        "skills": list(set(found_skills)),
+        "experience_level": experience_level,
+        "years_experience": years_exp,
+        "possible_titles": list(set(possible_titles))[:5],  # Top 5 unique
+        "text_length": len(text),
+        "unique_words": len(set(text_lower.split()))
+    }
+
+
+def analyze_resume_file(path: str) -> Dict:
+    """Parse one PDF from its spool file and analyze it; runs in a pool worker"""
+    try:
+        content = extract_pdf(path)
+    except Exception as e:
+        raise Exception(f"Failed to extract PDF content: {str(e)}")
+    return {
+        "num_pages": content.page_count,
+        "analysis": analyze_resume_text(content.text)
+    }
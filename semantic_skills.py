@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from recommendation_store import DATA_DIR
+from skill_matrix import SkillMatrix, encode_requirements
+
+logger = logging.getLogger("recommendation_logger")
+
+# ============================================
+# SEMANTIC SKILL CONFIGURATION
+# ============================================
+SEMANTIC_CONFIG = {
+    "dimensions": int(os.getenv("SKILL_EMBEDDING_DIMENSIONS", 64)),
+    # Cosine below this is treated as unrelated
+    "min_similarity": float(os.getenv("SKILL_MIN_SIMILARITY", 0.35)),
+    # Skill and employee vectors are written here and memory-mapped back
+    "cache_dir": os.getenv("SKILL_EMBEDDING_CACHE_DIR", os.path.join(DATA_DIR, "skill_vectors")),
+    # Files of this many recent snapshots are kept; other workers may still map them
+    "keep_snapshots": int(os.getenv("SKILL_EMBEDDING_KEEP_SNAPSHOTS", 4)),
+}
+
+# ============================================
+# CO-OCCURRENCE SKILL EMBEDDINGS
+# ============================================
+# en_core_web_sm ships no static word vectors, so skill vectors are learned
+# from the employee skill matrix itself: skills that appear on the same
+# profiles (React next to JavaScript, REST next to api_integration) end up
+# close together. Co-occurrence counts come from one uint8 matrix product,
+# are reweighted with positive PMI and reduced by truncated SVD. Employee and
+# requirement vectors are the normalized sums of their skill vectors, so
+# scoring every employee against every requirement is one matrix product.
+#
+# The SVD is cubic in the number of skills, so both vector sets are cached per
+# snapshot digest and shared by worker processes, and endpoints build them in a
+# thread (prepare_embedding) before scoring.
+
+
+@dataclass
+class SkillEmbedding:
+    skill_vectors: np.ndarray     # (n_skills, dims) float32, rows L2-normalized
+    employee_vectors: np.ndarray  # (n_employees, dims) float32 memmap, rows L2-normalized
+    source: SkillMatrix           # the matrix the embedding was built from
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+def _matrix_digest(skill_matrix: SkillMatrix, dims: int) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(sorted(skill_matrix.vocabulary.items(), key=lambda kv: kv[1])).encode())
+    digest.update(np.ascontiguousarray(skill_matrix.matrix).tobytes())
+    digest.update(str(dims).encode())
+    return digest.hexdigest()
+
+
+def _skill_vectors(matrix: np.ndarray, dims: int) -> np.ndarray:
+    """PPMI + truncated SVD over the skill co-occurrence matrix"""
+    counts = matrix.astype(np.float32, copy=False)
+    cooccurrence = counts.T @ counts                       # (n_skills, n_skills)
+    total = cooccurrence.sum()
+    if total == 0:
+        return np.eye(matrix.shape[1], dtype=np.float32)
+    marginal = cooccurrence.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pmi = np.log(cooccurrence * total / np.outer(marginal, marginal))
+    ppmi = np.where(np.isfinite(pmi) & (pmi > 0), pmi, 0).astype(np.float32)
+    # A skill is always related to itself, even when it only ever appears alone
+    np.fill_diagonal(ppmi, np.maximum(ppmi.diagonal(), 1))
+
+    u, s, _ = np.linalg.svd(ppmi, hermitian=True)
+    dims = min(dims, ppmi.shape[0])
+    return _normalize_rows(u[:, :dims] * np.sqrt(s[:dims])).astype(np.float32)
+
+
+def _load_or_build(path: Optional[str], build) -> np.ndarray:
+    """Memory-map path if this snapshot's vectors were already written, else build and write them"""
+    if path:
+        try:
+            vectors = np.load(path, mmap_mode="r")
+            os.utime(path)  # recently used, so not pruned
+            return vectors
+        except FileNotFoundError:
+            pass
+    vectors = build()
+    if path:
+        # Write to a temp name first so a concurrent reader never maps a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, vectors)
+        os.replace(tmp_path, path)
+        vectors = np.load(path, mmap_mode="r")
+    return vectors
+
+
+def _prune_cache(cache_dir: str, keep: int):
+    """Drop all but the `keep` most recently used snapshots; open maps of removed files stay valid"""
+    for prefix in ("skills-", "employees-"):
+        files = []
+        for entry in os.scandir(cache_dir):
+            if entry.name.startswith(prefix) and entry.name.endswith(".npy"):
+                try:
+                    files.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+        for _, old_path in sorted(files, reverse=True)[max(keep, 1):]:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass  # pruned by another worker
+
+
+def build_embedding(skill_matrix: SkillMatrix, config: Optional[Dict] = None) -> SkillEmbedding:
+    """Learn skill and employee vectors, or memory-map them from this snapshot's cache files"""
+    config = {**SEMANTIC_CONFIG, **(config or {})}
+    dims = config["dimensions"]
+
+    skills_path = employees_path = None
+    if config["cache_dir"]:
+        os.makedirs(config["cache_dir"], exist_ok=True)
+        digest = _matrix_digest(skill_matrix, dims)
+        skills_path = os.path.join(config["cache_dir"], f"skills-{digest}.npy")
+        employees_path = os.path.join(config["cache_dir"], f"employees-{digest}.npy")
+
+    skill_vectors = _load_or_build(skills_path, lambda: _skill_vectors(skill_matrix.matrix, dims))
+    employee_vectors = _load_or_build(employees_path, lambda: _normalize_rows(
+        skill_matrix.matrix.astype(np.float32, copy=False) @ skill_vectors
+    ).astype(np.float32))
+    if config["cache_dir"]:
+        _prune_cache(config["cache_dir"], config["keep_snapshots"])
+        logger.info("Semantic skills: %d employee vectors mapped from %s", employee_vectors.shape[0], employees_path)
+
+    return SkillEmbedding(skill_vectors=skill_vectors, employee_vectors=employee_vectors, source=skill_matrix)
+
+
+# Embeddings of the last two snapshots, keyed by id(source). Replaced, never
+# mutated, so readers need no lock; a request still scoring against the
+# previous snapshot keeps its embedding while the next one is built.
+_embeddings: Dict[int, SkillEmbedding] = {}
+_build_lock = threading.Lock()
+
+
+def _cached_embedding(skill_matrix: SkillMatrix) -> Optional[SkillEmbedding]:
+    embedding = _embeddings.get(id(skill_matrix))
+    return embedding if embedding is not None and embedding.source is skill_matrix else None
+
+
+def get_embedding(skill_matrix: SkillMatrix) -> SkillEmbedding:
+    """Embedding for the current employee snapshot, rebuilt only when the snapshot changes"""
+    global _embeddings
+    embedding = _cached_embedding(skill_matrix)
+    if embedding is not None:
+        return embedding
+    with _build_lock:
+        embedding = _cached_embedding(skill_matrix)
+        if embedding is None:
+            embedding = build_embedding(skill_matrix)
+            recent = [e for e in _embeddings.values() if e.source is not skill_matrix][-1:]
+            _embeddings = {id(e.source): e for e in recent + [embedding]}
+        return embedding
+
+
+async def prepare_embedding(skill_matrix: SkillMatrix) -> SkillEmbedding:
+    """get_embedding in a thread, so learning the vectors never blocks the event loop"""
+    return await asyncio.to_thread(get_embedding, skill_matrix)
+
+
+# ============================================
+# SEMANTIC SCORING
+# ============================================
+def semantic_scores(
+    skill_matrix: SkillMatrix,
+    required_skill_sets: Sequence[Set[str]],
+    experience_levels: Sequence[str],
+    exp_weight: Dict[str, int],
+    excluded: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Cosine similarity of every employee profile to every requirement, weighted like
+    the exact-match score, shape (n_employees, n_requirements). Pairs below
+    min_similarity, at another experience level or excluded score 0.
+    """
+    embedding = get_embedding(skill_matrix)
+    requirements = encode_requirements(skill_matrix, required_skill_sets).astype(np.float32)
+    requirement_vectors = _normalize_rows(requirements.T @ embedding.skill_vectors)
+
+    scores = np.asarray(embedding.employee_vectors) @ requirement_vectors.T
+    scores[scores < SEMANTIC_CONFIG["min_similarity"]] = 0
+    if excluded is not None:
+        scores[excluded] = 0
+    for col, level in enumerate(experience_levels):
+        level = level.lower()
+        code = skill_matrix.levels.get(level)
+        if code is None:
+            scores[:, col] = 0
+            continue
+        scores[:, col] = np.where(skill_matrix.experience_codes == code, scores[:, col], 0)
+        scores[:, col] *= exp_weight.get(level, 1)
+    return scores
+
+
+def top_similar(scores: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the `limit` best positive scores, highest first, ties in employee order"""
+    positive = np.flatnonzero(scores > 0)
+    if limit <= 0 or positive.size == 0:
+        return positive[:0]
+    if positive.size > limit:
+        positive = positive[np.argpartition(-scores[positive], limit - 1)[:limit]]
+    return positive[np.lexsort((positive, -scores[positive]))]
+
+
+def score_requirements_semantic(
+    skill_matrix: SkillMatrix,
+    required_skill_sets: Sequence[Set[str]],
+    experience_levels: Sequence[str],
+    quantities: Sequence[int],
+    exp_weight: Dict[str, int],
+    excluded: Optional[np.ndarray] = None,
+) -> List[np.ndarray]:
+    """Per requirement, the selected employee row indices best first"""
+    if not required_skill_sets or skill_matrix.num_employees == 0:
+        return [np.empty(0, dtype=np.intp) for _ in required_skill_sets]
+    scores = semantic_scores(skill_matrix, required_skill_sets, experience_levels, exp_weight, excluded)
+    return [top_similar(scores[:, col], quantity) for col, quantity in enumerate(quantities)]
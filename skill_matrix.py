@@ -0,0 +1,138 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+logger = logging.getLogger("recommendation_logger")
+
+# ============================================
+# SKILL MATRIX SCORING KERNEL
+# ============================================
+# Employees are encoded once as a uint8 employee x skill matrix and every
+# requirement row of a project is encoded as a uint8 skill x requirement
+# matrix, so a single matrix product yields the match count of every
+# (employee, requirement) pair. Top-N selection then uses argpartition on a
+# composite key that reproduces pandas' nlargest(keep="first") ordering.
+
+NO_LEVEL = -1
+
+
+@dataclass
+class SkillMatrix:
+    vocabulary: Dict[str, int]
+    matrix: np.ndarray            # (n_employees, n_skills) uint8
+    experience_codes: np.ndarray  # (n_employees,) int16, NO_LEVEL if unknown
+    levels: Dict[str, int]
+
+    @property
+    def num_employees(self) -> int:
+        return self.matrix.shape[0]
+
+
+def build_skill_matrix(skill_sets: Sequence[Set[str]], experience_levels: Sequence[Optional[str]]) -> SkillMatrix:
+    """Encode pre-normalized employee skill sets and experience levels"""
+    vocabulary: Dict[str, int] = {}
+    for skills in skill_sets:
+        for skill in skills:
+            if skill not in vocabulary:
+                vocabulary[skill] = len(vocabulary)
+
+    matrix = np.zeros((len(skill_sets), max(len(vocabulary), 1)), dtype=np.uint8)
+    for row, skills in enumerate(skill_sets):
+        if skills:
+            matrix[row, [vocabulary[s] for s in skills]] = 1
+
+    levels: Dict[str, int] = {}
+    experience_codes = np.full(len(experience_levels), NO_LEVEL, dtype=np.int16)
+    for row, level in enumerate(experience_levels):
+        if isinstance(level, str):
+            experience_codes[row] = levels.setdefault(level.lower(), len(levels))
+
+    return SkillMatrix(vocabulary=vocabulary, matrix=matrix, experience_codes=experience_codes, levels=levels)
+
+
+def encode_requirements(skill_matrix: SkillMatrix, required_skill_sets: Sequence[Set[str]]) -> np.ndarray:
+    """Encode requirement skill sets as a (n_skills, n_requirements) uint8 matrix"""
+    encoded = np.zeros((skill_matrix.matrix.shape[1], len(required_skill_sets)), dtype=np.uint8)
+    for col, skills in enumerate(required_skill_sets):
+        columns = [skill_matrix.vocabulary[s] for s in skills if s in skill_matrix.vocabulary]
+        if columns:
+            encoded[columns, col] = 1
+    return encoded
+
+
+def match_counts(skill_matrix: SkillMatrix, required_skill_sets: Sequence[Set[str]]) -> np.ndarray:
+    """Skill overlap of every employee with every requirement, shape (n_employees, n_requirements)"""
+    requirements = encode_requirements(skill_matrix, required_skill_sets)
+    # Accumulate in int32: uint8 @ uint8 would overflow past 255 shared skills
+    return skill_matrix.matrix.astype(np.int32, copy=False) @ requirements.astype(np.int32, copy=False)
+
+
+def top_candidates(scores: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Indices of the `limit` best positive scores, highest first.
+    Ties keep the original employee order, matching DataFrame.nlargest(keep="first").
+    """
+    positive = np.flatnonzero(scores > 0)
+    if limit <= 0 or positive.size == 0:
+        return positive[:0]
+
+    if positive.size <= limit:
+        # nlargest falls back to sort_values(ascending=False) when every
+        # candidate is kept; mirror its reversed quicksort so ties line up
+        values = scores[positive].astype(np.int64)[::-1]
+        return positive[::-1][np.argsort(values, kind="quicksort")][::-1]
+
+    n = scores.shape[0]
+    # Composite key: score dominates, then earlier position wins ties
+    keys = scores[positive].astype(np.int64) * n + (n - 1 - positive)
+    picked = np.argpartition(-keys, limit - 1)[:limit]
+    picked = picked[np.argsort(-keys[picked])]
+    return positive[picked]
+
+
+def score_matrix(
+    skill_matrix: SkillMatrix,
+    required_skill_sets: Sequence[Set[str]],
+    experience_levels: Sequence[str],
+    exp_weight: Dict[str, int],
+    excluded: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Weighted score of every employee for every requirement, shape (n_employees, n_requirements).
+    Employees at a different experience level than the requirement, or flagged in
+    the boolean `excluded` mask, score 0.
+    """
+    counts = match_counts(skill_matrix, required_skill_sets)
+    if excluded is not None:
+        counts[excluded] = 0
+    for col, level in enumerate(experience_levels):
+        level = level.lower()
+        code = skill_matrix.levels.get(level)
+        if code is None:
+            logger.debug("No candidates found for experience level: %s", level)
+            counts[:, col] = 0
+            continue
+        counts[:, col] = np.where(skill_matrix.experience_codes == code, counts[:, col], 0)
+        counts[:, col] *= exp_weight.get(level, 1)
+    return counts
+
+
+def score_requirements(
+    skill_matrix: SkillMatrix,
+    required_skill_sets: Sequence[Set[str]],
+    experience_levels: Sequence[str],
+    quantities: Sequence[int],
+    exp_weight: Dict[str, int],
+    excluded: Optional[np.ndarray] = None,
+) -> List[np.ndarray]:
+    """
+    Score every requirement row of a project in one matrix product.
+    Returns, per requirement, the selected employee row indices best first.
+    """
+    if not required_skill_sets or skill_matrix.num_employees == 0:
+        return [np.empty(0, dtype=np.intp) for _ in required_skill_sets]
+
+    scores = score_matrix(skill_matrix, required_skill_sets, experience_levels, exp_weight, excluded)
+    return [top_candidates(scores[:, col], quantity) for col, quantity in enumerate(quantities)]
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Pattern
+
+logger = logging.getLogger("skill_taxonomy")
+
+# ============================================
+# TAXONOMY CONFIGURATION
+# ============================================
+TAXONOMY_CONFIG = {
+    "path": os.getenv(
+        "SKILL_TAXONOMY_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+    ),
+    # How often a worker stats the file for edits; 0 checks on every call
+    "check_interval_seconds": float(os.getenv("SKILL_TAXONOMY_CHECK_SECONDS", 5)),
+}
+
+# ============================================
+# COMPILED TAXONOMY
+# ============================================
+# skill_taxonomy.json lists canonical skills:
+#   {"id": "javascript", "name": "JavaScript", "category": "language", "aliases": ["js"]}
+# The id is the normalized form the recommender matches on, the name is what
+# the resume extractors report. Every id, name and alias (case-insensitive)
+# resolves to its id through one frozen dict. A new compiled object is swapped
+# in when the file changes, so workers pick up edits without a restart.
+#
+# All surface forms are also compiled into a single regex shaped like a trie
+# (shared prefixes factored out), so finding every skill in a resume is one
+# left-to-right scan whose cost barely depends on the taxonomy size.
+
+
+class SkillMatch(NamedTuple):
+    skill_id: str
+    term: str    # text as it appears in the document
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class CompiledTaxonomy:
+    version: str
+    lookup: Mapping[str, str]                  # lowercased id/name/alias -> id
+    names: Mapping[str, str]                   # id -> display name
+    categories: Mapping[str, str]              # id -> category
+    matcher: Pattern                           # every surface form, longest match first
+
+    def normalize(self, skill: str) -> str:
+        """Canonical id of a skill; unknown skills are just lowercased"""
+        key = skill.lower().strip()
+        return self.lookup.get(key, key)
+
+    def name(self, skill_id: str) -> str:
+        return self.names.get(skill_id, skill_id)
+
+    def scan(self, text: str) -> List[SkillMatch]:
+        """Every skill mention with its position, in one pass over the text"""
+        matches = []
+        for m in self.matcher.finditer(text):
+            # .get: Unicode case folding can match spellings whose lower() differs (e.g. the Kelvin sign)
+            skill_id = self.lookup.get(m.group().lower())
+            if skill_id is not None:
+                matches.append(SkillMatch(skill_id, m.group(), m.start(), m.end()))
+        return matches
+
+    def find(self, text: str) -> List[str]:
+        """Ids of every skill mentioned in text, in order of first mention"""
+        return list(dict.fromkeys(match.skill_id for match in self.scan(text)))
+
+
+def _trie_pattern(node: Dict) -> str:
+    """Regex for a character trie; greedy optional tails make the longest term win"""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # A term ends here but longer ones continue
+        return "(?:" + body + ")?"
+    return body
+
+
+def _compile_matcher(terms: List[str]) -> Pattern:
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    # Lookarounds instead of \b so terms ending in punctuation (node.js, c++) still match,
+    # and a leading dot keeps "js" from matching inside "Node.js"
+    return re.compile(r"(?<![\w.])" + (_trie_pattern(trie) or "(?!)") + r"(?!\w)", re.IGNORECASE)
+
+
+def compile_taxonomy(data: Dict) -> CompiledTaxonomy:
+    lookup: Dict[str, str] = {}
+    names: Dict[str, str] = {}
+    categories: Dict[str, str] = {}
+
+    for entry in data.get("skills", []):
+        skill_id = entry["id"].lower().strip()
+        names[skill_id] = entry.get("name") or skill_id
+        categories[skill_id] = entry.get("category") or "other"
+        for term in [skill_id, names[skill_id], *entry.get("aliases", [])]:
+            key = term.lower().strip()
+            if key in lookup:
+                if lookup[key] != skill_id:
+                    logger.warning("Skill taxonomy: '%s' already maps to %s, ignored for %s", term, lookup[key], skill_id)
+                continue
+            lookup[key] = skill_id
+
+    version = hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()[:12]
+    return CompiledTaxonomy(
+        version=version,
+        lookup=MappingProxyType(lookup),
+        names=MappingProxyType(names),
+        categories=MappingProxyType(categories),
+        matcher=_compile_matcher([key for key in lookup if key]),
+    )
+
+
+def load_taxonomy(path: str) -> CompiledTaxonomy:
+    with open(path, encoding="utf-8") as f:
+        taxonomy = compile_taxonomy(json.load(f))
+    logger.info("Skill taxonomy %s loaded: %d skills, %d terms", taxonomy.version, len(taxonomy.names), len(taxonomy.lookup))
+    return taxonomy
+
+
+# ============================================
+# HOT-RELOADING ACCESS
+# ============================================
+_taxonomy: Optional[CompiledTaxonomy] = None
+_mtime: Optional[float] = None
+_checked_at = 0.0
+_reload_lock = threading.Lock()
+
+
+def get_taxonomy() -> CompiledTaxonomy:
+    """Current compiled taxonomy, reloaded when the file has changed"""
+    global _taxonomy, _mtime, _checked_at
+    now = time.monotonic()
+    if _taxonomy is not None and now - _checked_at < TAXONOMY_CONFIG["check_interval_seconds"]:
+        return _taxonomy
+
+    with _reload_lock:
+        if _taxonomy is not None and now - _checked_at < TAXONOMY_CONFIG["check_interval_seconds"]:
+            return _taxonomy
+        _checked_at = now
+        path = TAXONOMY_CONFIG["path"]
+        try:
+            mtime = os.stat(path).st_mtime
+            if _taxonomy is None or mtime != _mtime:
+                _taxonomy = load_taxonomy(path)
+                _mtime = mtime
+        except (OSError, ValueError, KeyError) as e:
+            if _taxonomy is None:
+                raise
+            # Keep serving the last good taxonomy if an edit is broken
+            logger.error("Skill taxonomy reload from %s failed, keeping %s: %s", path, _taxonomy.version, e)
+    return _taxonomy
+
+
+def normalize_skill(skill: str) -> str:
+    """Canonical skill id shared by the recommender and the resume extractors"""
+    return get_taxonomy().normalize(skill)
@@ -7,6 +7,7 @@ import { supabase } from "/supabaseClient.js";
 const CONFIG = {
     DEBOUNCE_DELAY: 300,
     STANDARD_WORKWEEK: 40,
+    API_BASE_URL: 'https://finalpls-resource-management-system.onrender.com',
     AVATAR_BASE_URL: 'https://ui-avatars.com/api/',
     STATUS_COLORS: {
         pending: { color: '#F5A623', bg: '#FFF4E6', text: 'Pending' },
@@ -469,21 +470,38 @@ class ProjectTimelineService {
     }
 
     async getAssignments() {
+        // Committed hours per user, aggregated server-side
+        try {
+            const response = await fetch(`${CONFIG.API_BASE_URL}/api/availability`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            if (!response.ok) throw new Error(`status ${response.status}`);
+            const data = await response.json();
+            return {
+                userAssignedHours: Object.fromEntries(
+                    Object.values(data.users || {}).map(u => [u.user_id, u.assigned_hours])
+                ),
+                assignmentCount: data.total_assignments || 0
+            };
+        } catch (err) {
+            console.warn('[STATS] Availability API unavailable, aggregating assignments:', err);
+        }
+
         const { data, error } = await supabase
             .from('project_assignments')
             .select('user_id, assigned_hours')
             .eq('status', 'assigned');
-        return error ? [] : data || [];
-    }
-
-    calculateAvailabilityStats(totalEmployees, assignments) {
+        const assignments = error ? [] : data || [];
         const userAssignedHours = {};
         assignments.forEach(assignment => {
             userAssignedHours[assignment.user_id] = 
                 (userAssignedHours[assignment.user_id] || 0) + 
                 parseInt(assignment.assigned_hours || 0);
         });
+        return { userAssignedHours, assignmentCount: assignments.length };
+    }
 
+    calculateAvailabilityStats(totalEmployees, { userAssignedHours, assignmentCount }) {
         let available = 0, partial = 0, busy = 0;
 
         Object.values(userAssignedHours).forEach(hours => {
@@ -494,7 +512,7 @@ class ProjectTimelineService {
 
         return {
             totalEmployees,
-            activeProjects: assignments.length > 0 ? Math.ceil(assignments.length / 3) : 0,
+            activeProjects: assignmentCount > 0 ? Math.ceil(assignmentCount / 3) : 0,
             available,
             partial,
             full: busy
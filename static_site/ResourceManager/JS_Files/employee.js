@@ -10,7 +10,8 @@ const CONFIG = {
     MIN_ASSIGN_HOURS: 1,
     MAX_ASSIGN_HOURS: 40,
     AVATAR_BASE_URL: 'https://ui-avatars.com/api/',
-    MESSAGE_TIMEOUT: 5000
+    MESSAGE_TIMEOUT: 5000,
+    API_BASE_URL: 'https://finalpls-resource-management-system.onrender.com'
 };
 
 // ============================================
@@ -290,7 +291,7 @@ class DataService {
         try {
             console.log('[DATA] Fetching employees...');
             
-            const [userDetailsResult, assignmentsResult] = await Promise.all([
+            const [userDetailsResult, userAssignedHours] = await Promise.all([
                 supabase.from('user_details')
                     .select(`
                         employee_id,
@@ -304,26 +305,15 @@ class DataService {
                         profile_pic,
                         users:user_id (id, name, email, role)
                     `),
-                supabase.from('project_assignments')
-                    .select('user_id, assigned_hours')
-                    .eq('status', 'assigned')
+                this.fetchAssignedHours()
             ]);
 
             if (userDetailsResult.error) throw userDetailsResult.error;
 
             const userDetails = userDetailsResult.data || [];
-            const assignments = assignmentsResult.data || [];
 
             console.log('[DATA] User details fetched:', userDetails.length);
 
-            // Calculate assigned hours
-            const userAssignedHours = {};
-            assignments.forEach(assignment => {
-                userAssignedHours[assignment.user_id] = 
-                    (userAssignedHours[assignment.user_id] || 0) + 
-                    parseInt(assignment.assigned_hours || 0);
-            });
-
             // Filter out resource managers
             const employees = userDetails
                 .filter(emp => emp.users?.role !== 'resource_manager')
@@ -339,6 +329,46 @@ class DataService {
         }
     }
 
+    async notifyAssignmentsChanged(userIds) {
+        try {
+            await fetch(`${CONFIG.API_BASE_URL}/api/availability/refresh`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ user_ids: userIds.map(Number) })
+            });
+        } catch (err) {
+            // The API's periodic resync catches up on its own
+            console.warn('[DATA] Could not refresh availability:', err);
+        }
+    }
+
+    async fetchAssignedHours() {
+        // Committed hours per user, aggregated server-side
+        try {
+            const response = await fetch(`${CONFIG.API_BASE_URL}/api/availability`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            if (!response.ok) throw new Error(`status ${response.status}`);
+            const data = await response.json();
+            return Object.fromEntries(
+                Object.values(data.users || {}).map(u => [u.user_id, u.assigned_hours])
+            );
+        } catch (err) {
+            console.warn('[DATA] Availability API unavailable, aggregating assignments:', err);
+        }
+
+        const { data } = await supabase.from('project_assignments')
+            .select('user_id, assigned_hours')
+            .eq('status', 'assigned');
+        const userAssignedHours = {};
+        (data || []).forEach(assignment => {
+            userAssignedHours[assignment.user_id] = 
+                (userAssignedHours[assignment.user_id] || 0) + 
+                parseInt(assignment.assigned_hours || 0);
+        });
+        return userAssignedHours;
+    }
+
     async getEmployeeById(id) {
         const cacheKey = `employee_${id}`;
         if (this.cache.has(cacheKey)) {
@@ -419,6 +449,9 @@ class DataService {
 
             if (error) throw error;
             
+            // Committed hours are served by the API; have it pick the new row up
+            await this.notifyAssignmentsChanged([employeeUserId]);
+
             // Clear cache to reflect changes
             this.cache.clear();
             return { success: true };
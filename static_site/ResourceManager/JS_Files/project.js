@@ -500,6 +500,9 @@ class ProjectApp {
         this.allEmployees = [];
         this.recommendedEmployees = [];
         this.recommendedIds = [];
+        // Greedy recommendations by project id, prefetched in one batch request
+        this.recommendationCache = new Map();
+        this.recommendationPrefetch = Promise.resolve();
         this.currentProjectId = null;
         this.currentProjectTotalNeeded = 0;
     }
@@ -567,12 +570,38 @@ class ProjectApp {
             }));
             this.projects = projects;
             this.uiManager.renderProjects(projects);
+            this.recommendationPrefetch = this.prefetchRecommendations(projects.map(p => p.projectId));
         } catch (error) {
             console.error('Error loading projects:', error);
             MessageManager.error('Failed to load projects');
         }
     }
 
+    async prefetchRecommendations(projectIds) {
+        if (projectIds.length === 0) return;
+        try {
+            const response = await fetch(`${CONFIG.API_BASE_URL}/api/recommendations/batch`, {
+                method: 'POST',
+                headers: {
+                    'Accept': 'application/json',
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ project_ids: projectIds, mode: 'greedy' })
+            });
+            if (!response.ok) {
+                console.warn(`Batch recommendations API returned status: ${response.status}`);
+                return;
+            }
+            const data = await response.json();
+            Object.entries(data.recommendations || {}).forEach(([projectId, recommendations]) => {
+                this.recommendationCache.set(String(projectId), recommendations);
+            });
+        } catch (err) {
+            // editProject falls back to the per-project endpoint
+            console.warn('Could not prefetch recommendations:', err);
+        }
+    }
+
     async filterProjects() {
         try {
             const searchInput = document.getElementById('projectSearch');
@@ -679,65 +708,64 @@ class ProjectApp {
 
             let recommendedEmployees = [];
             let recommendationsFailed = false;
+
+            await this.recommendationPrefetch;
+            const prefetched = this.recommendationCache.get(String(projectId));
             
-            try {
-                console.log(`Fetching recommendations for project ${projectId}...`);
+            if (prefetched) {
+                recommendedEmployees = this.toRecommendedEmployees(prefetched);
+            } else {
+                try {
+                    console.log(`Fetching recommendations for project ${projectId}...`);
                 
-                // Use the correct endpoint from your API response
-                const response = await fetch(`${CONFIG.API_BASE_URL}/api/recommendations/${projectId}`, {
-                    method: 'POST',  // Check if this should be POST or GET
-                    headers: {
-                        'Accept': 'application/json',
-                        'Content-Type': 'application/json'
-                    },
-                    // If it's a POST request that needs data, add body:
-                    body: JSON.stringify({
-                        project_id: projectId
-                        // Add any other required parameters
-                    })
-                });
+                    // Use the correct endpoint from your API response
+                    const response = await fetch(`${CONFIG.API_BASE_URL}/api/recommendations/${projectId}`, {
+                        method: 'POST',  // Check if this should be POST or GET
+                        headers: {
+                            'Accept': 'application/json',
+                            'Content-Type': 'application/json'
+                        },
+                        // If it's a POST request that needs data, add body:
+                        body: JSON.stringify({
+                            project_id: projectId
+                            // Add any other required parameters
+                        })
+                    });
                 
-                console.log(`Response status: ${response.status}`);
+                    console.log(`Response status: ${response.status}`);
                 
-                if (!response.ok) {
-                    recommendationsFailed = true;
-                    console.warn(`Recommendations API returned status: ${response.status}`);
+                    if (!response.ok) {
+                        recommendationsFailed = true;
+                        console.warn(`Recommendations API returned status: ${response.status}`);
                     
-                    // Try GET if POST fails
-                    if (response.status === 405) { // Method Not Allowed
-                        console.log('Trying GET method instead...');
-                        const getResponse = await fetch(`${CONFIG.API_BASE_URL}/api/recommendations/${projectId}`, {
-                            method: 'GET',
-                            headers: {
-                                'Accept': 'application/json'
-                            }
-                        });
+                        // Try GET if POST fails
+                        if (response.status === 405) { // Method Not Allowed
+                            console.log('Trying GET method instead...');
+                            const getResponse = await fetch(`${CONFIG.API_BASE_URL}/api/recommendations/${projectId}`, {
+                                method: 'GET',
+                                headers: {
+                                    'Accept': 'application/json'
+                                }
+                            });
                         
-                        if (getResponse.ok) {
-                            const data = await getResponse.json();
-                            // Process data...
+                            if (getResponse.ok) {
+                                const data = await getResponse.json();
+                                // Process data...
+                            }
                         }
-                    }
-                } else {
-                    const data = await response.json();
-                    console.log('Received recommendations data:', data);
+                    } else {
+                        const data = await response.json();
+                        console.log('Received recommendations data:', data);
                     
-                    if (data.recommendations && Array.isArray(data.recommendations)) {
-                        recommendedEmployees = data.recommendations.flatMap(r =>
-                            r.recommended_employees.map(emp => ({
-                                employee_id: emp.employee_id,
-                                user_id: emp.user_id,
-                                assignment_type: emp.assignment_type,
-                                assigned_hours: emp.assigned_hours,
-                                allocation_percent: emp.allocation_percent
-                            }))
-                        );
-                        console.log(`Processed ${recommendedEmployees.length} recommended employees`);
+                        if (data.recommendations && Array.isArray(data.recommendations)) {
+                            recommendedEmployees = this.toRecommendedEmployees(data.recommendations);
+                            console.log(`Processed ${recommendedEmployees.length} recommended employees`);
+                        }
                     }
+                } catch (err) {
+                    console.error("Failed to fetch recommendations:", err);
+                    recommendationsFailed = true;
                 }
-            } catch (err) {
-                console.error("Failed to fetch recommendations:", err);
-                recommendationsFailed = true;
             }
             
             if (recommendationsFailed) {
@@ -767,6 +795,18 @@ class ProjectApp {
         }
     }
 
+    toRecommendedEmployees(recommendations) {
+        return recommendations.flatMap(r =>
+            r.recommended_employees.map(emp => ({
+                employee_id: emp.employee_id,
+                user_id: emp.user_id,
+                assignment_type: emp.assignment_type,
+                assigned_hours: emp.assigned_hours,
+                allocation_percent: emp.allocation_percent
+            }))
+        );
+    }
+
     showEditProjectModal(project) {
         document.querySelectorAll(".employee-checkbox").forEach(cb => cb.checked = false);
 
@@ -1007,6 +1047,7 @@ class ProjectApp {
 
             const failedAssignments = [];
             const successfulAssignments = [];
+            const changedUserIds = [];
 
             // Process new assignments
             for (const userId of newlySelectedUserIds) {
@@ -1070,6 +1111,7 @@ class ProjectApp {
                     await this.updateEmployeeAvailability(userId, requiredHours, false);
                     assignedSet.add(String(userId));
                     successfulAssignments.push(userName);
+                    changedUserIds.push(Number(userId));
                     
                 } catch (err) {
                     failedAssignments.push({
@@ -1106,6 +1148,22 @@ class ProjectApp {
                 if (!error) {
                     await this.updateEmployeeAvailability(userId, hoursToRestore, true);
                     assignedSet.delete(String(userId));
+                    changedUserIds.push(Number(userId));
+                }
+            }
+
+            // Committed hours are served by the API; have it pick the changes up
+            if (changedUserIds.length > 0) {
+                // Changed hours can move any project's recommendations
+                this.recommendationCache.clear();
+                try {
+                    await fetch(`${CONFIG.API_BASE_URL}/api/availability/refresh`, {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify({ user_ids: changedUserIds })
+                    });
+                } catch (err) {
+                    console.warn('[PROJECTS] Could not refresh availability:', err);
                 }
             }
 
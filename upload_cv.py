@@ -4,8 +4,8 @@ import uuid
 import logging
 from typing import List
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from supabase import create_client, Client
 import asyncio
+from upload_ingest import INGEST_CONFIG, SpooledUpload, UploadTooLarge, check_file_count, spool_upload
 
 # ---------- Logging Config ----------
 logger = logging.getLogger("cv_upload_logger")
@@ -14,7 +14,7 @@ router = APIRouter()
 
 # ---------- Configuration ----------
 BUCKET_NAME = "cvs"
-MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+MAX_FILE_SIZE = INGEST_CONFIG["max_file_bytes"]  # 50MB unless UPLOAD_MAX_FILE_MB is set
 ALLOWED_EXTENSIONS = {'.pdf', '.docx', '.doc', '.txt', '.png', '.jpg', '.jpeg'}
 
 # ---------- Supabase Initialization ----------
@@ -40,6 +40,7 @@ def get_supabase_client():
         return None
     
     try:
+        from supabase import create_client
         supabase = create_client(url, key)
         logger.info("✅ Supabase client initialized successfully")
         return supabase
@@ -60,10 +61,6 @@ def validate_file_extension(filename: str) -> bool:
     file_extension = os.path.splitext(filename)[1].lower()
     return file_extension in ALLOWED_EXTENSIONS
 
-def validate_file_size(content: bytes) -> bool:
-    """Validate file size"""
-    return len(content) <= MAX_FILE_SIZE
-
 def handle_supabase_response(response, operation: str) -> dict:
     """Handle Supabase response - SIMPLIFIED VERSION"""
     try:
@@ -92,7 +89,7 @@ def handle_supabase_response(response, operation: str) -> dict:
         logger.error(f"Error handling Supabase {operation} response: {e}")
         return {"success": False, "error": f"Response handling error: {str(e)}"}
 
-async def upload_to_supabase(file_path: str, content: bytes, filename: str) -> dict:
+async def upload_to_supabase(file_path: str, upload: SpooledUpload, filename: str) -> dict:
     """Upload file to Supabase storage"""
     try:
         logger.info(f"Uploading {filename} to {file_path}")
@@ -102,8 +99,9 @@ async def upload_to_supabase(file_path: str, content: bytes, filename: str) -> d
         if not supabase_client:
             return {"success": False, "error": "Supabase client not initialized. Check environment variables."}
         
-        # Upload file content directly
-        response = supabase_client.storage.from_(BUCKET_NAME).upload(file_path, content)
+        # Stream the spooled file instead of holding it in memory
+        with open(upload.path, "rb") as content:
+            response = supabase_client.storage.from_(BUCKET_NAME).upload(file_path, content)
         
         # Check if upload was successful
         result = handle_supabase_response(response, "upload")
@@ -125,37 +123,39 @@ async def upload_to_supabase(file_path: str, content: bytes, filename: str) -> d
 
 async def process_single_file(file: UploadFile, employee_id: str) -> dict:
     """Process and upload a single file"""
+    upload = None
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Validate file
-        if len(content) == 0:
+        # Checked before reading anything
+        if not validate_file_extension(file.filename):
             return {
                 "filename": file.filename,
                 "success": False,
-                "error": "File is empty"
+                "error": f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
             }
 
-        if not validate_file_size(content):
+        # Spool to disk in chunks; stops reading as soon as the size limit is crossed
+        try:
+            upload = await spool_upload(file)
+        except UploadTooLarge:
             return {
                 "filename": file.filename,
                 "success": False,
                 "error": f"File size exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit"
             }
-
-        if not validate_file_extension(file.filename):
+        
+        # Validate file
+        if upload.size == 0:
             return {
                 "filename": file.filename,
                 "success": False,
-                "error": f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+                "error": "File is empty"
             }
 
         # Generate unique filename
         unique_filename, unique_path = generate_unique_filename(file.filename, employee_id)
 
         # Upload to Supabase
-        upload_result = await upload_to_supabase(unique_path, content, file.filename)
+        upload_result = await upload_to_supabase(unique_path, upload, file.filename)
         
         if not upload_result["success"]:
             return {
@@ -182,6 +182,9 @@ async def process_single_file(file: UploadFile, employee_id: str) -> dict:
             "success": False,
             "error": str(e)
         }
+    finally:
+        if upload is not None:
+            upload.cleanup()
 
 # -----------------------------
 # Upload CV to Supabase Bucket (FIXED)
@@ -194,6 +197,7 @@ async def upload_cv(
     """Upload multiple CV files with parallel processing"""
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
+    check_file_count(files)
 
     logger.info(f"🚀 Starting upload for employee {employee_id} with {len(files)} files")
 
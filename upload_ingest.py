@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger("upload_ingest")
+
+# ============================================
+# INGEST CONFIGURATION
+# ============================================
+INGEST_CONFIG = {
+    # Bytes copied from an upload to its spool file at a time
+    "chunk_size": int(os.getenv("UPLOAD_CHUNK_BYTES", 1024 * 1024)),
+    "max_file_bytes": int(float(os.getenv("UPLOAD_MAX_FILE_MB", 50)) * 1024 * 1024),
+    "max_files": int(os.getenv("UPLOAD_MAX_FILES", 20)),
+    # Whole request bodies above this get 413 before the form is parsed
+    "max_request_bytes": int(float(os.getenv("UPLOAD_MAX_REQUEST_MB", 100)) * 1024 * 1024),
+    # Where spooled uploads are written; None uses the system temp directory
+    "spool_dir": os.getenv("UPLOAD_SPOOL_DIR") or None,
+}
+
+# ============================================
+# STREAMING UPLOAD SPOOL
+# ============================================
+# Starlette parses the whole multipart body into its own temp files before an
+# endpoint runs, so the size of a request is bounded one level up, by
+# UploadSizeLimitMiddleware: a Content-Length over max_request_bytes is refused
+# before anything is read, and a body that streams past it is cut off there.
+#
+# Endpoints then copy each file chunk by chunk into one named spool file while
+# hashing it, rejecting files over max_file_bytes. That copy costs one extra
+# write per file, but gives the Supabase upload, the extraction workers (which
+# open it by path) and the content-addressed result cache (which uses the hash)
+# a single file to share.
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+@dataclass
+class SpooledUpload:
+    filename: str
+    path: str
+    size: int
+    sha256: str
+
+    @property
+    def suffix(self) -> str:
+        return os.path.splitext(self.filename or "")[1].lower()
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def cleanup(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove spooled upload %s: %s", self.path, e)
+
+
+def _spool_file(filename: str, config: dict):
+    suffix = os.path.splitext(filename or "")[1].lower()
+    return tempfile.NamedTemporaryFile(delete=False, suffix=suffix, prefix="upload_", dir=config["spool_dir"])
+
+
+async def spool_upload(file: UploadFile, config: Optional[dict] = None) -> SpooledUpload:
+    """Copy a parsed upload to a named temp file, hashing as it goes; raises UploadTooLarge past max_file_bytes"""
+    config = {**INGEST_CONFIG, **(config or {})}
+    limit = config["max_file_bytes"]
+    # The multipart parser already knows the size; don't copy a file we will reject
+    if file.size is not None and file.size > limit:
+        raise UploadTooLarge(f"File size exceeds {limit // (1024 * 1024)}MB limit")
+
+    digest = hashlib.sha256()
+    size = 0
+    spool = _spool_file(file.filename, config)
+    try:
+        with spool:
+            while True:
+                chunk = await file.read(config["chunk_size"])
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise UploadTooLarge(f"File size exceeds {limit // (1024 * 1024)}MB limit")
+                digest.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        os.unlink(spool.name)
+        raise
+    return SpooledUpload(filename=file.filename, path=spool.name, size=size, sha256=digest.hexdigest())
+
+
+def spool_chunks(filename: str, chunks, config: Optional[dict] = None) -> SpooledUpload:
+    """Spool already-stored content (an iterable of byte chunks), e.g. a queued job's file"""
+    config = {**INGEST_CONFIG, **(config or {})}
+    digest = hashlib.sha256()
+    size = 0
+    spool = _spool_file(filename, config)
+    try:
+        with spool:
+            for chunk in chunks:
+                size += len(chunk)
+                digest.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        os.unlink(spool.name)
+        raise
+    return SpooledUpload(filename=filename, path=spool.name, size=size, sha256=digest.hexdigest())
+
+
+def check_file_count(files: List[UploadFile], config: Optional[dict] = None):
+    """Reject requests with more files than max_files before reading any of them"""
+    config = {**INGEST_CONFIG, **(config or {})}
+    if len(files) > config["max_files"]:
+        raise HTTPException(status_code=413, detail=f"Too many files: at most {config['max_files']} per request")
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware answering 413 for request bodies over max_request_bytes:
+    up front from Content-Length, or once a streamed body crosses the limit,
+    after which the app sees the client as disconnected.
+    """
+
+    def __init__(self, app, config: Optional[dict] = None):
+        self.app = app
+        self._limit = {**INGEST_CONFIG, **(config or {})}["max_request_bytes"]
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse(status_code=413,
+                            content={"detail": f"Request body exceeds {self._limit // (1024 * 1024)}MB limit"})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self._limit:
+            await self._too_large()(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self._limit:
+                    rejected = True
+                    if not response_started:
+                        await self._too_large()(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return  # the 413 has been sent
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # The app failing on the cut-off body (ClientDisconnect) is expected
+            if not rejected:
+                raise
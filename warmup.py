@@ -0,0 +1,96 @@
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("warmup")
+
+# ============================================
+# WARM-UP CONFIGURATION
+# ============================================
+WARMUP_CONFIG = {
+    # 0 leaves every engine to load on first use
+    "enabled": os.getenv("WARMUP_ON_STARTUP", "1") != "0",
+}
+
+# ============================================
+# BACKGROUND ENGINE WARM-UP
+# ============================================
+# Heavy libraries (PyMuPDF, OCR, spaCy) are imported lazily so the process can
+# serve /health as soon as uvicorn binds. After startup the registered engines
+# are loaded in the background; /ready reports which are warm. Synchronous
+# loaders run in a thread so the event loop keeps answering meanwhile.
+
+
+class EngineWarmup:
+
+    def __init__(self, config: Optional[Dict] = None):
+        self._config = {**WARMUP_CONFIG, **(config or {})}
+        self._loaders: Dict[str, Callable] = {}
+        self._status: Dict[str, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, loader: Callable):
+        """loader: a function or coroutine function; its return value is reported as details"""
+        self._loaders[name] = loader
+        self._status[name] = {"state": "pending"}
+
+    def start(self):
+        """Schedule the warm-up on the running loop; returns immediately"""
+        if self._config["enabled"] and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        started = time.perf_counter()
+        await asyncio.gather(*(self._warm(name, loader) for name, loader in self._loaders.items()))
+        logger.info("Warm-up finished in %.2fs: %s", time.perf_counter() - started,
+                    {name: status["state"] for name, status in self._status.items()})
+
+    async def _warm(self, name: str, loader: Callable):
+        self._status[name] = {"state": "warming"}
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(loader):
+                details = await loader()
+            else:
+                details = await asyncio.to_thread(loader)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Warm-up of %s failed: %s", name, e)
+            self._status[name] = {"state": "failed", "error": str(e),
+                                  "seconds": round(time.perf_counter() - start, 3)}
+            return
+        self._status[name] = {"state": "ready", "seconds": round(time.perf_counter() - start, 3)}
+        if isinstance(details, dict):
+            self._status[name].update(details)
+
+    @property
+    def ready(self) -> bool:
+        """
+        True once no engine is still loading, or always when warm-up is disabled
+        (engines load on demand). A failed engine does not hold back readiness:
+        the endpoints that don't need it keep working, and it is listed as failed.
+        """
+        if not self._config["enabled"]:
+            return True
+        return all(status["state"] in ("ready", "failed") for status in self._status.values())
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "warmup_enabled": self._config["enabled"],
+            "failed": [name for name, status in self._status.items() if status["state"] == "failed"],
+            "engines": {name: dict(status) for name, status in self._status.items()},
+        }